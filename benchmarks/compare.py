@@ -0,0 +1,82 @@
+"""
+Diffs two benchmark reports written by `benchmarks.run` and flags the cases that got slower or hungrier.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.2
+
+Exits with status 1 when anything regressed, so it can gate a deploy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+Key = Tuple[str, int, str]  # family, requested edge count, case
+
+
+def load(path: str) -> dict:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def _index(report: dict) -> Dict[Key, dict]:
+    return {(row['family'], row['edges'], row['case']): row for row in report['results']}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2,
+            noise_floor: float = 1e-3) -> List[Tuple[Key, str, float, float, bool]]:
+    """
+    Matches the cases both reports ran and compares their fastest time and peak memory
+
+    :param baseline: The stored report
+    :param current: The new report
+    :param threshold: The relative growth that counts as a regression, 0.2 is 20% slower / bigger
+    :param noise_floor: Time differences below this many seconds never count, tiny cases are mostly jitter
+    :return: (key, metric, baseline value, current value, regressed) for every compared metric
+    """
+    old, new = _index(baseline), _index(current)
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]['seconds_min'], new[key]['seconds_min']
+        slower = after > before * (1 + threshold) and after - before > noise_floor
+        rows.append((key, 'seconds', before, after, slower))
+        before, after = old[key]['peak_bytes'], new[key]['peak_bytes']
+        rows.append((key, 'peak_bytes', before, after, after > before * (1 + threshold) and after - before > 4096))
+    return rows
+
+
+def report(rows: List[Tuple[Key, str, float, float, bool]], baseline: dict, current: dict, out=sys.stdout) -> bool:
+    """
+    Prints the comparison as a table
+
+    :return: Whether anything regressed
+    """
+    for field in ('python', 'numpy'):
+        if baseline['meta'].get(field) != current['meta'].get(field):
+            print('warning: {} differs ({} vs {}), timings may not be comparable'.format(
+                field, baseline['meta'].get(field), current['meta'].get(field)), file=out)
+    regressed = False
+    for (family, edges, case), metric, before, after, flagged in rows:
+        ratio = after / before if before else float('inf') if after else 1.0
+        print('{:<12} {:>10} {:<28} {:<10} {:>14.6g} {:>14.6g} {:>7.2f}x{}'.format(
+            family, edges, case, metric, before, after, ratio, '  REGRESSION' if flagged else ''), file=out)
+        regressed = regressed or flagged
+    return regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', help='The stored report')
+    parser.add_argument('current', help='The new report')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative growth that counts as a regression')
+    parser.add_argument('--noise-floor', type=float, default=1e-3, help='Ignore time differences below this (s)')
+    arguments = parser.parse_args(argv)
+    baseline, current = load(arguments.baseline), load(arguments.current)
+    rows = compare(baseline, current, arguments.threshold, arguments.noise_floor)
+    return 1 if report(rows, baseline, current) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Reproducible synthetic graphs for the benchmarks. Every generator is seeded and returns an undirected CSRGraph
+(each edge stored both ways) with positive weights. NumPy is used when it is installed, which makes the 10^7
+edge graphs take seconds instead of minutes; a seed gives the same graph every time on the same backend.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from array import array
+from typing import Callable, Dict
+
+from graph_algos.csr import CSRGraph, np
+
+
+def erdos_renyi(vertex_count: int, edge_count: int, seed: int = 0) -> CSRGraph:
+    """
+    G(n, m): `edge_count` edges between uniformly random endpoints, integer weights 1..100
+
+    :param vertex_count: The number of vertices
+    :param edge_count: The number of undirected edges
+    :param seed: The random seed
+    :return: The graph
+    """
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        sources, targets = rng.integers(0, vertex_count, edge_count), rng.integers(0, vertex_count, edge_count)
+        weights = rng.integers(1, 101, edge_count).astype(np.float64)
+    else:
+        rng = random.Random(seed)
+        sources = array('q', (rng.randrange(vertex_count) for _ in range(edge_count)))
+        targets = array('q', (rng.randrange(vertex_count) for _ in range(edge_count)))
+        weights = array('d', (rng.randint(1, 100) for _ in range(edge_count)))
+    return CSRGraph.from_edges(vertex_count, sources, targets, weights, directed=False)
+
+
+def grid(rows: int, columns: int, seed: int = 0) -> CSRGraph:
+    """
+    A 4-neighbor lattice, the high diameter worst case of level synchronous searches, integer weights 1..10
+
+    :param rows: The number of rows
+    :param columns: The number of columns
+    :param seed: The random seed
+    :return: The graph, vertex r * columns + c is the cell in row r, column c
+    """
+    sources, targets = array('q'), array('q')
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns:
+                sources.append(vertex)
+                targets.append(vertex + 1)
+            if row + 1 < rows:
+                sources.append(vertex)
+                targets.append(vertex + columns)
+    rng = random.Random(seed)
+    weights = array('d', (rng.randint(1, 10) for _ in range(len(sources))))
+    return CSRGraph.from_edges(rows * columns, sources, targets, weights, directed=False)
+
+
+def power_law(vertex_count: int, edge_count: int, exponent: float = 2.5, seed: int = 0) -> CSRGraph:
+    """
+    A Chung-Lu graph: both endpoints of every edge are drawn with probability proportional to a power law vertex
+    weight, which gives the heavy tailed degrees and hub vertices of social and web graphs. Integer weights 1..100.
+
+    :param vertex_count: The number of vertices
+    :param edge_count: The number of undirected edges
+    :param exponent: The exponent of the degree distribution, above 2
+    :param seed: The random seed
+    :return: The graph, low vertex indices are the hubs
+    """
+    power = -1 / (exponent - 1)
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        weight = np.arange(1, vertex_count + 1, dtype=np.float64) ** power
+        weight /= weight.sum()
+        sources, targets = rng.choice(vertex_count, edge_count, p=weight), rng.choice(vertex_count, edge_count, p=weight)
+        weights = rng.integers(1, 101, edge_count).astype(np.float64)
+    else:
+        rng = random.Random(seed)
+        cumulative, total = [], 0.0
+        for vertex in range(1, vertex_count + 1):
+            total += vertex ** power
+            cumulative.append(total)
+        sources = array('q', rng.choices(range(vertex_count), cum_weights=cumulative, k=edge_count))
+        targets = array('q', rng.choices(range(vertex_count), cum_weights=cumulative, k=edge_count))
+        weights = array('d', (rng.randint(1, 100) for _ in range(edge_count)))
+    return CSRGraph.from_edges(vertex_count, sources, targets, weights, directed=False)
+
+
+def road_like(rows: int, columns: int, seed: int = 0) -> CSRGraph:
+    """
+    A road network stand-in: intersections jittered around a lattice, a tenth of the streets missing, the odd
+    diagonal, and a sparse grid of long highways that are cheaper per unit of distance. Weights are the Euclidean
+    lengths, so the graph is planar-ish with a large diameter and non-integer weights, like real road data.
+
+    :param rows: The number of rows of intersections
+    :param columns: The number of columns of intersections
+    :param seed: The random seed
+    :return: The graph, vertex r * columns + c sits near (c, r)
+    """
+    rng = random.Random(seed)
+    x = [column + rng.uniform(-0.3, 0.3) for row in range(rows) for column in range(columns)]
+    y = [row + rng.uniform(-0.3, 0.3) for row in range(rows) for column in range(columns)]
+    sources, targets, weights = array('q'), array('q'), array('d')
+
+    def street(u: int, v: int, speed: float = 1.0) -> None:
+        sources.append(u)
+        targets.append(v)
+        weights.append(math.hypot(x[u] - x[v], y[u] - y[v]) / speed)
+
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns and rng.random() >= 0.1:
+                street(vertex, vertex + 1)
+            if row + 1 < rows and rng.random() >= 0.1:
+                street(vertex, vertex + columns)
+            if column + 1 < columns and row + 1 < rows and rng.random() < 0.05:
+                street(vertex, vertex + columns + 1)
+            if row % 16 == 0 and column % 16 == 0:  # highway interchanges, linked to the next interchange each way
+                if column + 16 < columns:
+                    street(vertex, vertex + 16, speed=3.0)
+                if row + 16 < rows:
+                    street(vertex, vertex + 16 * columns, speed=3.0)
+    return CSRGraph.from_edges(rows * columns, sources, targets, weights, directed=False)
+
+
+def _square(edges_per_vertex: float, edge_count: int) -> int:
+    return max(2, int(math.sqrt(edge_count / edges_per_vertex)))
+
+
+# family name -> a generator of a graph with roughly the given number of undirected edges
+FAMILIES: Dict[str, Callable[[int, int], CSRGraph]] = {
+    'erdos_renyi': lambda edges, seed: erdos_renyi(max(2, edges // 4), edges, seed),
+    'grid': lambda edges, seed: grid(_square(2, edges), _square(2, edges), seed),
+    'power_law': lambda edges, seed: power_law(max(2, edges // 4), edges, seed=seed),
+    'road_like': lambda edges, seed: road_like(_square(1.9, edges), _square(1.9, edges), seed),
+}
+
+
+def generate(family: str, edge_count: int, seed: int = 0) -> CSRGraph:
+    """
+    :param family: A key of FAMILIES
+    :param edge_count: The rough number of undirected edges
+    :param seed: The random seed
+    :return: The graph
+    """
+    if family not in FAMILIES:
+        raise ValueError('Unknown graph family {}, expected one of {}'.format(family, ', '.join(FAMILIES)))
+    return FAMILIES[family](edge_count, seed)
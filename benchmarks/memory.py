@@ -0,0 +1,70 @@
+"""
+Measures the memory each vertex costs in the object model, `Node` against the slotted `Vertex`, next to the
+compiled CSR view of the same graph.
+
+    python -m benchmarks.memory --vertices 100000 --degree 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tracemalloc
+from typing import List, Optional
+
+from graph_algos.dfs import Graph, Node, Vertex
+
+
+def measure(kind: type, vertex_count: int, degree: int, seed: int = 0) -> dict:
+    """
+    Builds a random graph out of `kind` objects under tracemalloc
+
+    :param kind: Node or Vertex
+    :param vertex_count: The number of vertices
+    :param degree: Undirected edges added per vertex, on average
+    :param seed: The random seed, the same seed gives both kinds the same edges
+    :return: Bytes per vertex for the bare objects, with their edges, and for the compiled CSR view
+    """
+    rng = random.Random(seed)
+    pairs = [(rng.randrange(vertex_count), rng.randrange(vertex_count)) for _ in range(vertex_count * degree // 2)]
+    tracemalloc.start()
+    try:
+        graph = Graph()
+        graph.insert_vertexes([kind(value) for value in range(vertex_count)])
+        bare = tracemalloc.get_traced_memory()[0]
+        vertices = graph.vertices
+        for u, v in pairs:
+            vertices[u].add_edge(vertices[v], 1)
+        linked = tracemalloc.get_traced_memory()[0]
+        compiled = graph.to_csr()
+    finally:
+        tracemalloc.stop()
+    return {
+        'kind': kind.__name__,
+        'object_bytes': sys.getsizeof(vertices[0]) + (sys.getsizeof(vertices[0].__dict__)
+                                                      if hasattr(vertices[0], '__dict__') else 0),
+        'bare_per_vertex': bare / vertex_count,
+        'with_edges_per_vertex': linked / vertex_count,
+        'csr_per_vertex': compiled.nbytes / vertex_count,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vertices', type=int, default=100000)
+    parser.add_argument('--degree', type=int, default=4, help='Average number of undirected edges per vertex')
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args(argv)
+    print('{:<8} {:>14} {:>16} {:>22} {:>16}'.format('kind', 'object bytes', 'bytes / vertex',
+                                                     'with edges / vertex', 'CSR / vertex'))
+    for kind in (Node, Vertex):
+        row = measure(kind, arguments.vertices, arguments.degree, arguments.seed)
+        print('{:<8} {:>14} {:>16.1f} {:>22.1f} {:>16.1f}'.format(
+            row['kind'], row['object_bytes'], row['bare_per_vertex'], row['with_edges_per_vertex'],
+            row['csr_per_vertex']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Times the graph engines on reproducible synthetic graphs and writes a JSON report.
+
+    python -m benchmarks.run --families grid road_like --sizes 1e3 1e5 --output current.json
+    python -m benchmarks.run --sizes 1e4 --baseline baseline.json --output current.json
+
+Every case is timed `--repeat` times (the fastest and the median are kept) and run once more under tracemalloc for
+its peak memory. With `--baseline` the report is diffed against a stored one and the exit status is 1 when a case
+regressed, see `benchmarks.compare`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.compare import compare, report
+from benchmarks.generators import FAMILIES, generate
+from graph_algos import traversal
+from graph_algos.centrality import pagerank
+from graph_algos.components import connected_components
+from graph_algos.contraction import ContractionHierarchy
+from graph_algos.csr import CSRGraph, np
+from graph_algos.delta_stepping import delta_stepping
+from graph_algos.k_shortest import k_shortest_paths
+from graph_algos.landmarks import LandmarkIndex
+from graph_algos.mst import kruskal_csr, prim
+from graph_algos.scc import strongly_connected_components
+from graph_algos.shortest_paths import bidirectional_dijkstra, dial, dijkstra
+
+
+class Workload:
+    """
+    One generated graph plus the things cases share, built lazily and outside the timed region
+    """
+
+    def __init__(self, family: str, edges: int, graph: CSRGraph):
+        self.family = family
+        self.edges = edges
+        self.graph = graph
+        self.source = 0
+        self.target = graph.vertex_count - 1  # the far corner on grids, a leaf on the random families
+        self._objects = None
+
+    @property
+    def objects(self):
+        """
+        The same graph as `Node` objects in a `Graph`, undirected in both the `edges` and the `connections`
+        """
+        if self._objects is None:
+            from graph_algos.dfs import Graph, Node
+
+            nodes = [Node(vertex) for vertex in range(self.graph.vertex_count)]
+            for vertex in range(self.graph.vertex_count):
+                for neighbor, weight in self.graph.weighted_neighbors(vertex):
+                    if vertex < neighbor:
+                        nodes[vertex].add_edge(nodes[neighbor], weight)
+                        nodes[vertex].connect(nodes[neighbor])
+                        nodes[neighbor].connect(nodes[vertex])
+            self._objects = Graph()
+            self._objects.insert_vertexes(nodes)
+        return self._objects
+
+
+class Case:
+    def __init__(self, name: str, prepare: Callable[[Workload], Optional[Callable[[], Any]]],
+                 max_edges: Optional[int] = None):
+        """
+        :param name: The name in the report
+        :param prepare: Does the untimed setup and returns the call to time, or None if the case does not apply
+        :param max_edges: Skip graphs larger than this, for engines that are too slow to be useful there
+        """
+        self.name = name
+        self.prepare = prepare
+        self.max_edges = max_edges
+
+
+def _graph_method(name: str) -> Callable[[Workload], Callable[[], Any]]:
+    def prepare(work: Workload) -> Callable[[], Any]:
+        graph = work.objects
+        source, target = graph.vertices[work.source], graph.vertices[work.target]
+        graph.to_csr(True), graph.to_csr(False)  # compiled ahead, `Graph.to_csr` is timed on its own
+        return {
+            'Graph.bfs': lambda: graph.bfs(source, None),
+            'Graph.dfs': lambda: graph.dfs(source, None),
+            'Graph.dijkstras': lambda: graph.dijkstras(source),
+            'Graph.prims': lambda: graph.prims(),
+        }[name]
+    return prepare
+
+
+def _to_csr(work: Workload) -> Callable[[], Any]:
+    graph = work.objects
+
+    def run():
+        graph.touch()  # forces a recompile
+        return graph.to_csr()
+    return run
+
+
+def _contraction_query(work: Workload) -> Optional[Callable[[], Any]]:
+    if work.family not in ('grid', 'road_like'):  # contracting random and power law graphs never finishes
+        return None
+    hierarchy = ContractionHierarchy.build(work.graph)
+    return lambda: hierarchy.query(work.source, work.target)
+
+
+def _landmark_query(work: Workload) -> Callable[[], Any]:
+    index = LandmarkIndex.build(work.graph)
+    return lambda: index.query(work.source, work.target)
+
+
+OBJECT_LIMIT = 10 ** 5  # the `Node` object model is only built up to this many edges
+
+CASES: Dict[str, Case] = {case.name: case for case in [
+    Case('bfs', lambda w: lambda: traversal.bfs(w.graph, w.source)),
+    Case('bfs_level_synchronous', lambda w: lambda: traversal.frontier_bfs(w.graph, w.source)),
+    Case('bfs_direction_optimizing', lambda w: lambda: traversal.frontier_bfs(w.graph, w.source,
+                                                                               direction_optimizing=True)),
+    Case('dfs', lambda w: lambda: traversal.dfs(w.graph, w.source)),
+    Case('dijkstra', lambda w: lambda: dijkstra(w.graph, [w.source])),
+    Case('dial', lambda w: (lambda: dial(w.graph, [w.source])) if w.graph.max_integer_weight() is not None else None),
+    Case('delta_stepping', lambda w: lambda: delta_stepping(w.graph, [w.source], workers=1)),
+    Case('bidirectional_dijkstra', lambda w: lambda: bidirectional_dijkstra(w.graph, w.source, w.target)),
+    Case('k_shortest_paths', lambda w: lambda: list(itertools.islice(k_shortest_paths(w.graph, w.source, w.target), 10)),
+         max_edges=10 ** 6),
+    Case('landmark_query', _landmark_query, max_edges=10 ** 6),
+    Case('contraction_query', _contraction_query, max_edges=10 ** 5),
+    Case('prim', lambda w: lambda: prim(w.graph)),
+    Case('kruskal', lambda w: lambda: kruskal_csr(w.graph)),
+    Case('connected_components', lambda w: lambda: connected_components(w.graph)),
+    Case('strongly_connected_components', lambda w: lambda: strongly_connected_components(w.graph)),
+    Case('pagerank', lambda w: lambda: pagerank(w.graph)),
+    Case('Graph.to_csr', _to_csr, max_edges=OBJECT_LIMIT),
+    Case('Graph.bfs', _graph_method('Graph.bfs'), max_edges=OBJECT_LIMIT),
+    Case('Graph.dfs', _graph_method('Graph.dfs'), max_edges=OBJECT_LIMIT),
+    Case('Graph.dijkstras', _graph_method('Graph.dijkstras'), max_edges=OBJECT_LIMIT),
+    Case('Graph.prims', _graph_method('Graph.prims'), max_edges=OBJECT_LIMIT),
+]}
+
+
+def measure(run: Callable[[], Any], repeat: int) -> Tuple[float, float, int]:
+    """
+    :param run: The call to time
+    :param repeat: How many timed runs
+    :return: The fastest and the median seconds, and the peak bytes allocated during one more run
+    """
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - began)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak
+
+
+def run_suite(families: List[str], sizes: List[int], cases: List[str], repeat: int = 3, seed: int = 0,
+              log: Callable[[str], None] = print) -> dict:
+    """
+    Generates every family at every size and times every case on it
+
+    :param families: Keys of `generators.FAMILIES`
+    :param sizes: Rough undirected edge counts
+    :param cases: Keys of CASES
+    :param repeat: Timed runs per case
+    :param seed: The generator seed
+    :param log: Called with a line of progress per case
+    :return: The report, ready for `json.dump`
+    """
+    results = []
+    for family in families:
+        for edges in sizes:
+            began = time.perf_counter()
+            work = Workload(family, edges, generate(family, edges, seed))
+            log('{} {}: {} vertices, {} stored edges, generated in {:.2f}s'.format(
+                family, edges, work.graph.vertex_count, work.graph.edge_count, time.perf_counter() - began))
+            for name in cases:
+                case = CASES[name]
+                if case.max_edges is not None and edges > case.max_edges:
+                    continue
+                run = case.prepare(work)
+                if run is None:
+                    continue
+                fastest, median, peak = measure(run, repeat)
+                log('  {:<30} {:>10.4f}s {:>10.4f}s {:>12} bytes'.format(name, fastest, median, peak))
+                results.append({
+                    'family': family, 'edges': edges, 'case': name,
+                    'vertices': work.graph.vertex_count, 'stored_edges': work.graph.edge_count,
+                    'seconds_min': fastest, 'seconds_median': median, 'peak_bytes': peak,
+                })
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': None if np is None else np.__version__,
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES), choices=list(FAMILIES))
+    parser.add_argument('--sizes', nargs='+', default=['1e3', '1e4', '1e5'],
+                        help='Rough undirected edge counts, e.g. 1e3 1e5 1e7')
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_output.json', help='Where to write the report')
+    parser.add_argument('--baseline', help='A stored report to diff against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative growth that counts as a regression')
+    arguments = parser.parse_args(argv)
+
+    sizes = [int(float(size)) for size in arguments.sizes]
+    result = run_suite(arguments.families, sizes, arguments.cases, arguments.repeat, arguments.seed)
+    with open(arguments.output, 'w') as file:
+        json.dump(result, file, indent=2)
+    if arguments.baseline is None:
+        return 0
+    with open(arguments.baseline, 'r') as file:
+        baseline = json.load(file)
+    return 1 if report(compare(baseline, result, arguments.threshold), baseline, result) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
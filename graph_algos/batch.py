@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from graph_algos.csr import CSRGraph, typecode_of
+from graph_algos.shortest_paths import dijkstra
+
+Layout = List[Tuple[str, str, int]]  # (shared memory block name, typecode, length) of offsets, targets, weights
+
+
+class SharedCSR:
+    """
+    Copies the offsets / targets / weights buffers of a CSRGraph into `multiprocessing.shared_memory` blocks once,
+    so any number of worker processes can attach to the same physical pages instead of each unpickling its own
+    copy of the graph
+    """
+
+    def __init__(self, graph: CSRGraph):
+        """
+        :param graph: The graph to publish
+        """
+        self.blocks: List[SharedMemory] = []
+        self.layout: Layout = []
+        for buffer in (graph.offsets, graph.targets, graph.weights):
+            size = len(buffer) * buffer.itemsize
+            block = SharedMemory(create=True, size=max(size, 1))  # zero sized blocks are not allowed
+            block.buf[:size] = memoryview(buffer).cast('B')
+            self.blocks.append(block)
+            self.layout.append((block.name, typecode_of(buffer), len(buffer)))
+
+    def release(self) -> None:
+        """
+        Closes and removes the blocks, attached workers must be done with them
+        """
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self) -> SharedCSR:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+def attach(layout: Layout) -> Tuple[List[SharedMemory], CSRGraph]:
+    """
+    Maps the blocks described by a SharedCSR layout into this process, without copying them
+
+    :param layout: `SharedCSR.layout`
+    :return: The attached blocks (keep them alive as long as the graph is used) and the graph over them
+    """
+    blocks, views = [], []
+    for name, typecode, length in layout:
+        block = SharedMemory(name=name)
+        blocks.append(block)
+        views.append(block.buf[:length * array(typecode).itemsize].cast(typecode))
+    return blocks, CSRGraph(*views)
+
+
+_worker_blocks: List[SharedMemory] = []
+_worker_graph: Optional[CSRGraph] = None
+
+
+def _attach_worker(layout: Layout) -> None:
+    global _worker_blocks, _worker_graph
+    _worker_blocks, _worker_graph = attach(layout)
+
+
+def _run_sources(sources: Sequence[int], targets: Optional[Sequence[int]],
+                 aggregate: Optional[Callable[[int, array], Any]]) -> List[Tuple[int, Any]]:
+    results = []
+    for source in sources:
+        distance = dijkstra(_worker_graph, [source]).distance
+        if targets is not None:
+            distance = array('d', [distance[target] for target in targets])
+        results.append((source, distance if aggregate is None else aggregate(source, distance)))
+    return results
+
+
+def batch_shortest_paths(graph: CSRGraph, sources: Optional[Iterable[int]] = None,
+                         targets: Optional[Sequence[int]] = None,
+                         aggregate: Optional[Callable[[int, array], Any]] = None,
+                         workers: Optional[int] = None, chunk_size: int = 16) -> Iterator[Tuple[int, Any]]:
+    """
+    Runs one Dijkstra per source on a process pool, every worker reading the same shared memory copy of the graph.
+    Results stream back chunk by chunk as soon as they are ready, so they come in completion order, not in the
+    order of `sources`. Closing the generator early (or breaking out of a loop over it) cancels the chunks no
+    worker has started, and releases the shared memory as soon as the running ones finish.
+
+    :param graph: The CSRGraph to search
+    :param sources: The vertices to run from, every vertex when None
+    :param targets: Only keep the distances to these vertices (e.g. the hubs of a hub to hub table), every vertex
+    when None
+    :param aggregate: Reduces a source and its distance row to something smaller inside the worker, e.g. the sum of
+    the finite distances. Must be picklable (a module level function)
+    :param workers: The number of worker processes, defaults to the CPU count
+    :param chunk_size: How many sources a worker handles per task
+    :return: (source, distance row or aggregate) pairs
+    """
+    sources = list(range(graph.vertex_count) if sources is None else sources)
+    targets = None if targets is None else list(targets)
+    with SharedCSR(graph) as shared:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker, initargs=(shared.layout,))
+        try:
+            futures = [pool.submit(_run_sources, sources[start:start + chunk_size], targets, aggregate)
+                       for start in range(0, len(sources), chunk_size)]
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:  # a consumer that stops early must not wait for every submitted chunk
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def distance_table(graph: CSRGraph, sources: Sequence[int], targets: Optional[Sequence[int]] = None,
+                   workers: Optional[int] = None) -> List[array]:
+    """
+    All pairs distances between two vertex sets, computed in parallel
+
+    :param graph: The CSRGraph to search
+    :param sources: The row vertices
+    :param targets: The column vertices, the same as `sources` when None
+    :param workers: The number of worker processes, defaults to the CPU count
+    :return: One distance row per source, in the order of `sources`
+    """
+    rows = dict(batch_shortest_paths(graph, sources, sources if targets is None else targets, workers=workers))
+    return [rows[source] for source in sources]
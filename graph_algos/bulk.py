@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from array import array
+from enum import Enum
+from itertools import repeat
+from typing import Optional, Sequence, Tuple
+
+from graph_algos.csr import index_typecode, np
+
+
+class EdgeMerge(Enum):
+    MIN = 0  # parallel edges keep the smallest weight
+    LAST = 1  # parallel edges keep the weight given last
+    SUM = 2  # parallel edges add their weights up, e.g. to accumulate counts
+
+
+def merge_edges(sources: Sequence[int], targets: Sequence[int], weights: Optional[Sequence[float]] = None,
+                merge: EdgeMerge = EdgeMerge.MIN, directed: bool = False) -> Tuple[array, array, array]:
+    """
+    Sorts an edge list by (source, target) and collapses every group of parallel edges into one
+
+    :param sources: The tail of every edge
+    :param targets: The head of every edge
+    :param weights: The weight of every edge, every edge weighs 1 when omitted
+    :param merge: How the weights of parallel edges are combined
+    :param directed: When False (u, v) and (v, u) are the same edge, and come out with source <= target
+    :return: The sources, targets and weights of the distinct edges, sorted by source then target
+    """
+    if len(sources) != len(targets) or (weights is not None and len(weights) != len(sources)):
+        raise ValueError('sources, targets and weights must have the same length')
+    if np is not None:
+        return _merge_edges_numpy(sources, targets, weights, merge, directed)
+    scale = max(max(sources, default=0), max(targets, default=0)) + 1
+    code = index_typecode(scale)
+    merged = {}  # source * scale + target -> weight, integer keys hash and sort much faster than pairs
+    for source, target, weight in zip(sources, targets, repeat(1.0) if weights is None else weights):
+        if not directed and target < source:
+            source, target = target, source
+        key = source * scale + target
+        previous = merged.get(key)
+        if previous is not None and merge == EdgeMerge.MIN:
+            weight = min(previous, weight)
+        elif previous is not None and merge == EdgeMerge.SUM:
+            weight += previous
+        merged[key] = weight
+    out_sources, out_targets, out_weights = array(code), array(code), array('d')
+    for key in sorted(merged):
+        source, target = divmod(key, scale)
+        out_sources.append(source)
+        out_targets.append(target)
+        out_weights.append(merged[key])
+    return out_sources, out_targets, out_weights
+
+
+def _merge_edges_numpy(sources, targets, weights, merge: EdgeMerge, directed: bool) -> Tuple[array, array, array]:
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    weights = np.ones(len(sources)) if weights is None else np.asarray(weights, dtype=np.float64)
+    code = index_typecode(int(max(sources.max(initial=0), targets.max(initial=0))) + 1)
+    if not len(sources):
+        return array(code), array(code), array('d')
+    if not directed:
+        sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+    order = np.lexsort((targets, sources))  # stable, parallel edges stay in input order for LAST
+    sources, targets, weights = sources[order], targets[order], weights[order]
+    boundary = np.ones(len(sources), dtype=bool)
+    boundary[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+    starts = np.flatnonzero(boundary)
+    if merge == EdgeMerge.MIN:
+        weights = np.minimum.reduceat(weights, starts)
+    elif merge == EdgeMerge.SUM:
+        weights = np.add.reduceat(weights, starts)
+    else:
+        weights = weights[np.append(starts[1:], len(sources)) - 1]
+    return (array(code, sources[starts].astype(code).tobytes()), array(code, targets[starts].astype(code).tobytes()),
+            array('d', weights.tobytes()))
+
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from graph_algos.shortest_paths import PriorityQueueKind, ShortestPaths, shortest_paths
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Graph, Node
+
+
+class CacheStats:
+    """
+    Hit / miss counters of a ShortestPathCache
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # trees dropped to stay within capacity
+        self.invalidations = 0  # times the whole cache was dropped because the graph changed
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self) -> str:
+        return 'CacheStats(hits={}, misses={}, evictions={}, invalidations={})'.format(
+            self.hits, self.misses, self.evictions, self.invalidations)
+
+
+class ShortestPathCache:
+    """
+    LRU cache of full shortest path trees, one per source. Any (source, target) query is answered from the tree of
+    its source, so a few hundred hot origins cover most traffic. Entries are tagged with `Graph.version`, which
+    `insert_vertex`, `Node.connect` and `Node.add_edge` bump, and the whole cache is dropped when it moves.
+    """
+
+    def __init__(self, graph: Graph, capacity: int = 128, max_bytes: Optional[int] = None,
+                 queue: PriorityQueueKind = PriorityQueueKind.BINARY_HEAP):
+        """
+        :param graph: The graph whose trees are cached
+        :param capacity: The most trees kept at once
+        :param max_bytes: Optionally also cap the memory held by the distance / predecessor arrays
+        :param queue: The engine used to compute missing trees
+        """
+        self.graph = graph
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.queue = queue
+        self.version = graph.version
+        self.trees: OrderedDict[int, ShortestPaths] = OrderedDict()  # least recently used first
+        self.nbytes = 0
+        self.stats = CacheStats()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.trees)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.trees.clear()
+            self.nbytes = 0
+
+    def tree(self, source: Node) -> ShortestPaths:
+        """
+        The full shortest path tree of a source, computed on a miss
+
+        :param source: The source node
+        :return: The distance and predecessor arrays of every vertex
+        """
+        with self._lock:
+            # the version is read first, so the compiled view is never older than the version its trees are filed
+            # under. A mutation in between only files them under a version that is already stale
+            version = self.graph.version
+            graph = self.graph.to_csr()
+            vertex = graph.vertex_of(source)
+            if self.version != version:
+                self.trees.clear()
+                self.nbytes = 0
+                self.version = version
+                self.stats.invalidations += 1
+            cached = self.trees.get(vertex)
+            if cached is not None:
+                self.trees.move_to_end(vertex)
+                self.stats.hits += 1
+                return cached
+            self.stats.misses += 1
+            version = self.version
+        result = shortest_paths(graph, [vertex], None, self.queue)  # searched outside the lock
+        with self._lock:
+            if version == self.version and vertex not in self.trees:
+                self.trees[vertex] = result
+                self.nbytes += _size(result)
+                self._evict()
+        return result
+
+    def route(self, source: Node, target: Node) -> Tuple[float, List[Node]]:
+        """
+        :param source: The node the route starts at
+        :param target: The node the route ends at
+        :return: The length of the shortest route and its nodes, (inf, []) if `target` is unreachable
+        """
+        tree = self.tree(source)
+        return tree.distance_to(target), tree.path_to(target)
+
+    def _evict(self) -> None:
+        while self.trees and (len(self.trees) > self.capacity or
+                              (self.max_bytes is not None and self.nbytes > self.max_bytes and len(self.trees) > 1)):
+            _, evicted = self.trees.popitem(last=False)
+            self.nbytes -= _size(evicted)
+            self.stats.evictions += 1
+
+
+def _size(tree: ShortestPaths) -> int:
+    return len(tree.distance) * tree.distance.itemsize + len(tree.predecessor) * tree.predecessor.itemsize
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from array import array
+from time import perf_counter
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from graph_algos.csr import CSRGraph, as_numpy, np
+from graph_algos.shortest_paths import dijkstra
+from graph_algos.traversal import frontier_bfs
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Node
+
+
+class Ranking:
+    """
+    The result of a PageRank run: one score per vertex plus how the iteration went
+    """
+
+    def __init__(self, graph: CSRGraph, scores: array, residuals: List[float], timings: List[float], converged: bool):
+        """
+        :param graph: The CSRGraph that was ranked
+        :param scores: The score of every vertex, summing to 1
+        :param residuals: The L1 change of the vector after every iteration
+        :param timings: The seconds every iteration took
+        :param converged: Whether the last residual fell below the tolerance
+        """
+        self.graph = graph
+        self.scores = scores
+        self.residuals = residuals
+        self.timings = timings
+        self.converged = converged
+
+    @property
+    def iterations(self) -> int:
+        return len(self.residuals)
+
+    def score_of(self, node: Node | int) -> float:
+        return self.scores[self.graph.vertex_of(node)]
+
+    def top(self, count: int = 10) -> List[Tuple[Node | int, float]]:
+        """
+        :param count: How many vertices to return
+        :return: The highest scoring nodes (or vertex indices) and their scores, best first
+        """
+        best = sorted(range(len(self.scores)), key=self.scores.__getitem__, reverse=True)[:count]
+        return [(self.graph.node_of(vertex), self.scores[vertex]) for vertex in best]
+
+
+def pagerank(graph: CSRGraph, damping: float = 0.85, tolerance: float = 1e-6, max_iterations: int = 100,
+             personalization: Optional[Sequence[float]] = None, start: Optional[Sequence[float]] = None,
+             by_weight: bool = False) -> Ranking:
+    """
+    PageRank by power iteration, every step one sparse matrix-vector product over the CSR buffers (a `bincount`
+    over the edge list with NumPy). Rank held by vertices without out-edges is handed back through the
+    personalization vector, so the scores always sum to 1.
+
+    :param graph: The directed CSRGraph to rank
+    :param damping: The probability of following an edge rather than teleporting
+    :param tolerance: Stop once the L1 change of the vector drops below this
+    :param max_iterations: Stop after this many iterations regardless
+    :param personalization: Where teleports land, one non-negative weight per vertex (normalized here), uniform when
+    None
+    :param start: A previous score vector to warm start from, e.g. `Ranking.scores` before the graph changed a little
+    :param by_weight: Split every vertex's rank over its out-edges in proportion to their weights instead of evenly
+    :return: The scores, residuals and per-iteration timings
+    """
+    n = graph.vertex_count
+    if n == 0:
+        return Ranking(graph, array('d'), [], [], True)
+    teleport = _normalized(personalization, n)
+    rank = _normalized(start, n) if start is not None else list(teleport)
+    if np is not None:
+        return _pagerank_numpy(graph, damping, tolerance, max_iterations, teleport, rank, by_weight)
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    out_weight = [sum(weights[offsets[v]:offsets[v + 1]]) if by_weight else offsets[v + 1] - offsets[v]
+                  for v in range(n)]
+    residuals, timings = [], []
+    for _ in range(max_iterations):
+        began = perf_counter()
+        spread = [0.0] * n
+        dangling = 0.0
+        for vertex in range(n):
+            if out_weight[vertex] == 0:
+                dangling += rank[vertex]
+                continue
+            share = rank[vertex] / out_weight[vertex]
+            for slot in range(offsets[vertex], offsets[vertex + 1]):
+                spread[targets[slot]] += share * weights[slot] if by_weight else share
+        updated = [damping * (spread[v] + dangling * teleport[v]) + (1 - damping) * teleport[v] for v in range(n)]
+        residuals.append(sum(abs(updated[v] - rank[v]) for v in range(n)))
+        rank = updated
+        timings.append(perf_counter() - began)
+        if residuals[-1] < tolerance:
+            break
+    return Ranking(graph, array('d', rank), residuals, timings, bool(residuals) and residuals[-1] < tolerance)
+
+
+def _pagerank_numpy(graph: CSRGraph, damping: float, tolerance: float, max_iterations: int, teleport: List[float],
+                    rank: List[float], by_weight: bool) -> Ranking:
+    n = graph.vertex_count
+    offsets, targets = as_numpy(graph.offsets), as_numpy(graph.targets)
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+    teleport, rank = np.asarray(teleport), np.asarray(rank)
+    if by_weight:
+        edge_weight = as_numpy(graph.weights)
+        out_weight = np.bincount(sources, weights=edge_weight, minlength=n)
+    else:
+        edge_weight = None
+        out_weight = np.diff(offsets).astype(np.float64)
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    residuals, timings = [], []
+    for _ in range(max_iterations):
+        began = perf_counter()
+        share = (rank * inverse)[sources]
+        if edge_weight is not None:
+            share *= edge_weight
+        spread = np.bincount(targets, weights=share, minlength=n)
+        updated = damping * (spread + rank[dangling].sum() * teleport) + (1 - damping) * teleport
+        residuals.append(float(np.abs(updated - rank).sum()))
+        rank = updated
+        timings.append(perf_counter() - began)
+        if residuals[-1] < tolerance:
+            break
+    return Ranking(graph, array('d', rank.tolist()), residuals, timings, bool(residuals) and residuals[-1] < tolerance)
+
+
+def personalized_pagerank(graph: CSRGraph, seeds: Sequence[int], damping: float = 0.85, tolerance: float = 1e-6,
+                          max_iterations: int = 100, start: Optional[Sequence[float]] = None,
+                          by_weight: bool = False) -> Ranking:
+    """
+    PageRank with every teleport landing on one of the seed vertices, which scores vertices by how close they are
+    to the seeds rather than by global importance
+
+    :param seeds: The vertices teleports land on, uniformly
+    :return: The scores, residuals and per-iteration timings
+    """
+    personalization = [0.0] * graph.vertex_count
+    for seed in seeds:
+        personalization[seed] = 1.0
+    return pagerank(graph, damping, tolerance, max_iterations, personalization, start, by_weight)
+
+
+def degree_centrality(graph: CSRGraph, incoming: bool = False) -> array:
+    """
+    :param graph: The CSRGraph to score
+    :param incoming: Count in-edges instead of out-edges
+    :return: The degree of every vertex divided by |V| - 1
+    """
+    offsets = (graph.transpose() if incoming else graph).offsets
+    scale = 1.0 / (graph.vertex_count - 1) if graph.vertex_count > 1 else 0.0
+    if np is not None:
+        return array('d', (np.diff(as_numpy(offsets)) * scale).tolist())
+    return array('d', [(offsets[v + 1] - offsets[v]) * scale for v in range(graph.vertex_count)])
+
+
+def closeness_centrality(graph: CSRGraph, vertices: Optional[Sequence[int]] = None, by_weight: bool = False) -> array:
+    """
+    Closeness from the distances of every vertex that can reach a vertex, scaled by the share of the graph that can
+    reach it (Wasserman and Faust) so it stays comparable on disconnected graphs. Every vertex costs one level
+    synchronous bfs (or one Dijkstra with `by_weight`) on the transposed graph.
+
+    :param graph: The CSRGraph to score
+    :param vertices: Only score these vertices, every vertex when None
+    :param by_weight: Measure distances in edge weights instead of hops
+    :return: One score per entry of `vertices` (per vertex when None)
+    """
+    n = graph.vertex_count
+    reverse = graph.transpose()
+    scores = array('d')
+    for vertex in range(n) if vertices is None else vertices:
+        if by_weight:
+            distance, unreached = dijkstra(reverse, [vertex]).distance, float('inf')
+        else:
+            distance, unreached = frontier_bfs(reverse, vertex).depth, -1
+        if np is not None:
+            reached = np.asarray(distance) != unreached
+            reached[vertex] = False
+            count, total = int(reached.sum()), float(np.asarray(distance)[reached].sum())
+        else:
+            reached = [distance[other] for other in range(n) if other != vertex and distance[other] != unreached]
+            count, total = len(reached), float(sum(reached))
+        scores.append(count / total * count / (n - 1) if total > 0 else 0.0)
+    return scores
+
+
+def _normalized(vector: Optional[Sequence[float]], n: int) -> List[float]:
+    if vector is None:
+        return [1.0 / n] * n
+    if len(vector) != n:
+        raise ValueError('Expected {} entries, got {}'.format(n, len(vector)))
+    total = float(sum(vector))
+    if total <= 0:
+        raise ValueError('The vector must have a positive sum')
+    return [value / total for value in vector]
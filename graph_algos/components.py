@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Dict, List
+
+from graph_algos.csr import CSRGraph, as_numpy, index_typecode, np
+from graph_algos.mst import DisjointSet
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Graph, Node
+
+
+class Components:
+    """
+    A partition of the vertices of a CSRGraph into components numbered 0..count - 1: `connected_components` numbers
+    them in the order of their lowest vertex, `strongly_connected_components` in topological order.
+    """
+
+    def __init__(self, graph: CSRGraph, ids: array, sizes: array):
+        """
+        :param graph: The CSRGraph the components were computed on
+        :param ids: The component of every vertex
+        :param sizes: The number of vertices in every component
+        """
+        self.graph = graph
+        self.ids = ids
+        self.sizes = sizes
+
+    @property
+    def count(self) -> int:
+        return len(self.sizes)
+
+    def component_of(self, node: Node | int) -> int:
+        return self.ids[self.graph.vertex_of(node)]
+
+    def connected(self, first: Node | int, second: Node | int) -> bool:
+        return self.component_of(first) == self.component_of(second)
+
+    def members(self, component: int) -> List[Node | int]:
+        return [self.graph.node_of(vertex) for vertex in range(self.graph.vertex_count)
+                if self.ids[vertex] == component]
+
+
+def connected_components(graph: CSRGraph) -> Components:
+    """
+    Labels every vertex with its component in one pass over all edges: min-label propagation with pointer jumping
+    when NumPy is installed, O(log n) vectorized rounds on most graphs, union-find over the edge list otherwise
+
+    :param graph: The CSRGraph to split, directed edges count as undirected (weak connectivity)
+    :return: The component ids and sizes
+    """
+    if np is not None:
+        return _relabel_numpy(graph, _propagate(graph))
+    sets = DisjointSet(graph.vertex_count)
+    offsets, targets = graph.offsets, graph.targets
+    for vertex in range(graph.vertex_count):
+        for i in range(offsets[vertex], offsets[vertex + 1]):
+            sets.union(vertex, targets[i])
+    ids = array(index_typecode(graph.vertex_count), [0]) * graph.vertex_count
+    sizes = array('q')
+    numbering: Dict[int, int] = {}
+    for vertex in range(graph.vertex_count):
+        root = sets.find(vertex)
+        component = numbering.get(root)
+        if component is None:
+            component = numbering[root] = len(sizes)
+            sizes.append(0)
+        ids[vertex] = component
+        sizes[component] += 1
+    return Components(graph, ids, sizes)
+
+
+def _propagate(graph: CSRGraph):
+    """
+    Every vertex ends up labelled with the lowest vertex of its component. Each round hooks the root label of one
+    endpoint of every edge under the other's, then jumps pointers until every label is a root.
+    """
+    label = np.arange(graph.vertex_count, dtype=np.int64)
+    sources = np.repeat(label, np.diff(as_numpy(graph.offsets)))
+    targets = as_numpy(graph.targets).astype(np.int64)
+    while True:
+        before = label.copy()
+        source_labels, target_labels = label[sources], label[targets]
+        np.minimum.at(label, source_labels, target_labels)
+        np.minimum.at(label, target_labels, source_labels)
+        while True:
+            jumped = label[label]
+            if np.array_equal(jumped, label):
+                break
+            label = jumped
+        if np.array_equal(label, before):
+            return label
+
+
+def _relabel_numpy(graph: CSRGraph, label) -> Components:
+    # the labels are component minima, so sorted unique labels are already in order of each component's lowest vertex
+    _, inverse, counts = np.unique(label, return_inverse=True, return_counts=True)
+    ids = array(index_typecode(graph.vertex_count), [0]) * graph.vertex_count
+    as_numpy(ids)[:] = inverse.reshape(-1)
+    return Components(graph, ids, array('q', counts.tolist()))
+
+
+class IncrementalComponents:
+    """
+    Connectivity of a Graph that follows it as it grows. The components are computed once, then every
+    `Node.add_edge` / `Node.connect` seen through `Graph.edge_listeners` is a single union, so `connected` and
+    `size_of` answer in amortized O(α(n)) without traversing anything.
+
+    Vertices inserted later start out as components of their own.
+    """
+
+    def __init__(self, graph: Graph, weighted: bool = True):
+        """
+        :param graph: The graph to follow
+        :param weighted: Follow the `edges` lists when True, the `connections` lists when False
+        """
+        self.graph = graph
+        self.weighted = weighted
+        compiled = graph.to_csr(weighted)
+        components = connected_components(compiled)
+        self.index: Dict[Node, int] = {}
+        self._placeholders = 0  # `None` and repeated entries of `Graph.vertices`, singletons that are not nodes
+        for vertex in range(compiled.vertex_count):
+            node = compiled.node_of(vertex)
+            if node is None or node in self.index:
+                self._placeholders += 1
+            else:
+                self.index[node] = vertex
+        self.sets = DisjointSet(compiled.vertex_count)
+        representative = array('q', [-1]) * components.count
+        for vertex in range(compiled.vertex_count):
+            component = components.ids[vertex]
+            if representative[component] < 0:
+                representative[component] = vertex
+            else:
+                self.sets.union(representative[component], vertex)
+        self.sizes = array('q', [components.sizes[components.ids[vertex]] for vertex in range(compiled.vertex_count)])
+        self._inserted = len(graph.vertices)  # `Graph.vertices` already accounted for
+        graph.edge_listeners.append(self._edge_changed)
+
+    def detach(self) -> None:
+        """
+        Stops following the graph
+        """
+        if self._edge_changed in self.graph.edge_listeners:
+            self.graph.edge_listeners.remove(self._edge_changed)
+
+    @property
+    def count(self) -> int:
+        """
+        The number of components
+        """
+        for node in self.graph.vertices[self._inserted:]:  # vertices inserted since, possibly without any edge
+            if node is not None:
+                self._vertex(node)
+        self._inserted = len(self.graph.vertices)
+        return self.sets.sets - self._placeholders
+
+    def connected(self, first: Node, second: Node) -> bool:
+        return first is second or self.sets.connected(self._vertex(first), self._vertex(second))
+
+    def size_of(self, node: Node) -> int:
+        """
+        :return: The number of nodes in the component of `node`
+        """
+        return self.sizes[self.sets.find(self._vertex(node))]
+
+    def _vertex(self, node: Node) -> int:
+        vertex = self.index.get(node)
+        if vertex is None:
+            vertex = self.index[node] = self.sets.add()
+            self.sizes.append(1)
+        return vertex
+
+    def _edge_changed(self, tail: Node, head: Node, distance) -> None:
+        if (distance is None) == self.weighted:  # an edge of the other adjacency view
+            return
+        if self.weighted and not any(edge.node is head for edge in tail.edges):  # nothing to join
+            return
+        first, second = self.sets.find(self._vertex(tail)), self.sets.find(self._vertex(head))
+        if self.sets.union(first, second):
+            self.sizes[self.sets.find(first)] = self.sizes[first] + self.sizes[second]
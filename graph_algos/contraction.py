@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import heapq
+import struct
+from array import array
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional, Tuple
+
+from graph_algos.csr import NO_VERTEX, CSRGraph, byte_order, filled_array, index_typecode
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Node
+
+MAGIC = b'GACH'
+FORMAT_VERSION = 2  # 2 added the byte order
+# magic, format version, byte order, vertex count, upward edge count, downward edge count
+HEADER = struct.Struct('<4sIIqqq')
+
+Overlay = List[Dict[int, Tuple[float, int]]]  # per vertex: neighbor -> (weight, middle vertex or NO_VERTEX)
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over a static weighted graph. Vertices are contracted one by one in order of importance;
+    every time a vertex is removed, shortcut edges keep the distances between its remaining neighbors intact. A
+    query then only searches upward in the order from both ends, which settles a tiny fraction of the graph.
+
+    Edges leaving a vertex towards a more important one live in `up`. Edges entering a vertex from a more important
+    one are stored reversed in `down`, so the backward search from the target also walks upward. `up_middle` and
+    `down_middle` hold the contracted vertex a shortcut bypasses, NO_VERTEX for original edges.
+    """
+
+    def __init__(self, rank: array, up: CSRGraph, up_middle: array, down: CSRGraph, down_middle: array):
+        self.rank = rank
+        self.up = up
+        self.up_middle = up_middle
+        self.down = down
+        self.down_middle = down_middle
+
+    @property
+    def shortcut_count(self) -> int:
+        return sum(1 for middle in self.up_middle if middle != NO_VERTEX) + \
+            sum(1 for middle in self.down_middle if middle != NO_VERTEX)
+
+    @staticmethod
+    def build(graph: CSRGraph, witness_limit: int = 500) -> ContractionHierarchy:
+        """
+        Contracts every vertex, least important first. Importance is the edge difference (shortcuts added minus
+        edges removed) plus the number of already contracted neighbors, kept up to date lazily: a popped vertex is
+        re-evaluated and pushed back if it is no longer the minimum.
+
+        :param graph: The CSRGraph to preprocess, weights must be non-negative
+        :param witness_limit: How many vertices a witness search may settle before giving up and adding the shortcut,
+        lower is faster to build but adds superfluous shortcuts
+        :return: The hierarchy
+        """
+        vertex_count = graph.vertex_count
+        outgoing: Overlay = [{} for _ in range(vertex_count)]
+        incoming: Overlay = [{} for _ in range(vertex_count)]
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        for vertex in range(vertex_count):
+            for slot in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor, weight = targets[slot], weights[slot]
+                if neighbor != vertex and weight < outgoing[vertex].get(neighbor, (float('inf'),))[0]:
+                    outgoing[vertex][neighbor] = (weight, NO_VERTEX)  # parallel edges collapse to the lightest
+                    incoming[neighbor][vertex] = (weight, NO_VERTEX)
+
+        contracted_neighbors = filled_array(index_typecode(vertex_count), 0, vertex_count)
+        rank = filled_array('q', NO_VERTEX, vertex_count)
+        up_edges: List[Tuple[int, int, float, int]] = []
+        down_edges: List[Tuple[int, int, float, int]] = []
+
+        def evaluate(vertex: int) -> Tuple[int, List[Tuple[int, int, float]]]:
+            shortcuts = _shortcuts(outgoing, incoming, vertex, witness_limit)
+            importance = len(shortcuts) - len(incoming[vertex]) - len(outgoing[vertex]) + contracted_neighbors[vertex]
+            return importance, shortcuts
+
+        heap = [(evaluate(vertex)[0], vertex) for vertex in range(vertex_count)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            _, vertex = heapq.heappop(heap)
+            importance, shortcuts = evaluate(vertex)
+            if heap and importance > heap[0][0]:
+                heapq.heappush(heap, (importance, vertex))
+                continue
+            for source, target, weight in shortcuts:
+                if weight < outgoing[source].get(target, (float('inf'),))[0]:
+                    outgoing[source][target] = (weight, vertex)
+                    incoming[target][source] = (weight, vertex)
+            for target, (weight, middle) in outgoing[vertex].items():  # every remaining neighbor ranks higher
+                up_edges.append((vertex, target, weight, middle))
+                del incoming[target][vertex]
+                contracted_neighbors[target] += 1
+            for source, (weight, middle) in incoming[vertex].items():
+                down_edges.append((vertex, source, weight, middle))
+                del outgoing[source][vertex]
+                contracted_neighbors[source] += 1
+            outgoing[vertex], incoming[vertex] = {}, {}
+            rank[vertex] = order
+            order += 1
+
+        up, up_middle = _compile(vertex_count, up_edges, graph.nodes)
+        down, down_middle = _compile(vertex_count, down_edges, graph.nodes)
+        return ContractionHierarchy(rank, up, up_middle, down, down_middle)
+
+    def query(self, source: Node | int, target: Node | int) -> Tuple[float, List[int]]:
+        """
+        Bidirectional upward Dijkstra. Each side stops once its queue top reaches the best route found so far, the
+        route is then unpacked into original edges.
+
+        :param source: The node (or vertex) the route starts at
+        :param target: The node (or vertex) the route ends at
+        :return: The length of the shortest route and its vertices, (inf, []) if the target is unreachable
+        """
+        source, target = self.up.vertex_of(source), self.up.vertex_of(target)
+        sides = [(self.up, {source: 0.0}, {source: (NO_VERTEX, NO_VERTEX)}, [(0.0, source)], self.up_middle),
+                 (self.down, {target: 0.0}, {target: (NO_VERTEX, NO_VERTEX)}, [(0.0, target)], self.down_middle)]
+        best, meet = float('inf'), NO_VERTEX
+        while True:
+            open_sides = [side for side in (0, 1) if sides[side][3] and sides[side][3][0][0] < best]
+            if not open_sides:
+                break
+            side = min(open_sides, key=lambda index: sides[index][3][0][0])
+            graph, distance, parent, heap, middles = sides[side]
+            dist, vertex = heapq.heappop(heap)
+            if dist > distance[vertex]:  # stale entry
+                continue
+            other = sides[1 - side][1].get(vertex)
+            if other is not None and dist + other < best:
+                best, meet = dist + other, vertex
+            for slot in range(graph.offsets[vertex], graph.offsets[vertex + 1]):
+                neighbor = graph.targets[slot]
+                candidate = dist + graph.weights[slot]
+                if candidate < distance.get(neighbor, float('inf')):
+                    distance[neighbor] = candidate
+                    parent[neighbor] = (vertex, middles[slot])
+                    heapq.heappush(heap, (candidate, neighbor))
+        if meet == NO_VERTEX:
+            return float('inf'), []
+
+        vertex = meet
+        forward: List[Tuple[int, int, int]] = []
+        while sides[0][2][vertex][0] != NO_VERTEX:
+            previous, middle = sides[0][2][vertex]
+            forward.append((previous, vertex, middle))
+            vertex = previous
+        path = [source]
+        for tail, head, middle in reversed(forward):
+            path.extend(self._unpack(tail, head, middle))
+        vertex = meet
+        while sides[1][2][vertex][0] != NO_VERTEX:
+            following, middle = sides[1][2][vertex]  # the original edge runs vertex -> following
+            path.extend(self._unpack(vertex, following, middle))
+            vertex = following
+        return best, path
+
+    def distance(self, source: Node | int, target: Node | int) -> float:
+        return self.query(source, target)[0]
+
+    def route(self, source: Node | int, target: Node | int) -> Tuple[float, List[Node | int]]:
+        distance, path = self.query(source, target)
+        return distance, [self.up.node_of(vertex) for vertex in path]
+
+    def _middle(self, tail: int, head: int) -> int:
+        """
+        The vertex the edge tail -> head bypasses, looked up in whichever side stores that edge
+        """
+        if self.rank[tail] < self.rank[head]:
+            graph, row, other, middles = self.up, tail, head, self.up_middle
+        else:
+            graph, row, other, middles = self.down, head, tail, self.down_middle
+        best_slot, best_weight = NO_VERTEX, float('inf')
+        for slot in range(graph.offsets[row], graph.offsets[row + 1]):
+            if graph.targets[slot] == other and graph.weights[slot] < best_weight:
+                best_slot, best_weight = slot, graph.weights[slot]
+        return middles[best_slot]
+
+    def _unpack(self, tail: int, head: int, middle: int) -> List[int]:
+        """
+        Expands an edge into the original vertices it stands for, iteratively so deep shortcut chains are fine
+
+        :return: The vertices after `tail`, up to and including `head`
+        """
+        vertices = []
+        stack = [(tail, head, middle)]
+        while stack:
+            tail, head, middle = stack.pop()
+            if middle == NO_VERTEX:
+                vertices.append(head)
+            else:  # the first half is pushed last so it is expanded first
+                stack.append((middle, head, self._middle(middle, head)))
+                stack.append((tail, middle, self._middle(tail, middle)))
+        return vertices
+
+    def save(self, path: str) -> None:
+        """
+        Writes the hierarchy to a binary file: a fixed header, the ranks, then the buffers of both sides in this
+        machine's byte order, which the header records
+
+        :param path: The file to write
+        """
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, byte_order(), len(self.rank), self.up.edge_count,
+                                   self.down.edge_count))
+            for buffer in (self.rank, self.up.offsets, self.up.targets, self.up.weights, self.up_middle,
+                           self.down.offsets, self.down.targets, self.down.weights, self.down_middle):
+                buffer.tofile(file)
+
+    @staticmethod
+    def load(path: str, nodes: Optional[List[Node]] = None) -> ContractionHierarchy:
+        """
+        Reads a hierarchy written by `save`, on a machine of either byte order
+
+        :param path: The file to read
+        :param nodes: Optionally the nodes the vertex indices stand for, e.g. `graph.to_csr().nodes`
+        :return: The loaded hierarchy
+        """
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError('{} is not a contraction hierarchy'.format(path))
+            magic, version, order, vertex_count, up_count, down_count = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION or order not in (1, 2):
+                raise ValueError('{} is not a contraction hierarchy this version can read'.format(path))
+            swap = order != byte_order()
+            rank = _read(file, path, 'q', vertex_count, swap)
+            sides = []
+            for edge_count in (up_count, down_count):
+                offsets = _read(file, path, 'q', vertex_count + 1, swap)
+                targets = _read(file, path, 'q', edge_count, swap)
+                weights = _read(file, path, 'd', edge_count, swap)
+                middle = _read(file, path, 'q', edge_count, swap)
+                sides.append((CSRGraph(offsets, targets, weights, nodes), middle))
+        return ContractionHierarchy(rank, sides[0][0], sides[0][1], sides[1][0], sides[1][1])
+
+
+def _shortcuts(outgoing: Overlay, incoming: Overlay, vertex: int, witness_limit: int) -> List[Tuple[int, int, float]]:
+    """
+    The shortcuts contracting `vertex` would need: u -> w for every remaining in-neighbor u and out-neighbor w whose
+    path through `vertex` is shorter than any witness path around it
+    """
+    shortcuts = []
+    for source, (in_weight, _) in incoming[vertex].items():
+        needed = {target: in_weight + out_weight for target, (out_weight, _) in outgoing[vertex].items()
+                  if target != source}
+        if not needed:
+            continue
+        witness = _witness_search(outgoing, source, vertex, max(needed.values()), needed, witness_limit)
+        for target, weight in needed.items():
+            if witness.get(target, float('inf')) > weight:
+                shortcuts.append((source, target, weight))
+    return shortcuts
+
+
+def _witness_search(outgoing: Overlay, source: int, avoid: int, limit: float, needed: Dict[int, float],
+                    witness_limit: int) -> Dict[int, float]:
+    """
+    Local Dijkstra from `source` that never passes through `avoid`, bounded by distance and by settled vertices
+    """
+    distance = {source: 0.0}
+    heap = [(0.0, source)]
+    settled = 0
+    remaining = len(needed)
+    while heap and settled < witness_limit and remaining:
+        dist, vertex = heapq.heappop(heap)
+        if dist > distance[vertex]:
+            continue
+        if dist > limit:
+            break
+        settled += 1
+        if vertex in needed:
+            remaining -= 1
+        for neighbor, (weight, _) in outgoing[vertex].items():
+            if neighbor == avoid:
+                continue
+            candidate = dist + weight
+            if candidate < distance.get(neighbor, float('inf')):
+                distance[neighbor] = candidate
+                heapq.heappush(heap, (candidate, neighbor))
+    return distance
+
+
+def _compile(vertex_count: int, edges: List[Tuple[int, int, float, int]],
+             nodes: List[Node]) -> Tuple[CSRGraph, array]:
+    """
+    Packs (row, target, weight, middle) edges into a CSRGraph plus a parallel array of middle vertices
+    """
+    edges.sort(key=lambda edge: edge[0])
+    offsets = filled_array('q', 0, vertex_count + 1)
+    for row, _, _, _ in edges:
+        offsets[row + 1] += 1
+    for vertex in range(vertex_count):
+        offsets[vertex + 1] += offsets[vertex]
+    targets = array('q', [edge[1] for edge in edges])
+    weights = array('d', [edge[2] for edge in edges])
+    middle = array('q', [edge[3] for edge in edges])
+    return CSRGraph(offsets, targets, weights, nodes), middle
+
+
+def _read(file: BinaryIO, path: str, typecode: str, length: int, swap: bool) -> array:
+    buffer = array(typecode)
+    try:
+        buffer.fromfile(file, length)
+    except EOFError:
+        raise ValueError('{} is truncated'.format(path)) from None
+    if swap:  # written on a machine of the other byte order
+        buffer.byteswap()
+    return buffer
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, every engine has a pure Python path
+    np = None
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Node
+
+NO_VERTEX = -1  # sentinel stored in parent arrays for vertices that were never reached
+
+
+def index_typecode(count: int) -> str:
+    """
+    Picks the smallest array typecode that can hold every vertex index of a graph
+
+    :param count: The number of vertices (or offsets) that must be addressable
+    :return: 'i' (4 bytes) when the count fits in a signed 32 bit integer, 'q' (8 bytes) otherwise
+    """
+    return 'i' if count < 2 ** 31 else 'q'
+
+
+def filled_array(typecode: str, value, length: int) -> array:
+    """
+    Allocates an array of `length` copies of `value` in one shot
+
+    :param typecode: The array typecode
+    :param value: The value every slot starts out with
+    :param length: How many slots to allocate
+    :return: The new array
+    """
+    return array(typecode, [value]) * length
+
+
+def typecode_of(buffer: array | memoryview) -> str:
+    """
+    The element typecode of an adjacency buffer. Buffers are usually arrays, but graphs living in shared memory or
+    in a memory mapped file hold typed memoryviews instead, whose format character is the same code.
+
+    :param buffer: The array or memoryview
+    :return: Its typecode, e.g. 'i', 'q' or 'd'
+    """
+    return buffer.typecode if isinstance(buffer, array) else buffer.format
+
+
+def byte_order() -> int:
+    """
+    The byte order of this machine as the binary file headers record it: 1 for little-endian, 2 for big-endian
+    """
+    return 1 if sys.byteorder == 'little' else 2
+
+
+def as_numpy(buffer: array | memoryview):
+    """
+    Zero-copy NumPy view of an adjacency buffer, the array typecodes double as NumPy dtype characters
+
+    :param buffer: The array to view
+    :return: An ndarray sharing the buffer's memory
+    """
+    return np.frombuffer(buffer, dtype=typecode_of(buffer))
+
+
+class CSRGraph:
+    """
+    Compressed sparse row (array backed) adjacency. The neighbors of vertex `v` are
+    `targets[offsets[v]:offsets[v + 1]]`, and the weight of each of those edges sits at the same position in
+    `weights`. Vertices are plain integers, `nodes[v]` maps an index back to the `Node` it was built from.
+    """
+
+    def __init__(self, offsets: array, targets: array, weights: array, nodes: Optional[List[Node]] = None):
+        """
+        Wraps already built offset / target / weight buffers
+
+        :param offsets: vertex_count + 1 prefix sums of the out degrees
+        :param targets: edge_count neighbor indices, grouped by source vertex
+        :param weights: edge_count edge weights, aligned with `targets`
+        :param nodes: Optional list mapping every vertex index back to its `Node`
+        """
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.nodes: List[Node] = nodes if nodes is not None else []
+        self.index: Dict[Node, int] = {}
+        self._max_integer_weight: float | None = None
+        self._transpose: CSRGraph | None = None
+        for i, node in enumerate(self.nodes):
+            if node is not None:
+                self.index.setdefault(node, i)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes held by the adjacency buffers (not counting the optional `nodes` list)
+        """
+        return sum(len(buffer) * buffer.itemsize for buffer in (self.offsets, self.targets, self.weights))
+
+    def max_integer_weight(self) -> float | None:
+        """
+        The largest edge weight when every weight is a non-negative integer, computed once and cached
+
+        :return: The largest weight, or None if some weight is negative or fractional
+        """
+        if self._max_integer_weight is None:
+            largest = 0.0
+            for weight in self.weights:
+                if weight < 0 or weight != int(weight):
+                    return None
+                largest = max(largest, weight)
+            self._max_integer_weight = largest
+        return self._max_integer_weight
+
+    def transpose(self) -> CSRGraph:
+        """
+        The graph with every edge reversed (in-edges grouped by head), computed once and cached. For graphs built
+        with `Node.add_edge` this has the same adjacency as the graph itself.
+
+        :return: The reversed CSRGraph, sharing `nodes` with this one
+        """
+        if self._transpose is None:
+            offsets, targets = self.offsets, self.targets
+            if np is not None:
+                sources = np.repeat(np.arange(self.vertex_count), np.diff(as_numpy(offsets)))
+            else:
+                sources = array(typecode_of(targets))
+                for vertex in range(self.vertex_count):
+                    sources.extend(array(typecode_of(targets), [vertex]) * (offsets[vertex + 1] - offsets[vertex]))
+            self._transpose = CSRGraph.from_edges(self.vertex_count, targets, sources, self.weights, nodes=self.nodes)
+            self._transpose._transpose = self
+        return self._transpose
+
+    def degree(self, vertex: int) -> int:
+        return self.offsets[vertex + 1] - self.offsets[vertex]
+
+    def neighbors(self, vertex: int) -> array:
+        return self.targets[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def weighted_neighbors(self, vertex: int) -> Iterable[Tuple[int, float]]:
+        start, end = self.offsets[vertex], self.offsets[vertex + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    def vertex_of(self, node: Node | int) -> int:
+        """
+        Resolves a `Node` (or an already resolved index) to its vertex index
+
+        :param node: The node to look up
+        :return: The vertex index of the node
+        """
+        if isinstance(node, int):
+            return node
+        try:
+            return self.index[node]
+        except KeyError:
+            raise KeyError('Node {} is not part of this graph'.format(node.value)) from None
+
+    def node_of(self, vertex: int) -> Node | int:
+        return self.nodes[vertex] if self.nodes else vertex
+
+    @staticmethod
+    def from_edges(vertex_count: int, sources: Sequence[int], targets: Sequence[int],
+                   weights: Optional[Sequence[float]] = None, directed: bool = True,
+                   nodes: Optional[List[Node]] = None) -> CSRGraph:
+        """
+        Builds the CSR buffers straight from parallel edge arrays with a counting sort, without creating an object
+        per edge
+
+        :param vertex_count: The number of vertices, every index in `sources` / `targets` must be below it
+        :param sources: The tail of every edge
+        :param targets: The head of every edge
+        :param weights: The weight of every edge, every edge weighs 1 when omitted
+        :param directed: When False every edge is stored in both directions, like `Node.add_edge` does
+        :param nodes: Optional list mapping vertex indices back to nodes
+        :return: The built CSRGraph
+        """
+        if len(sources) != len(targets) or (weights is not None and len(weights) != len(sources)):
+            raise ValueError('sources, targets and weights must have the same length')
+        if np is not None:
+            return CSRGraph._from_edges_numpy(vertex_count, sources, targets, weights, directed, nodes)
+        edge_total = len(sources) if directed else 2 * len(sources)
+        offset_code = index_typecode(edge_total + 1)
+        offsets = filled_array(offset_code, 0, vertex_count + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        if not directed:
+            for target in targets:
+                offsets[target + 1] += 1
+        for vertex in range(vertex_count):
+            offsets[vertex + 1] += offsets[vertex]
+
+        cursor = array(offset_code, offsets[:-1])  # next free slot of every row
+        out_targets = filled_array(index_typecode(vertex_count), 0, edge_total)
+        out_weights = filled_array('d', 1.0, edge_total)
+        for i in range(len(sources)):
+            source, target = sources[i], targets[i]
+            weight = 1.0 if weights is None else weights[i]
+            slot = cursor[source]
+            out_targets[slot] = target
+            out_weights[slot] = weight
+            cursor[source] = slot + 1
+            if not directed:
+                slot = cursor[target]
+                out_targets[slot] = source
+                out_weights[slot] = weight
+                cursor[target] = slot + 1
+        return CSRGraph(offsets, out_targets, out_weights, nodes)
+
+    @staticmethod
+    def _from_edges_numpy(vertex_count: int, sources, targets, weights, directed: bool,
+                          nodes: Optional[List[Node]]) -> CSRGraph:
+        """
+        Same as `from_edges`, with the counting sort done by a stable argsort in NumPy
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.ones(len(sources)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if not directed:
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+            weights = np.concatenate((weights, weights))
+        order = np.argsort(sources, kind='stable')  # stable keeps the input order within every row
+        offset_code = index_typecode(len(sources) + 1)
+        offsets = array(offset_code, [0])
+        offsets.frombytes(np.cumsum(np.bincount(sources, minlength=vertex_count)).astype(offset_code).tobytes())
+        out_targets = array(index_typecode(vertex_count), targets[order].astype(index_typecode(vertex_count)).tobytes())
+        out_weights = array('d', weights[order].tobytes())
+        return CSRGraph(offsets, out_targets, out_weights, nodes)
+
+    @staticmethod
+    def from_vertices(vertices: List[Node | None], weighted: bool = True) -> CSRGraph:
+        """
+        Compacts a list of `Node` objects into CSR form. Neighbors that were never inserted into the vertex list are
+        appended after it, so indices of the original vertices line up with `Graph.vertices`.
+
+        :param vertices: The vertices of the graph, in index order
+        :param weighted: Read the weighted `edges` lists when True, the unweighted `connections` lists when False
+        :return: The built CSRGraph
+        """
+        nodes: List[Node | None] = list(vertices)
+        index: Dict[Node, int] = {}
+        for i, node in enumerate(nodes):
+            if node is not None:
+                index.setdefault(node, i)
+
+        i = 0
+        while i < len(nodes):  # pull in neighbors that are reachable but were never inserted
+            node = nodes[i]
+            if node is not None:
+                for neighbor in (edge.node for edge in node.edges) if weighted else node.connections:
+                    if neighbor not in index:
+                        index[neighbor] = len(nodes)
+                        nodes.append(neighbor)
+            i += 1
+
+        offsets = array('q', [0])
+        targets = array(index_typecode(len(nodes)))
+        weights = array('d')
+        for node in nodes:
+            if node is not None:
+                if weighted:
+                    targets.extend(index[edge.node] for edge in node.edges)
+                    weights.extend(edge.distance for edge in node.edges)
+                else:
+                    targets.extend(index[neighbor] for neighbor in node.connections)
+                    weights.extend(1.0 for _ in node.connections)
+            offsets.append(len(targets))
+        return CSRGraph(offsets, targets, weights, nodes)
+
+    def bfs(self, source: int, target: Optional[int] = None) -> array:
+        """
+        Breadth first search over the CSR buffers, see `graph_algos.traversal` for the full result
+
+        :param source: The vertex the search starts from
+        :param target: Stops as soon as this vertex is dequeued, when given
+        :return: The parent of every reached vertex, NO_VERTEX for the source and unreached vertices
+        """
+        from graph_algos.traversal import bfs
+
+        return bfs(self, source, target).parent
+
+    def dfs(self, source: int, target: Optional[int] = None) -> array:
+        """
+        Iterative depth first search over the CSR buffers, see `graph_algos.traversal` for the full result
+
+        :param source: The vertex the search starts from
+        :param target: Stops as soon as this vertex is popped, when given
+        :return: The parent of every reached vertex, NO_VERTEX for the source and unreached vertices
+        """
+        from graph_algos.traversal import dfs
+
+        return dfs(self, source, target).parent
+
+    def dijkstras(self, source: int, target: Optional[int] = None) -> Tuple[array, array]:
+        """
+        Dijkstra's shortest paths over the CSR buffers, see `graph_algos.shortest_paths` for the other engines
+
+        :param source: The vertex the search starts from
+        :param target: Stops as soon as this vertex is settled, when given
+        :return: The distance and the predecessor of every vertex
+        """
+        from graph_algos.shortest_paths import dijkstra
+
+        result = dijkstra(self, [source], target)
+        return result.distance, result.predecessor
+
+    def prims(self, root: int = 0) -> Tuple[List[Tuple[int, int, float]], float]:
+        """
+        Prim's minimum spanning tree over the CSR buffers, the buffers are assumed to be symmetric (undirected)
+
+        :param root: The vertex the tree is grown from
+        :return: The (parent, child, weight) tree edges and the total weight of the tree
+        """
+        from graph_algos.mst import prim
+
+        return prim(self, root)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from graph_algos.batch import Layout, SharedCSR, attach
+from graph_algos.csr import NO_VERTEX, CSRGraph, as_numpy, filled_array, index_typecode, np, typecode_of
+from graph_algos.shortest_paths import ShortestPaths
+
+Requests = Tuple[array, array, array]  # heads, candidate distances, tails of the relaxations that improved a head
+
+
+def delta_stepping(graph: CSRGraph, sources: Iterable[int], delta: Optional[float] = None,
+                   workers: Optional[int] = None, parallel_threshold: int = 4096) -> ShortestPaths:
+    """
+    Delta-stepping single source shortest paths (Meyer and Sanders). Vertices are kept in buckets of width `delta`
+    by tentative distance. The lowest bucket is settled in phases: every phase relaxes the light edges
+    (weight <= delta) of all the vertices that entered the bucket, which may refill it, and once it stays empty the
+    heavy edges of everything it held are relaxed once. Each phase is one bulk step over a whole frontier, so it is
+    split across worker processes that all read the adjacency and the distance array from shared memory, and only
+    the improving relaxations travel back.
+
+    A small delta does little wasted work but needs many phases (delta -> 0 is Dijkstra), a large one needs few
+    phases but re-relaxes vertices whose distance is not final yet (delta -> inf is Bellman-Ford).
+
+    :param graph: The CSRGraph to search, weights must be non-negative
+    :param sources: The vertices the search starts from, all at distance 0
+    :param delta: The bucket width, the largest weight over the average degree when None
+    :param workers: The number of worker processes, defaults to the CPU count. 1 runs everything in this process
+    :param parallel_threshold: Frontiers smaller than this are relaxed in this process, where shipping them to the
+    workers would cost more than it saves. The workers and the shared memory are only set up once a frontier
+    reaches it, so a search that never does runs like `workers=1`
+    :return: The distance and predecessor arrays
+    """
+    sources = list(sources)
+    vertex_count = graph.vertex_count
+    if delta is None:
+        delta = _default_delta(graph)
+    if delta <= 0:
+        raise ValueError('The bucket width must be positive')
+
+    distance = filled_array('d', float('inf'), vertex_count)
+    for source in sources:
+        distance[source] = 0.0
+    predecessor = filled_array(index_typecode(vertex_count), NO_VERTEX, vertex_count)
+    search = _Search(graph, distance, predecessor, delta, workers or os.cpu_count() or 1, parallel_threshold)
+    try:
+        search.run(sources)
+    finally:
+        search.close()
+    return ShortestPaths(graph, search.distance, predecessor, sources)
+
+
+def _default_delta(graph: CSRGraph) -> float:
+    if graph.edge_count == 0:
+        return 1.0
+    largest = float(np.max(as_numpy(graph.weights))) if np is not None else max(graph.weights)
+    return largest / max(graph.edge_count / max(graph.vertex_count, 1), 1.0) or 1.0
+
+
+class _Search:
+    """
+    The coordinator's side of one delta-stepping run: the buckets, merging the workers' requests, and the worker
+    pool, started by the first frontier that is worth splitting
+    """
+
+    def __init__(self, graph: CSRGraph, distance: array, predecessor: array, delta: float, workers: int,
+                 parallel_threshold: int):
+        self.graph = graph
+        self.distance: array | memoryview = distance  # moved into `distance_block` when the pool starts
+        self.predecessor = predecessor
+        self.delta = delta
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.shared: Optional[SharedCSR] = None
+        self.distance_block: Optional[SharedMemory] = None
+        self.buckets: Dict[int, List] = {}  # bucket index -> the vertices that entered it, stale ones included
+        self.local = _arrays(graph)
+
+    def run(self, sources: List[int]) -> None:
+        self._file(sources, [0.0] * len(sources))
+        while self.buckets:
+            current = min(self.buckets)
+            settled = []
+            while current in self.buckets:  # light phases, until the bucket stays empty
+                frontier = self._take(current)
+                if len(frontier):
+                    settled.append(frontier)
+                    self._relax(frontier, light=True)
+            if settled:
+                self._relax(np.unique(np.concatenate(settled)) if np is not None
+                            else array(typecode_of(settled[0]), sorted(set().union(*settled))), light=False)
+
+    def _take(self, bucket: int):
+        """
+        The vertices of a bucket that still belong to it, each once
+        """
+        entered = self.buckets.pop(bucket)
+        if np is not None:
+            vertices = np.unique(np.concatenate(entered))
+            return vertices[np.floor(as_numpy(self.distance)[vertices] / self.delta) == bucket]
+        return array('q', sorted(vertex for vertex in set().union(*entered)
+                                 if int(self.distance[vertex] // self.delta) == bucket))
+
+    def _relax(self, frontier, light: bool) -> None:
+        if self.workers <= 1 or len(frontier) < self.parallel_threshold:
+            self._merge([_relax(self.local, self.distance, frontier, self.delta, light)])
+            return
+        if self.pool is None:
+            self._start_pool()
+        size = -(-len(frontier) // self.workers)
+        chunks = [frontier[start:start + size] for start in range(0, len(frontier), size)]
+        self._merge(list(self.pool.map(_relax_in_worker, chunks, [light] * len(chunks))))
+
+    def _start_pool(self) -> None:
+        """
+        Shares the adjacency and the distances found so far with a fresh pool of worker processes
+        """
+        vertex_count = self.graph.vertex_count
+        self.shared = SharedCSR(self.graph)
+        self.distance_block = SharedMemory(create=True, size=max(vertex_count * 8, 1))
+        distance = self.distance_block.buf[:vertex_count * 8].cast('d')
+        distance[:] = self.distance
+        self.distance = distance
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_worker,
+                                        initargs=(self.shared.layout, self.distance_block.name, vertex_count,
+                                                  self.delta))
+
+    def close(self) -> None:
+        """
+        Stops the workers and copies the distances out of the shared memory before freeing it, if the pool was
+        ever started
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.shared is not None:
+            self.shared.release()
+        if self.distance_block is not None:
+            shared, self.distance = self.distance, array('d', self.distance)
+            shared.release()
+            self.distance_block.close()
+            self.distance_block.unlink()
+
+    def _merge(self, requests: List[Requests]) -> None:
+        """
+        Applies the best request for every head that still improves it, and files the improved heads into buckets
+        """
+        if np is not None:
+            heads = np.concatenate([np.asarray(part[0], dtype=np.int64) for part in requests])
+            candidates = np.concatenate([np.asarray(part[1], dtype=np.float64) for part in requests])
+            tails = np.concatenate([np.asarray(part[2], dtype=np.int64) for part in requests])
+            order = np.lexsort((candidates, heads))  # per head, the shortest candidate first
+            heads, candidates, tails = heads[order], candidates[order], tails[order]
+            first = np.ones(len(heads), dtype=bool)
+            first[1:] = heads[1:] != heads[:-1]
+            distance = as_numpy(self.distance)
+            better = first & (candidates < distance[heads])
+            heads, candidates = heads[better], candidates[better]
+            distance[heads] = candidates
+            as_numpy(self.predecessor)[heads] = tails[better]
+            self._file(heads, candidates)
+            return
+        improved = []
+        for part in requests:
+            for head, candidate, tail in zip(*part):
+                if candidate < self.distance[head]:
+                    self.distance[head] = candidate
+                    self.predecessor[head] = tail
+                    improved.append(head)
+        self._file(improved, [self.distance[head] for head in improved])
+
+    def _file(self, vertices, distances) -> None:
+        if np is not None:
+            vertices = np.asarray(vertices, dtype=np.int64)
+            indices = np.floor(np.asarray(distances, dtype=np.float64) / self.delta).astype(np.int64)
+            for bucket in np.unique(indices).tolist():
+                self.buckets.setdefault(bucket, []).append(vertices[indices == bucket])
+            return
+        for vertex, vertex_distance in zip(vertices, distances):
+            self.buckets.setdefault(int(vertex_distance // self.delta), []).append([vertex])
+
+
+def _arrays(graph: CSRGraph):
+    """
+    The adjacency in the form `_relax` scans, 64-bit NumPy views when NumPy is installed
+    """
+    if np is not None:
+        return as_numpy(graph.offsets).astype(np.int64), as_numpy(graph.targets), as_numpy(graph.weights)
+    return graph.offsets, graph.targets, graph.weights
+
+
+def _relax(arrays, distance: memoryview, frontier, delta: float, light: bool) -> Requests:
+    """
+    Relaxes the light (weight <= delta) or heavy edges of every frontier vertex against the current distances
+
+    :return: The relaxations that would improve their head
+    """
+    offsets, targets, weights = arrays
+    if np is not None:
+        frontier = np.asarray(frontier, dtype=np.int64)
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        total = int(counts.sum())
+        tails = np.repeat(frontier, counts)
+        slots = np.arange(total, dtype=np.int64) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        edge_weights = weights[slots]
+        keep = edge_weights <= delta if light else edge_weights > delta
+        tails, slots = tails[keep], slots[keep]
+        distances = as_numpy(distance)
+        candidates = distances[tails] + edge_weights[keep]
+        heads = targets[slots]
+        better = candidates < distances[heads]
+        return heads[better], candidates[better], tails[better]
+    heads, candidates, tails = array('q'), array('d'), array('q')
+    for tail in frontier:
+        base = distance[tail]
+        for slot in range(offsets[tail], offsets[tail + 1]):
+            weight = weights[slot]
+            if (weight <= delta) == light and base + weight < distance[targets[slot]]:
+                heads.append(targets[slot])
+                candidates.append(base + weight)
+                tails.append(tail)
+    return heads, candidates, tails
+
+
+_worker_blocks: List[SharedMemory] = []
+_worker_arrays = None
+_worker_distance: Optional[memoryview] = None
+_worker_delta = 1.0
+
+
+def _attach_worker(layout: Layout, distance_name: str, vertex_count: int, delta: float) -> None:
+    global _worker_blocks, _worker_arrays, _worker_distance, _worker_delta
+    _worker_blocks, graph = attach(layout)
+    distance_block = SharedMemory(name=distance_name)
+    _worker_blocks.append(distance_block)
+    _worker_arrays = _arrays(graph)
+    _worker_distance = distance_block.buf[:vertex_count * 8].cast('d')
+    _worker_delta = delta
+
+
+def _relax_in_worker(frontier, light: bool) -> Requests:
+    return _relax(_worker_arrays, _worker_distance, frontier, _worker_delta, light)
@@ -1,9 +1,35 @@
 from __future__ import annotations
 
-from queue import Queue
-from typing import List, Set
+import gc
+import os
+import sys
+from itertools import chain, compress, groupby, islice, repeat
+from operator import itemgetter
+from threading import Lock
+from array import array
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Tuple
 from enum import Enum
 
+if __name__ == '__main__' and not __package__:  # run as a script, the package is not importable from its own folder
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_algos import traversal
+from graph_algos.bulk import EdgeMerge, merge_edges
+from graph_algos.csr import NO_VERTEX, CSRGraph
+from graph_algos.stats import begin, finish, phase, publish
+from graph_algos.shortest_paths import PriorityQueueKind, ShortestPaths, astar, bidirectional_dijkstra, shortest_paths
+from graph_algos.traversal import BFSMode, DFSOrder
+
+if TYPE_CHECKING:  # the other engines are imported by the methods that use them, most programs need only a few
+    from graph_algos.cache import ShortestPathCache
+    from graph_algos.centrality import Ranking
+    from graph_algos.components import Components, IncrementalComponents
+    from graph_algos.contraction import ContractionHierarchy
+    from graph_algos.dynamic import DynamicShortestPaths
+    from graph_algos.landmarks import LandmarkIndex
+    from graph_algos.partition import Partition
+    from graph_algos.snapshot import GraphSnapshot
+
 
 class NodeLabel(Enum):
     NOT_DISCOVERED = 0
@@ -11,35 +37,107 @@ class NodeLabel(Enum):
     FULLY_DISCOVERED = 2
 
 
-class DFSOrder(Enum):
-    PREORDER = 0
-    POSTORDER = 1
-    REVERSE_PREORDER = 2
-    REVERSE_POSTORDER = 3
-
-
 class Stack:  # FILO data structure
     def __init__(self, *values):
-        self.internal_array = [] + values if values else []
+        self.internal_array = list(values)
 
     def push(self, value) -> Stack:
-        self.internal_array.insert(0, value)
+        self.internal_array.append(value)  # the top of the stack is the end of the list, so push and pop are O(1)
         return self
 
     def pop(self) -> Node:
         return self.internal_array.pop()
 
+    def peek(self) -> Node:
+        return self.internal_array[-1]
+
     def empty(self) -> bool:
         return len(self.internal_array) == 0
 
+    def __len__(self) -> int:
+        return len(self.internal_array)
+
 
 class Edge:
-    def __init__(self, node: Node, distance: int):
+    __slots__ = ('node', 'distance')
+
+    def __init__(self, node: Node | Vertex, distance: int):
         self.node = node
         self.distance = distance
 
 
-class Node:
+class AdjacencyMixin:
+    """
+    The graph side of a vertex, shared by Node and Vertex: the directed `connections`, the undirected weighted
+    `edges`, and the labels. Expects those attributes plus `graph` on the instance.
+    """
+    __slots__ = ()
+
+    def set_value(self, value: int):
+        self.value = value
+        return self
+
+    def connect(self, node: Node | Vertex):
+        self._connection_list().append(node)
+        if self.graph is not None:
+            self.graph.edge_changed(self, node, None)
+        return self
+
+    def add_edge(self, node: Node | Vertex, distance: int):
+        self._edge_list().append(Edge(node, distance))
+        node._edge_list().append(Edge(self, distance))
+        self._edges_changed(node, distance)
+        return self
+
+    def set_edge_distance(self, node: Node | Vertex, distance: int):
+        """
+        Changes the weight of every edge between this node and `node`, in both directions
+
+        :param node: The other end of the edge
+        :param distance: The new weight
+        :return: This node
+        :raises ValueError: When the two nodes share no edge
+        """
+        updated = False
+        for edge in self.edges:
+            if edge.node is node:
+                edge.distance = distance
+                updated = True
+        for edge in node.edges:
+            if edge.node is self:
+                edge.distance = distance
+                updated = True
+        if not updated:
+            raise ValueError('Nodes {} and {} share no edge'.format(self.value, node.value))
+        self._edges_changed(node, distance)
+        return self
+
+    def _connection_list(self) -> list:
+        if type(self.connections) is tuple:  # a Vertex shares one empty tuple until its first connection
+            self.connections = []
+        return self.connections
+
+    def _edge_list(self) -> List[Edge]:
+        if type(self.edges) is tuple:
+            self.edges = []
+        return self.edges
+
+    def _edges_changed(self, node: Node | Vertex, distance: int) -> None:
+        if self.graph is not None:
+            self.graph.edge_changed(self, node, distance)
+        if node.graph is not None and node.graph is not self.graph:
+            node.graph.edge_changed(self, node, distance)
+
+    def set_label(self, label: NodeLabel):
+        self.label = label
+        return self
+
+    def set_letter_label(self, label: str):
+        self.letter_label = label
+        return self
+
+
+class Node(AdjacencyMixin):
     def __init__(self, value: int = 0):
         self.left: Node | None = None
         self.right: Node | None = None
@@ -51,15 +149,12 @@ class Node:
         self.label: NodeLabel = NodeLabel.NOT_DISCOVERED
         self.distance = 0
         self.letter_label = ''
+        self.graph: Graph | None = None  # the graph this node was inserted into, told about adjacency changes
 
     def set_parent(self, node: Node) -> Node:
         self.parent = node
         return self
 
-    def set_value(self, value: int) -> Node:
-        self.value = value
-        return self
-
     def set_left(self, node: Node) -> Node:
         self.left = node
         return self
@@ -72,19 +167,6 @@ class Node:
         self.height = height
         return self
 
-    def connect(self, node: Node) -> Node:
-        self.connections.append(node)
-        return self
-
-    def add_edge(self, node: Node, distance: int) -> Node:
-        self.edges.append(Edge(node, distance))
-        node.edges.append(Edge(self, distance))
-        return self
-
-    def set_label(self, label: NodeLabel) -> Node:
-        self.label = label
-        return self
-
     def set_distance(self, distance: int) -> Node:
         self.distance = distance
         return self
@@ -92,22 +174,249 @@ class Node:
     def print_node(self) -> None:
         print('Value {} | Distance {} | Label {}'.format(self.value, self.distance, self.letter_label))
 
-    def set_letter_label(self, label: str) -> Node:
-        self.letter_label = label
-        return self
+
+class Vertex(AdjacencyMixin):
+    """
+    A graph-only vertex: no tree fields and no `__dict__`. `benchmarks/memory.py` measures 159.9 bytes per bare
+    vertex against 319.9 for a Node (half), and 451.5 against 556.6 once each has four edges (about 19% less, the
+    `Edge` objects then dominate), which adds up with tens of millions of vertices. `id` is its index in
+    `Graph.vertices` (and in every CSR view of the graph), assigned by `Graph.insert_vertex`, so it can index
+    array-backed results directly. Works anywhere a Node does in `Graph`.
+    """
+    __slots__ = ('id', 'value', 'connections', 'edges', 'label', 'letter_label', 'graph')
+
+    def __init__(self, value: int = 0):
+        self.id: int = NO_VERTEX  # set on insertion
+        self.value = value
+        # the empty tuple stands in for an empty list until the first edge, isolated vertices then cost no lists
+        self.connections: List[Vertex] | Tuple[()] = ()
+        self.edges: List[Edge] | Tuple[()] = ()
+        self.label: NodeLabel = NodeLabel.NOT_DISCOVERED
+        self.letter_label = ''
+        self.graph: Graph | None = None
+
+    def __repr__(self) -> str:
+        return 'Vertex(id={}, value={!r})'.format(self.id, self.value)
 
 
 class Graph:
     def __init__(self, root: Node | None = None):
         self.root = root
         self.vertices: List[Node] = []
-
-    def insert_vertex(self, node: Node | None):
+        self.version: int = 0  # bumped on every structural change, compiled views are rebuilt when it moves
+        self._compiled: Dict[bool, Tuple[int, CSRGraph]] = {}
+        self._compile_lock = Lock()  # concurrent queries must not compile the same view twice
+        self.path_cache: ShortestPathCache | None = None
+        # called with (tail, head, distance) after every edge change, distance is None for `Node.connect`
+        self.edge_listeners: List[Callable[[Node, Node, Any], None]] = []
+
+    def insert_vertex(self, node: Node | Vertex | None):
         self.vertices.append(node)
+        if node is not None:
+            node.graph = self
+            if isinstance(node, Vertex) and node.id == NO_VERTEX:
+                node.id = len(self.vertices) - 1
+        self.touch()
 
     def insert_vertexes(self, nodes: List[Node]):
         for each_node in nodes:
-            self.vertices.append(each_node)
+            self.insert_vertex(each_node)
+
+    def touch(self) -> Graph:
+        self.version += 1
+        return self
+
+    def edge_changed(self, tail: Node, head: Node, distance) -> Graph:
+        """
+        Records that an edge was added or reweighted and tells every registered `edge_listeners` callback about it
+
+        :param tail: The node the edge was added from
+        :param head: The node the edge points to
+        :param distance: The edge weight, None for a `connections` edge
+        :return: The graph
+        """
+        self.touch()
+        for listener in self.edge_listeners:
+            listener(tail, head, distance)
+        return self
+
+    def add_edges(self, edges: Iterable[Tuple[Node | int, Node | int, float]],
+                  merge: EdgeMerge = EdgeMerge.MIN) -> Graph:
+        """
+        Adds many undirected weighted edges at once, like `add_edge` but without duplicates: the batch is sorted and
+        its parallel edges collapsed, and an edge that already exists gets its weight merged instead of a second
+        `Edge`. The edges are appended straight from the merged arrays with the cyclic garbage collector paused, and
+        the graph is touched once. When the graph had no edges yet the weighted CSR view is built from the same
+        arrays, so the first query does not have to walk the new `Edge` objects again.
+
+        :param edges: (u, v, weight) triples, u and v are nodes of this graph or their indices in `vertices`
+        :param merge: How the weights of parallel edges, in the batch or already in the graph, are combined
+        :return: The graph
+        """
+        tails, heads, weights = list(zip(*edges)) or ((), (), ())
+        tails, heads, weights = merge_edges(self._resolve_all(tails), self._resolve_all(heads), weights, merge)
+
+        vertices, existing = self.vertices, {}
+        fresh = not any(vertex is not None and vertex.edges for vertex in vertices)  # nothing to merge into
+        has_edges = None if fresh else [vertex is not None and len(vertex.edges) > 0 for vertex in vertices]
+        added = None if fresh else []  # whether every merged edge was added, rather than merged into an existing one
+        changed = []
+        collecting = gc.isenabled()
+        gc.disable()  # every Edge is a tracked allocation, collections would rescan the graph over and over
+        try:
+            for tail, head, weight in zip(tails, heads, weights):
+                u, v = vertices[tail], vertices[head]
+                if not fresh:
+                    parallel = has_edges[tail] and has_edges[head] and _edges_by_node(u, existing).get(v)
+                    added.append(not parallel)
+                    if parallel:
+                        old = parallel[0].distance
+                        weight = min(old, weight) if merge == EdgeMerge.MIN else \
+                            old + weight if merge == EdgeMerge.SUM else weight
+                        if weight != old:
+                            for edge in chain(parallel, _edges_by_node(v, existing)[u] if u is not v else ()):
+                                edge.distance = weight
+                            changed.append((u, v, weight))
+                        continue
+                u._edge_list().append(Edge(v, weight))
+                v._edge_list().append(Edge(u, weight))
+        finally:
+            if collecting:
+                gc.enable()
+        if fresh:
+            self._bulk_changed(changed, tails, heads, weights)
+        else:
+            self._bulk_changed(changed, list(compress(tails, added)), list(compress(heads, added)),
+                               compress(weights, added))
+        if fresh and len(tails) and None not in vertices and len(set(map(id, vertices))) == len(vertices):
+            # every vertex first lists the edges it heads, then the ones it tails, each in merged order
+            csr = CSRGraph.from_edges(len(vertices), heads + tails, tails + heads, weights + weights,
+                                      nodes=list(vertices))
+            with self._compile_lock:
+                self._compiled[True] = (self.version, csr)
+        return self
+
+    def connect_many(self, pairs: Iterable[Tuple[Node | int, Node | int]]) -> Graph:
+        """
+        Adds many directed `connections` at once, like `connect` but skipping the ones that already exist or repeat
+        within the batch
+
+        :param pairs: (tail, head) pairs, nodes of this graph or their indices in `vertices`
+        :return: The graph
+        """
+        tails, heads = list(zip(*pairs)) or ((), ())
+        tails, heads, _ = merge_edges(self._resolve_all(tails), self._resolve_all(heads), directed=True)
+
+        vertices = self.vertices
+        new_tails, new_heads = [], []
+        for tail, pairs_of_tail in groupby(zip(tails, heads), key=itemgetter(0)):  # tails come out sorted
+            connections = vertices[tail].connections
+            known = set(map(id, connections)) if connections else ()
+            heads_of_tail = [head for _, head in pairs_of_tail if id(vertices[head]) not in known]
+            if heads_of_tail:
+                vertices[tail]._connection_list().extend(map(vertices.__getitem__, heads_of_tail))
+                new_tails.extend(repeat(tail, len(heads_of_tail)))
+                new_heads.extend(heads_of_tail)
+        self._bulk_changed([], new_tails, new_heads, repeat(None))
+        return self
+
+    def _resolve_all(self, nodes: Tuple[Node | int, ...]) -> Tuple[int, ...] | List[int]:
+        """
+        Maps nodes of this graph (or indices) to their indices in `vertices`
+        """
+        if all(type(node) is int for node in nodes):
+            return nodes
+        vertices, index = self.vertices, {}
+
+        def resolve(node: Node | int) -> int:
+            if isinstance(node, int):
+                return node
+            if isinstance(node, Vertex) and 0 <= node.id < len(vertices) and vertices[node.id] is node:
+                return node.id
+            if not index:
+                index.update((vertex, i) for i, vertex in reversed(list(enumerate(vertices))) if vertex is not None)
+            try:
+                return index[node]
+            except KeyError:
+                raise KeyError('Node {} is not part of this graph'.format(node.value)) from None
+        return [resolve(node) for node in nodes]
+
+    def _bulk_changed(self, changed: List[Tuple[Node, Node, Any]], tails: List[int], heads: List[int],
+                      distances: Iterable) -> None:
+        """
+        Touches the graph once for a bulk call and tells the `edge_listeners` about every edge it changed
+
+        :param changed: (tail, head, distance) of the existing edges that were reweighted
+        :param tails: The tail index of every added edge
+        :param heads: The head index of every added edge
+        :param distances: The weight of every added edge
+        """
+        if not changed and not tails:
+            return
+        self.touch()
+        if self.edge_listeners:
+            vertices = self.vertices
+            changed.extend(zip(map(vertices.__getitem__, tails), map(vertices.__getitem__, heads), distances))
+            for listener in self.edge_listeners:
+                for tail, head, distance in changed:
+                    listener(tail, head, distance)
+
+    def to_csr(self, weighted: bool = True) -> CSRGraph:
+        """
+        Returns the compressed sparse row view of the graph, compiled once and reused until the graph changes.
+        Nodes that are reachable but were never inserted are compiled in after `vertices` and attached to the graph,
+        so an edge added to one of them later moves `version` like an edge of an inserted node does.
+
+        :param weighted: Compile the weighted `edges` lists when True, the directed `connections` lists when False
+        :return: The CSRGraph whose vertex indices line up with `self.vertices`
+        """
+        compiled = self._compiled.get(weighted)
+        if compiled is None or compiled[0] != self.version:
+            with self._compile_lock:
+                compiled = self._compiled.get(weighted)
+                if compiled is None or compiled[0] != self.version:
+                    compiled = (self.version, CSRGraph.from_vertices(self.vertices, weighted))
+                    for node in islice(compiled[1].nodes, len(self.vertices), None):
+                        if node.graph is None:
+                            node.graph = self
+                    self._compiled[weighted] = compiled
+        return compiled[1]
+
+    def save_snapshot(self, path: str) -> Graph:
+        """
+        Writes the whole graph to a binary snapshot file, see `graph_algos.snapshot`
+
+        :param path: The file to write
+        :return: The graph
+        """
+        from graph_algos.snapshot import write_snapshot
+        write_snapshot(self, path)
+        return self
+
+    @staticmethod
+    def open_snapshot(path: str) -> GraphSnapshot:
+        """
+        Memory maps a snapshot without rebuilding any nodes, the engines run on its `weighted` and `connections`
+        views directly. `to_graph()` rebuilds a full Graph when the object model is needed.
+
+        :param path: The file written by `save_snapshot`
+        :return: The mapped snapshot
+        """
+        from graph_algos.snapshot import GraphSnapshot
+        return GraphSnapshot.open(path)
+
+    def enable_path_cache(self, capacity: int = 128, max_bytes: int | None = None) -> ShortestPathCache:
+        """
+        Makes single source `dijkstras` calls answer from an LRU cache of shortest path trees, which is dropped
+        whenever the graph changes
+
+        :param capacity: The most trees kept at once
+        :param max_bytes: Optionally also cap the memory held by the cached arrays
+        :return: The cache, `stats` holds its hit / miss counters
+        """
+        from graph_algos.cache import ShortestPathCache
+        self.path_cache = ShortestPathCache(self, capacity, max_bytes)
+        return self.path_cache
 
     """
         What breadth first search does, is it searches all levels of the tree one by one, exploring all possible paths up to that depth level, without going all
@@ -117,87 +426,423 @@ class Graph:
         :param: self - The instance
         :param: root - The root node
         :param: node - The node instance
-        :return: the target node we were looking for
+        :param: mode - QUEUE expands one vertex at a time, LEVEL_SYNCHRONOUS and DIRECTION_OPTIMIZING expand whole
+        frontiers at once
+        :param: trace - Collect a `QueryStats` and hand it to the stats hooks
+        :return: the target node we were looking for (None if it is unreachable), `bfs_traversal` returns the whole
+        search instead
     """
 
-    def bfs(self, root: Node,
-            node: Node):  # Time complexity is O(|V| + |E|), because every vertex and every edge can potentially be traveled in the algorithm
-        node_queue = Queue()  # create a queue to house the nodes
-        root.set_label(NodeLabel.DISCOVERED)  # set root as discovered
-        node_queue.put(root)  # Place the root into the queue
-        while not node_queue.empty():
-            vertex: Node = node_queue.get()  # get the node off the top of the queue
-            if vertex == node:  # checks if the node is the node that we are aiming for, the  target node
-                return node
-            else:  # if it is not the target node
-                for each_edge_vertex in vertex.connections:  # go to each node adjacent to the node
-                    if each_edge_vertex.label == NodeLabel.NOT_DISCOVERED:  # if the node is not discovered yet
-                        each_edge_vertex.label = NodeLabel.DISCOVERED  # mark the node as discovered
-                        each_edge_vertex.parent = vertex  # change the nodes parent to the vertex
-                        node_queue.put(each_edge_vertex)  # places the node on the queue (FIFO)
-
-    def dfs(self, root: Node, target: Node,
-            order: DFSOrder = DFSOrder.PREORDER) -> Node:  # Time complexity O(|V| + |E|), because the worst case scenario we iterate over every vertex and every edge in the  algorithm
-        node_stack = Stack()
-        order = []
-        root.set_label(NodeLabel.DISCOVERED)
-        node_stack.push(root)
-        while not node_stack.empty():
-            vertex: Node = node_stack.pop()
-            if order == DFSOrder.PREORDER:
-                order.append(vertex.value)
-            if vertex == Node:
-                return Node
+    def bfs(self, root: Node, node: Node | None, mode: BFSMode = BFSMode.QUEUE,
+            trace: bool = False) -> Node | None:
+        # Time complexity is O(|V| + |E|), because every vertex and every edge can potentially be traveled in the
+        # algorithm
+        return self.bfs_traversal(root, node, mode, trace).found_node
+
+    def bfs_traversal(self, root: Node, node: Node | None, mode: BFSMode = BFSMode.QUEUE,
+                      trace: bool = False) -> traversal.Traversal | traversal.LevelTraversal:
+        """
+        Same search as `bfs`, returning its state rather than just the target
+
+        :param root: The node the search starts from
+        :param node: The node to stop at, None to visit everything reachable
+        :param mode: QUEUE expands one vertex at a time, LEVEL_SYNCHRONOUS and DIRECTION_OPTIMIZING expand whole
+        frontiers and return the depth of every vertex too
+        :param trace: Collect a `QueryStats` into the result's `stats` (also done while a stats hook is registered)
+        :return: The query's visit map and parent array, `found_node` is the target (None if it is unreachable)
+        """
+        stats = begin('bfs', trace)
+        with phase(stats, 'compile'):
+            graph = self.to_csr(weighted=False)  # bfs follows the directed `connections`
+        source, target = graph.vertex_of(root), None if node is None else graph.vertex_of(node)
+        with phase(stats, 'search'):
+            if mode != BFSMode.QUEUE:  # expand whole frontiers at once, also gives the depth of every vertex
+                result = traversal.frontier_bfs(graph, source, target, mode == BFSMode.DIRECTION_OPTIMIZING, stats)
             else:
-                for each_edge_vertex in vertex.connections:
-                    if each_edge_vertex.label == NodeLabel.NOT_DISCOVERED:
-                        each_edge_vertex.label = NodeLabel.DISCOVERED
-                        each_edge_vertex.parent = vertex
-                        node_stack.push(each_edge_vertex)
-
-    def dijkstras(self, initialNode: Node, target: Node) -> List[Node]:
-        unvisited_set: List[Node] = []
-        for eachnode in self.vertices:
-            unvisited_set.append(eachnode.set_label(NodeLabel.NOT_DISCOVERED).set_distance(0 if eachnode.value == initialNode.value else float('inf')))
-        i = 0
-        current_node: Node = unvisited_set[0]
-        while i < len(unvisited_set) and current_node is not None:
-            # iterate through all it's neighbors, comparing the distances
-            i += 1
-            min_dist = float('inf')
-            min_node = None
-            for eachedge in current_node.edges:
-                if eachedge.node.label != NodeLabel.DISCOVERED:
-                    eachedge.node.distance = min(eachedge.node.distance, current_node.distance + eachedge.distance)
-            current_node.set_label(NodeLabel.DISCOVERED)
-            for eachedge in current_node.edges:
-                if eachedge.node.distance < min_dist and eachedge.node.label != NodeLabel.DISCOVERED:
-                    min_dist = eachedge.node.distance
-                    min_node = eachedge.node
-            current_node = min_node
-        print('done!')
-
-    def prims(self, graph: Graph):
+                # the visit map and parent array belong to this query alone, the nodes themselves are never written to
+                result = traversal.bfs(graph, source, target, stats)
+        return finish(stats, result)
+
+    def bidirectional_bfs(self, root: Node, node: Node) -> List[Node]:
+        """
+        Fewest-hops path over the directed `connections`, searching from both ends at once
+
+        :param root: The node the path starts at
+        :param node: The node the path ends at
+        :return: The nodes along the path, empty if `node` is unreachable
+        """
+        graph = self.to_csr(weighted=False)
+        return [graph.node_of(vertex) for vertex in traversal.bidirectional_bfs(graph, graph.vertex_of(root),
+                                                                                 graph.vertex_of(node))]
+
+    def partition(self, parts: int) -> Partition:
+        """
+        Splits the vertices into balanced parts with few `connections` between them, see `graph_algos.partition`
+
+        :param parts: The number of parts
+        :return: The part of every vertex, indexed like `to_csr(weighted=False)`
+        """
+        from graph_algos.partition import partition_graph
+        return partition_graph(self.to_csr(weighted=False), parts)
+
+    def partitioned_bfs(self, root: Node, node: Node | None, parts: int | Partition = 2) -> traversal.LevelTraversal:
+        """
+        Level synchronous bfs over the directed `connections` with the graph split across worker processes, one per
+        part, that trade frontier vertices every level
+
+        :param root: The node the search starts from
+        :param node: Stops at the end of the level this node is discovered on, when given
+        :param parts: The number of worker processes, or a Partition from `partition()` to reuse
+        :return: The depth and parent of every vertex
+        """
+        from graph_algos.partition import partitioned_bfs
+        graph = self.to_csr(weighted=False)
+        return partitioned_bfs(graph, graph.vertex_of(root), None if node is None else graph.vertex_of(node), parts)
+
+    def dfs(self, root: Node, target: Node | None, order: DFSOrder = DFSOrder.PREORDER,
+            trace: bool = False) -> Node | None:
+        # Time complexity O(|V| + |E|), because the worst case scenario we iterate over every vertex and every edge in
+        # the  algorithm
+        return self.dfs_traversal(root, target, order, trace).found_node
+
+    def dfs_traversal(self, root: Node, target: Node | None, order: DFSOrder = DFSOrder.PREORDER,
+                      trace: bool = False) -> traversal.Traversal:
+        """
+        Same search as `dfs`, returning its state rather than just the target
+
+        :param root: The node the search starts from
+        :param target: The node to stop at, None to visit everything reachable
+        :param order: Decides whether the target counts as found when it is discovered or when it is finished
+        :param trace: Collect a `QueryStats` into the result's `stats` (also done while a stats hook is registered)
+        :return: The query's visit map and parent array, `found_node` is the target (None if it is unreachable)
+        """
+        stats = begin('dfs', trace)
+        with phase(stats, 'compile'):
+            graph = self.to_csr(weighted=False)
+        with phase(stats, 'search'):
+            result = traversal.dfs(graph, graph.vertex_of(root), None if target is None else graph.vertex_of(target),
+                                   order, stats)
+        return finish(stats, result)
+
+    def dfs_order(self, root: Node, order: DFSOrder = DFSOrder.PREORDER) -> Iterator[Node]:
+        """
+        Lazily streams the nodes reachable from the root in the given depth first order, without recursion
+
+        :param root: The node the walk starts from
+        :param order: PREORDER, POSTORDER, REVERSE_PREORDER or REVERSE_POSTORDER
+        :return: A generator of nodes
+        """
+        graph = self.to_csr(weighted=False)
+        return map(graph.node_of, traversal.dfs_order(graph, graph.vertex_of(root), order))
+
+    def dijkstras(self, initialNode: Node | List[Node], target: Node | None = None,
+                  queue: PriorityQueueKind = PriorityQueueKind.BINARY_HEAP, trace: bool = False) -> ShortestPaths:
+        """
+        Single (or multi) source shortest paths over the weighted `edges`, O((|V| + |E|) log |V|) with the binary
+        heap. The search stops as soon as `target` is settled.
+
+        :param initialNode: The source node, or a list of source nodes that all start at distance 0
+        :param target: The node we are routing to, or None to compute the full shortest path tree
+        :param queue: The priority queue engine, BUCKET is only valid for non-negative integer weights
+        :param trace: Collect a `QueryStats` into the result's `stats` (also done while a stats hook is registered). A
+        traced query always searches, bypassing `path_cache`
+        :return: The distance and predecessor arrays (the full tree when answered by `path_cache`), indexed like
+        `self.vertices`. `path_to(target)` gives the route as a list of nodes
+        """
+        stats = begin('dijkstras', trace)
+        if self.path_cache is not None and not isinstance(initialNode, list) and queue == self.path_cache.queue \
+                and not trace:
+            misses = self.path_cache.stats.misses
+            with phase(stats, 'cache'):
+                tree = self.path_cache.tree(initialNode)  # a full tree, good for any target
+            if stats is not None:  # reported to the hooks, but the shared cached tree is left alone
+                stats.cached = self.path_cache.stats.misses == misses
+                publish(stats)
+            return tree
+        with phase(stats, 'compile'):
+            graph = self.to_csr()
+        sources = initialNode if isinstance(initialNode, list) else [initialNode]
+        with phase(stats, 'search'):
+            result = shortest_paths(graph, [graph.vertex_of(source) for source in sources],
+                                    None if target is None else graph.vertex_of(target), queue, stats)
+        return finish(stats, result)
+
+    def batch_dijkstras(self, sources: List[Node] | None = None, targets: List[Node] | None = None,
+                        aggregate: Callable[[int, array], Any] | None = None,
+                        workers: int | None = None) -> Iterator[Tuple[Node, Any]]:
+        """
+        Shortest paths from many sources at once, fanned out over a process pool that shares one copy of the graph.
+        Nothing is written to the nodes, so the graph stays usable for other queries meanwhile.
+
+        :param sources: The nodes to run from, every vertex when None
+        :param targets: Only return the distances to these nodes, in this order, every vertex when None
+        :param aggregate: A picklable `(source index, distance row) -> result` reducer run inside the workers
+        :param workers: The number of worker processes, defaults to the CPU count
+        :return: (source node, distance row or aggregate) pairs, in completion order. Closing it early cancels the
+        sources not started yet
+        """
+        from graph_algos.batch import batch_shortest_paths
+        graph = self.to_csr()
+        rows = batch_shortest_paths(graph, None if sources is None else map(graph.vertex_of, sources),
+                                    None if targets is None else [graph.vertex_of(target) for target in targets],
+                                    aggregate, workers)
+        return _node_rows(graph, rows)
+
+    def dynamic_dijkstras(self, initialNode: Node, recompute_fraction: float = 0.5) -> DynamicShortestPaths:
+        """
+        A shortest path tree from one source that repairs itself on every later `add_edge` / `set_edge_distance`
+        instead of being recomputed, see `graph_algos.dynamic`
+
+        :param initialNode: The source node
+        :param recompute_fraction: The share of the tree a weight increase may invalidate before it is recomputed whole
+        :return: The live tree, `detach()` it once it is no longer needed
+        """
+        from graph_algos.dynamic import DynamicShortestPaths
+        return DynamicShortestPaths(self, initialNode, recompute_fraction)
+
+    def k_shortest_paths(self, initialNode: Node, target: Node) -> Iterator[Tuple[float, List[Node]]]:
+        """
+        Loopless routes over the weighted `edges` from shortest to longest, computed lazily, so
+        `islice(graph.k_shortest_paths(a, b), 3)` gives the best route and two alternatives, see
+        `graph_algos.k_shortest`
+
+        :param initialNode: The node the routes start at
+        :param target: The node the routes end at
+        :return: (length, nodes) of every route
+        """
+        from graph_algos.k_shortest import k_shortest_paths
+        graph = self.to_csr()
+        for length, path in k_shortest_paths(graph, graph.vertex_of(initialNode), graph.vertex_of(target)):
+            yield length, [graph.node_of(vertex) for vertex in path]
+
+    def delta_stepping(self, initialNode: Node, delta: float | None = None,
+                       workers: int | None = None) -> ShortestPaths:
+        """
+        Shortest paths over the weighted `edges` with delta-stepping, relaxing whole distance buckets at a time
+        across worker processes, see `graph_algos.delta_stepping`
+
+        :param initialNode: The source node
+        :param delta: The bucket width, picked from the weights and the average degree when None
+        :param workers: The number of worker processes, defaults to the CPU count. They are only started once a bucket
+        is large enough to split, 1 always runs in this process
+        :return: The distance and predecessor of every node
+        """
+        from graph_algos.delta_stepping import delta_stepping
+        graph = self.to_csr()
+        return delta_stepping(graph, [graph.vertex_of(initialNode)], delta, workers)
+
+    def bidirectional_dijkstras(self, initialNode: Node, target: Node) -> Tuple[float, List[Node]]:
+        """
+        Point to point shortest route over the weighted `edges`, searching from both ends at once
+
+        :param initialNode: The node the route starts at
+        :param target: The node the route ends at
+        :return: The length of the route and its nodes, (inf, []) if `target` is unreachable
+        """
+        graph = self.to_csr()
+        distance, path = bidirectional_dijkstra(graph, graph.vertex_of(initialNode), graph.vertex_of(target))
+        return distance, [graph.node_of(vertex) for vertex in path]
+
+    def astar(self, initialNode: Node, target: Node,
+              heuristic: Callable[[Node, Node], float] | LandmarkIndex | None = None) -> Tuple[float, List[Node]]:
+        """
+        Point to point shortest route over the weighted `edges`, guided by a lower bound on the remaining distance
+
+        :param initialNode: The node the route starts at
+        :param target: The node the route ends at
+        :param heuristic: Either a function estimating the distance between two nodes (it must never overestimate),
+        or a LandmarkIndex built by `landmark_index`. Without one this is plain Dijkstra
+        :return: The length of the route and its nodes, (inf, []) if `target` is unreachable
+        """
+        from graph_algos.landmarks import LandmarkIndex
+        graph = self.to_csr()
+        source, goal = graph.vertex_of(initialNode), graph.vertex_of(target)
+        if isinstance(heuristic, LandmarkIndex):
+            distance, path = heuristic.query(source, goal)
+        elif heuristic is None:
+            distance, path = astar(graph, source, goal, lambda vertex: 0.0)
+        else:
+            distance, path = astar(graph, source, goal, lambda vertex: heuristic(graph.node_of(vertex), target))
+        return distance, [graph.node_of(vertex) for vertex in path]
+
+    def landmark_index(self, count: int = 16) -> LandmarkIndex:
+        """
+        Runs the one time ALT preprocessing over the weighted `edges`, see `LandmarkIndex` for saving it to disk
+
+        :param count: How many landmarks to pick
+        :return: The index, pass it to `astar` as the heuristic
+        """
+        from graph_algos.landmarks import LandmarkIndex
+        return LandmarkIndex.build(self.to_csr(), count)
+
+    def contraction_hierarchy(self, witness_limit: int = 500) -> ContractionHierarchy:
+        """
+        Preprocesses the weighted `edges` into a contraction hierarchy for fast point to point queries. The graph is
+        assumed static from here on, `save` the hierarchy to skip this step next time.
+
+        :param witness_limit: How many vertices a witness search may settle before the shortcut is added anyway
+        :return: The hierarchy, `route(initialNode, target)` answers queries with nodes
+        """
+        from graph_algos.contraction import ContractionHierarchy
+        return ContractionHierarchy.build(self.to_csr(), witness_limit)
+
+    def connected_components(self, weighted: bool = True) -> Components:
+        """
+        Splits the graph into connected components in one pass over every edge, edge direction ignored
+
+        :param weighted: Use the weighted `edges` when True, the `connections` when False
+        :return: The component id of every vertex (indexed like `self.vertices`) and the size of every component
+        """
+        from graph_algos.components import connected_components
+        return connected_components(self.to_csr(weighted))
+
+    def track_components(self, weighted: bool = True) -> IncrementalComponents:
+        """
+        Components that stay current as edges are added, `connected(a, b)` is then a near constant time union-find
+        lookup instead of a traversal
+
+        :param weighted: Follow the weighted `edges` when True, the `connections` when False
+        :return: The live components, `detach()` them once they are no longer needed
+        """
+        from graph_algos.components import IncrementalComponents
+        return IncrementalComponents(self, weighted)
+
+    def strongly_connected_components(self) -> Components:
+        """
+        Strongly connected components of the directed `connections`, found without recursion
+
+        :return: The component id of every vertex, numbered in topological order of the condensation
+        """
+        from graph_algos.scc import strongly_connected_components
+        return strongly_connected_components(self.to_csr(weighted=False))
+
+    def condensation(self) -> Tuple[Components, CSRGraph]:
+        """
+        Collapses every strongly connected component of the `connections` into a single vertex, which leaves a DAG
+
+        :return: The components and the DAG, whose vertex i is component i
+        """
+        from graph_algos.scc import condensation, strongly_connected_components
+        graph = self.to_csr(weighted=False)
+        components = strongly_connected_components(graph)
+        return components, condensation(graph, components)
+
+    def topological_sort(self) -> List[Node]:
+        """
+        Orders the nodes so every `connections` edge points forward, e.g. a dependency graph in reverse build order
+
+        :return: Every vertex in topological order
+        :raises ValueError: If the connections have a cycle
+        """
+        from graph_algos.scc import topological_sort
+        graph = self.to_csr(weighted=False)
+        return [graph.node_of(vertex) for vertex in topological_sort(graph)]
+
+    def pagerank(self, weighted: bool = False, damping: float = 0.85, tolerance: float = 1e-6,
+                 max_iterations: int = 100, start: Ranking | None = None, by_weight: bool = False) -> Ranking:
+        """
+        PageRank by vectorized power iteration, see `graph_algos.centrality.pagerank`
+
+        :param weighted: Rank over the weighted `edges` when True, the directed `connections` when False
+        :param damping: The probability of following an edge rather than teleporting
+        :param tolerance: Stop once the L1 change of the scores drops below this
+        :param max_iterations: Stop after this many iterations regardless
+        :param start: A previous ranking to warm start from, only used if the vertex count is unchanged
+        :param by_weight: Split rank over out-edges in proportion to their weights
+        :return: The scores (indexed like `self.vertices`), residuals and per-iteration timings
+        """
+        from graph_algos.centrality import pagerank
+        graph = self.to_csr(weighted)
+        return pagerank(graph, damping, tolerance, max_iterations, None, _warm_start(start, graph), by_weight)
+
+    def personalized_pagerank(self, seeds: List[Node], weighted: bool = False, damping: float = 0.85,
+                              tolerance: float = 1e-6, max_iterations: int = 100, start: Ranking | None = None,
+                              by_weight: bool = False) -> Ranking:
+        """
+        PageRank with every teleport landing on one of the seed nodes, e.g. "what is relevant to these nodes"
+
+        :param seeds: The nodes teleports land on
+        :return: The scores, residuals and per-iteration timings
+        """
+        from graph_algos.centrality import personalized_pagerank
+        graph = self.to_csr(weighted)
+        return personalized_pagerank(graph, [graph.vertex_of(seed) for seed in seeds], damping, tolerance,
+                                     max_iterations, _warm_start(start, graph), by_weight)
+
+    def degree_centrality(self, weighted: bool = False, incoming: bool = False) -> array:
+        """
+        :param weighted: Count the weighted `edges` when True, the directed `connections` when False
+        :param incoming: Count in-edges instead of out-edges
+        :return: The normalized degree of every vertex, indexed like `self.vertices`
+        """
+        from graph_algos.centrality import degree_centrality
+        return degree_centrality(self.to_csr(weighted), incoming)
+
+    def closeness_centrality(self, weighted: bool = False, by_weight: bool = False) -> array:
+        """
+        :param weighted: Use the weighted `edges` when True, the directed `connections` when False
+        :param by_weight: Measure distances in edge weights instead of hops
+        :return: The closeness of every vertex, indexed like `self.vertices`
+        """
+        from graph_algos.centrality import closeness_centrality
+        return closeness_centrality(self.to_csr(weighted), by_weight=by_weight)
+
+    def prims(self, graph: Graph | None = None) -> Tuple[List[Tuple[Node, Node, float]], float] | None:
+        """
+        Minimum spanning tree (a spanning forest if the graph is disconnected) over the weighted `edges`, using
+        Prim's algorithm with an indexed decrease-key heap. Suited to dense graphs.
+
+        :param graph: The graph to span, defaults to this graph
+        :return: The (parent, child, weight) tree edges and the total weight
+        """
+        from graph_algos.mst import prim
+        graph = self if graph is None else graph
         if len(graph.vertices) == 0:
             print('Unable to calculate prim\'s with graph with 0 vertices')
             return None
+        return graph._tree_nodes(prim(graph.to_csr()))
 
-        mst_set: Set[Node] = set()
-        graph.vertices[0].set_distance(0)
-        for each_node in graph.vertices[1:]:
-            each_node.set_distance(float('inf'))
-        while len(mst_set) < len(graph.vertices):
-            for each_node in mst_set:
-                if each_node not in mst_set:
-                    #  iterate through all adjacent nodes
-                    mst_set.add(each_node)
-                    for each_edge in each_node.edges:
-                        #  calculate edge weight
-                        edge_weight = each_edge.distance
-                        if edge_weight < each_edge.node.distance:
-                            each_edge.node.distance = edge_weight
+    def kruskals(self) -> Tuple[List[Tuple[Node, Node, float]], float]:
+        """
+        Minimum spanning forest over the weighted `edges` using Kruskal's algorithm with a union-find, suited to
+        sparse graphs
 
+        :return: The (u, v, weight) tree edges and the total weight
+        """
+        from graph_algos.mst import kruskal_csr
+        return self._tree_nodes(kruskal_csr(self.to_csr()))
 
+    def _tree_nodes(self,
+                    tree: Tuple[List[Tuple[int, int, float]], float]) -> Tuple[List[Tuple[Node, Node, float]], float]:
+        graph = self.to_csr()
+        edges, total = tree
+        return [(graph.node_of(u), graph.node_of(v), weight) for u, v, weight in edges], total
+
+
+def _edges_by_node(node: Node | Vertex, cache: Dict[int, Dict[Node, List[Edge]]]) -> Dict[Node, List[Edge]]:
+    """
+    The edges of a node grouped by their other end, built once per node and bulk call
+    """
+    grouped = cache.get(id(node))
+    if grouped is None:
+        grouped = cache[id(node)] = {}
+        for edge in node.edges:
+            grouped.setdefault(edge.node, []).append(edge)
+    return grouped
+
+
+def _node_rows(graph: CSRGraph, rows: Iterator[Tuple[int, Any]]) -> Iterator[Tuple[Node, Any]]:
+    # closing these pairs closes `rows` too, which cancels the batch's pending sources
+    try:
+        for source, row in rows:
+            yield graph.node_of(source), row
+    finally:
+        rows.close()
+
+
+def _warm_start(start: Ranking | None, graph: CSRGraph) -> array | None:
+    # a ranking of a graph that since gained vertices no longer lines up, start cold instead
+    return start.scores if start is not None and len(start.scores) == graph.vertex_count else None
 
 
 if __name__ == '__main__':
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import heapq
+from itertools import count
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+
+from graph_algos.csr import NO_VERTEX
+from graph_algos.shortest_paths import dijkstra
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Graph, Node
+
+INF = float('inf')
+
+
+class DynamicShortestPaths:
+    """
+    A single source shortest path tree over the weighted `edges` that stays current while the graph changes. It
+    registers itself in `Graph.edge_listeners`, so every `Node.add_edge` and `Node.set_edge_distance` is applied as
+    it happens:
+
+    - an inserted or shortened edge only re-runs Dijkstra from the endpoint it improves, touching just the vertices
+      whose distance actually drops
+    - a lengthened tree edge invalidates the subtree hanging below it, which is re-seeded from its unaffected
+      neighbors and settled again; the rest of the tree is kept. When that subtree holds more than
+      `recompute_fraction` of the reached vertices the whole tree is recomputed instead
+
+    Weights must stay non-negative. Unreachable nodes are simply absent from `distance` and `parent`.
+    """
+
+    def __init__(self, graph: Graph, source: Node, recompute_fraction: float = 0.5):
+        """
+        :param graph: The graph to follow, its weighted `edges` are searched
+        :param source: The node every distance is measured from
+        :param recompute_fraction: The share of the tree a weight increase may invalidate before the repair falls back
+        to a full recompute
+        """
+        self.graph = graph
+        self.source = source
+        self.recompute_fraction = recompute_fraction
+        self.distance: Dict[Node, float] = {}
+        self.parent: Dict[Node, Node | None] = {}
+        self.repaired = 0  # vertices settled again by the last update, for judging how local the repairs are
+        self.recomputes = 0  # full recomputes, the initial one included
+        self._order = count()  # tie breaker, nodes do not compare
+        self.recompute()
+        graph.edge_listeners.append(self._edge_changed)
+
+    def detach(self) -> None:
+        """
+        Stops following the graph, the tree is frozen as it is
+        """
+        if self._edge_changed in self.graph.edge_listeners:
+            self.graph.edge_listeners.remove(self._edge_changed)
+
+    def recompute(self) -> None:
+        """
+        Throws the tree away and runs a full Dijkstra from the source
+        """
+        graph = self.graph.to_csr()
+        tree = dijkstra(graph, [graph.vertex_of(self.source)])
+        self.distance.clear()
+        self.parent.clear()
+        for vertex in range(graph.vertex_count):
+            if tree.distance[vertex] < INF:
+                predecessor = tree.predecessor[vertex]
+                node = graph.node_of(vertex)
+                self.distance[node] = tree.distance[vertex]
+                self.parent[node] = None if predecessor == NO_VERTEX else graph.node_of(predecessor)
+        self.repaired = len(self.distance)
+        self.recomputes += 1
+
+    def distance_to(self, node: Node) -> float:
+        return self.distance.get(node, INF)
+
+    def reached(self, node: Node) -> bool:
+        return node in self.distance
+
+    def path_to(self, node: Node) -> List[Node]:
+        """
+        :param node: The node to route to
+        :return: The nodes from the source to `node`, empty if it is unreachable
+        """
+        if node not in self.distance:
+            return []
+        path = []
+        while node is not None:
+            path.append(node)
+            node = self.parent[node]
+        path.reverse()
+        return path
+
+    def _edge_changed(self, tail: Node, head: Node, distance) -> None:
+        if distance is None:  # a `connections` edge, not part of the weighted view
+            return
+        self.repaired = 0
+        weights = [edge.distance for edge in tail.edges if edge.node is head]
+        if not weights:  # nothing between the two nodes, nothing to repair
+            return
+        weight = min(weights)  # parallel edges: the lightest counts
+        for u, v in ((tail, head), (head, tail)):
+            if self.parent.get(v) is u and self.distance[u] + weight > self.distance[v]:
+                self._increase(v)  # the tree edge into v got longer
+        for u, v in ((tail, head), (head, tail)):
+            if self.distance_to(u) + weight < self.distance_to(v):
+                self.distance[v] = self.distance[u] + weight
+                self.parent[v] = u
+                self._settle([(self.distance[v], next(self._order), v)])
+
+    def _increase(self, root: Node) -> None:
+        affected = _subtree(self.parent, root)
+        if len(affected) > self.recompute_fraction * len(self.distance):
+            self.recompute()
+            return
+        for node in affected:
+            del self.distance[node]
+            del self.parent[node]
+        heap = []
+        for node in affected:  # the best way back into the tree from outside the invalidated subtree
+            best, via = INF, None
+            for edge in node.edges:
+                candidate = self.distance.get(edge.node, INF) + edge.distance
+                if candidate < best:
+                    best, via = candidate, edge.node
+            if via is not None:
+                self.distance[node] = best
+                self.parent[node] = via
+                heap.append((best, next(self._order), node))
+        heapq.heapify(heap)
+        self._settle(heap)
+
+    def _settle(self, heap: List[Tuple[float, int, Node]]) -> None:
+        """
+        Dijkstra from the given frontier, only ever lowering distances, so it stops where nothing improves
+        """
+        while heap:
+            distance, _, node = heapq.heappop(heap)
+            if distance > self.distance[node]:
+                continue  # stale entry
+            self.repaired += 1
+            for edge in node.edges:
+                candidate = distance + edge.distance
+                if candidate < self.distance.get(edge.node, INF):
+                    self.distance[edge.node] = candidate
+                    self.parent[edge.node] = node
+                    heapq.heappush(heap, (candidate, next(self._order), edge.node))
+
+
+def _subtree(parent: Dict[Node, Node | None], root: Node) -> Set[Node]:
+    """
+    The root and every node whose tree path runs through it. Children are found through the undirected `edges`,
+    a child always has an edge back to its parent.
+    """
+    affected = {root}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for edge in node.edges:
+            child = edge.node
+            if child not in affected and parent.get(child) is node:
+                affected.add(child)
+                stack.append(child)
+    return affected
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import heapq
+from itertools import count
+from typing import AbstractSet, Iterator, List, Optional, Tuple
+
+from graph_algos.csr import NO_VERTEX, CSRGraph
+from graph_algos.shortest_paths import dijkstra
+
+Route = Tuple[Tuple[int, ...], List[float]]  # the vertices of a path, and the length of the path up to each of them
+
+
+def k_shortest_paths(graph: CSRGraph, source: int, target: int) -> Iterator[Tuple[float, List[int]]]:
+    """
+    Loopless paths from `source` to `target` in order of increasing length, each one computed only when the
+    generator is advanced (Yen's algorithm, with Lawler's rule of only branching off a path from where it left its
+    parent).
+
+    One shortest path tree towards the target is grown up front, over the transposed graph, and reused by every
+    spur search. When the tree route from a spur vertex avoids the vertices and edges that spur has to avoid, it is
+    the spur path as is. Otherwise the tree distances are an exact lower bound that steers an A* search, which then
+    only touches the few vertices around the detour. Taking the first few alternatives costs little more than the
+    one tree, and memory grows with the paths handed out, not with the graph.
+
+    :param graph: The CSRGraph to search, weights must be non-negative
+    :param source: The vertex the paths start at
+    :param target: The vertex the paths end at
+    :return: (length, vertices) of every path, shortest first. Nothing if the target is unreachable
+    """
+    tree = dijkstra(graph.transpose(), [target])
+    remaining, next_hop = tree.distance, tree.predecessor  # distance to the target, next vertex towards it
+    route = _spur_route(graph, source, target, remaining, next_hop, frozenset(), frozenset())
+    if route is None:
+        return
+    accepted: List[Tuple[int, ...]] = []
+    candidates: List[Tuple[float, int, Tuple[int, ...], List[float], int]] = []  # a heap, ordered by length
+    seen = {route[0]}
+    tiebreak = count()
+    path, lengths, deviation = route[0], route[1], 0
+    while True:
+        yield lengths[-1], list(path)
+        accepted.append(path)
+        for index in range(deviation, len(path) - 1):
+            root = path[:index + 1]
+            banned_edges = {other[index + 1] for other in accepted if other[:index + 1] == root}
+            spur = _spur_route(graph, path[index], target, remaining, next_hop, frozenset(root[:-1]), banned_edges)
+            if spur is None:
+                continue
+            vertices = root[:-1] + spur[0]
+            if vertices in seen:
+                continue
+            seen.add(vertices)
+            spur_lengths = lengths[:index] + [lengths[index] + length for length in spur[1]]
+            heapq.heappush(candidates, (spur_lengths[-1], next(tiebreak), vertices, spur_lengths, index))
+        if not candidates:
+            return
+        _, _, path, lengths, deviation = heapq.heappop(candidates)
+
+
+def _spur_route(graph: CSRGraph, spur: int, target: int, remaining, next_hop, banned_vertices: AbstractSet[int],
+                banned_edges: AbstractSet[int]) -> Optional[Route]:
+    """
+    The shortest path from `spur` to the target that avoids some vertices and some first hops
+
+    :param remaining: The distance of every vertex to the target in the full graph
+    :param next_hop: The next vertex on every vertex's shortest path to the target
+    :param banned_vertices: Vertices the path may not visit
+    :param banned_edges: Vertices the path may not step to straight from `spur`
+    :return: The path and its length up to each vertex, None if every path to the target is blocked
+    """
+    if remaining[spur] == float('inf'):
+        return None
+    if spur == target or next_hop[spur] not in banned_edges:  # try the tree route first, it is optimal if it is free
+        vertices = [spur]
+        vertex = spur
+        while vertex != target and next_hop[vertex] not in banned_vertices:
+            vertex = next_hop[vertex]
+            vertices.append(vertex)
+        if vertex == target:
+            return tuple(vertices), [remaining[spur] - remaining[vertex] for vertex in vertices]
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    best, parent = {spur: 0.0}, {spur: NO_VERTEX}
+    heap = [(remaining[spur], 0.0, spur)]
+    while heap:
+        _, length, vertex = heapq.heappop(heap)
+        if length > best[vertex]:
+            continue
+        if vertex == target:
+            vertices = [vertex]
+            while parent[vertex] != NO_VERTEX:
+                vertex = parent[vertex]
+                vertices.append(vertex)
+            vertices.reverse()
+            return tuple(vertices), [best[vertex] for vertex in vertices]
+        for slot in range(offsets[vertex], offsets[vertex + 1]):
+            head = targets[slot]
+            if head in banned_vertices or (vertex == spur and head in banned_edges) or remaining[head] == float('inf'):
+                continue
+            candidate = length + weights[slot]
+            if candidate < best.get(head, float('inf')):
+                best[head] = candidate
+                parent[head] = vertex
+                heapq.heappush(heap, (candidate + remaining[head], candidate, head))  # the tree distance is exact
+    return None
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import struct
+from array import array
+from typing import BinaryIO, List, Optional, Tuple
+
+from graph_algos.csr import CSRGraph, byte_order, filled_array
+from graph_algos.shortest_paths import astar, dijkstra
+
+MAGIC = b'GALT'
+FORMAT_VERSION = 2  # 2 added the byte order
+HEADER = struct.Struct('<4sIIqqq')  # magic, format version, byte order, landmark count, vertex count, edge count
+
+
+class LandmarkIndex:
+    """
+    ALT (A*, landmarks, triangle inequality) preprocessing. For every landmark L the distances d(L, v) and
+    d(v, L) to and from every vertex are computed once. The triangle inequality then gives, for any query,
+    d(v, t) >= max(d(L, t) - d(L, v), d(v, L) - d(t, L)), a lower bound A* can use as its heuristic.
+    """
+
+    def __init__(self, graph: CSRGraph, landmarks: List[int], from_landmark: List[array], to_landmark: List[array]):
+        """
+        :param graph: The CSRGraph the distances were computed on
+        :param landmarks: The landmark vertices
+        :param from_landmark: For every landmark, d(L, v) of every vertex
+        :param to_landmark: For every landmark, d(v, L) of every vertex
+        """
+        self.graph = graph
+        self.landmarks = landmarks
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+
+    @staticmethod
+    def build(graph: CSRGraph, count: int = 16, landmarks: Optional[List[int]] = None) -> LandmarkIndex:
+        """
+        Picks landmarks with the farthest-point heuristic (each new landmark is the vertex farthest from the ones
+        already picked, which spreads them towards the edge of the graph) and runs two Dijkstras per landmark
+
+        :param graph: The CSRGraph to index
+        :param count: How many landmarks to pick
+        :param landmarks: Use these landmarks instead of picking them
+        :return: The built index
+        """
+        reverse = graph.transpose()
+        from_landmark, to_landmark = [], []
+        if landmarks is None:
+            landmarks = []
+            picked = set()
+            nearest = filled_array('d', float('inf'), graph.vertex_count)  # distance to the closest landmark so far
+            candidate = 0
+            while len(landmarks) < min(count, graph.vertex_count):
+                landmarks.append(candidate)
+                picked.add(candidate)
+                from_landmark.append(dijkstra(graph, [candidate]).distance)
+                to_landmark.append(dijkstra(reverse, [candidate]).distance)
+                farthest = -1.0
+                for vertex in range(graph.vertex_count):
+                    dist = min(nearest[vertex], from_landmark[-1][vertex])
+                    nearest[vertex] = dist
+                    # unreachable vertices count as farthest of all, so every component gets a landmark
+                    if dist > farthest and vertex not in picked:
+                        candidate, farthest = vertex, dist
+        else:
+            for landmark in landmarks:
+                from_landmark.append(dijkstra(graph, [landmark]).distance)
+                to_landmark.append(dijkstra(reverse, [landmark]).distance)
+        return LandmarkIndex(graph, list(landmarks), from_landmark, to_landmark)
+
+    def bound(self, target: int):
+        """
+        Gathers the landmark distances of one target so every heuristic call only reads one column
+
+        :param target: The vertex queries are routed to
+        :return: The lower bound function d(v, target) >= bound(v)
+        """
+        columns: List[Tuple[array, float, array, float]] = [
+            (self.from_landmark[i], self.from_landmark[i][target], self.to_landmark[i], self.to_landmark[i][target])
+            for i in range(len(self.landmarks))
+        ]
+        inf = float('inf')
+
+        def lower_bound(vertex: int) -> float:
+            best = 0.0
+            for from_distances, from_target, to_distances, to_target in columns:
+                from_vertex, to_vertex = from_distances[vertex], to_distances[vertex]
+                if from_vertex != inf and from_target - from_vertex > best:
+                    best = from_target - from_vertex
+                if to_target != inf and to_vertex - to_target > best:
+                    best = to_vertex - to_target  # inf when L is reachable from the target but not from v
+            return best
+
+        return lower_bound
+
+    def lower_bound(self, vertex: int, target: int) -> float:
+        return self.bound(target)(vertex)
+
+    def query(self, source: int, target: int) -> Tuple[float, List[int]]:
+        """
+        Shortest route with A* guided by the landmark bounds
+
+        :param source: The vertex the route starts at
+        :param target: The vertex the route ends at
+        :return: The length of the shortest route and its vertices, (inf, []) if the target is unreachable
+        """
+        return astar(self.graph, source, target, self.bound(target))
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to a binary file: a fixed header, the landmarks, then every distance row as raw doubles in
+        this machine's byte order, which the header records
+
+        :param path: The file to write
+        """
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, byte_order(), len(self.landmarks), self.graph.vertex_count,
+                                   self.graph.edge_count))
+            array('q', self.landmarks).tofile(file)
+            for row in self.from_landmark + self.to_landmark:
+                row.tofile(file)
+
+    @staticmethod
+    def load(path: str, graph: CSRGraph) -> LandmarkIndex:
+        """
+        Reads an index written by `save`, on a machine of either byte order
+
+        :param path: The file to read
+        :param graph: The graph the index was built on
+        :return: The loaded index
+        """
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError('{} is not a landmark index'.format(path))
+            magic, version, order, count, vertex_count, edge_count = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION or order not in (1, 2):
+                raise ValueError('{} is not a landmark index this version can read'.format(path))
+            if vertex_count != graph.vertex_count or edge_count != graph.edge_count:
+                raise ValueError('{} was built for a different graph'.format(path))
+            swap = order != byte_order()
+            landmarks = _read(file, path, 'q', count, swap)
+            rows = [_read(file, path, 'd', vertex_count, swap) for _ in range(2 * count)]
+        return LandmarkIndex(graph, list(landmarks), rows[:count], rows[count:])
+
+
+def _read(file: BinaryIO, path: str, typecode: str, length: int, swap: bool) -> array:
+    buffer = array(typecode)
+    try:
+        buffer.fromfile(file, length)
+    except EOFError:
+        raise ValueError('{} is truncated'.format(path)) from None
+    if swap:  # written on a machine of the other byte order
+        buffer.byteswap()
+    return buffer
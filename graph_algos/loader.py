@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import mmap
+import struct
+from array import array
+from itertools import islice
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+from graph_algos.csr import CSRGraph, as_numpy, filled_array, index_typecode, np
+
+MAGIC = b'GAEL'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sII')  # magic, format version, flags; 12 bytes, padded to 16 so records stay aligned
+HEADER_SIZE = 16
+WEIGHTED = 1  # flag: every record carries a float64 weight after the two int64 endpoints
+
+Chunk = Tuple[Sequence[int], Sequence[int], Optional[Sequence[float]]]  # sources, targets, weights of some edges
+
+
+def load_edge_list(path: str, delimiter: Optional[str] = None, weighted: bool = True, directed: bool = True,
+                   vertex_count: Optional[int] = None, comment: str = '#', chunk_size: int = 1 << 20) -> CSRGraph:
+    """
+    Builds a CSRGraph from a text edge list, one `source target [weight]` line per edge (CSV with delimiter=',',
+    TSV or whitespace separated with the default). Vertices are the integers in the file. The file is read twice,
+    chunk by chunk: once to count degrees and once to place every edge straight into its final slot, so nothing
+    but the finished adjacency is ever held in memory.
+
+    :param path: The file to read
+    :param delimiter: The field separator, any whitespace when None
+    :param weighted: Read the third column as the edge weight, every edge weighs 1 otherwise
+    :param directed: When False every edge is stored in both directions
+    :param vertex_count: The number of vertices, one more than the largest id in the file when None
+    :param comment: Lines starting with this, after any indentation, are skipped
+    :param chunk_size: How many lines are parsed at once
+    :return: The built CSRGraph
+    """
+    def chunks() -> Iterator[Chunk]:
+        with open(path, 'r') as file:
+            lines = (line for line in file if line.strip() and not line.lstrip().startswith(comment))
+            while True:
+                block = list(islice(lines, chunk_size))
+                if not block:
+                    return
+                yield _parse(block, delimiter, weighted)
+
+    return build_from_chunks(chunks, directed, vertex_count)
+
+
+def write_binary_edges(path: str, sources: Sequence[int], targets: Sequence[int],
+                       weights: Optional[Sequence[float]] = None) -> None:
+    """
+    Writes edges in the packed binary format `load_binary_edges` reads: a 16 byte header followed by one
+    little-endian record per edge, (int64 source, int64 target) plus a float64 weight when weighted
+
+    :param path: The file to write
+    :param sources: The tail of every edge
+    :param targets: The head of every edge
+    :param weights: The weight of every edge, or None for an unweighted file
+    """
+    record = struct.Struct('<qqd' if weights is not None else '<qq')
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, WEIGHTED if weights is not None else 0).ljust(HEADER_SIZE, b'\0'))
+        for start in range(0, len(sources), 1 << 16):
+            end = min(start + (1 << 16), len(sources))
+            if weights is None:
+                file.write(b''.join(record.pack(sources[i], targets[i]) for i in range(start, end)))
+            else:
+                file.write(b''.join(record.pack(sources[i], targets[i], weights[i]) for i in range(start, end)))
+
+
+def load_binary_edges(path: str, directed: bool = True, vertex_count: Optional[int] = None,
+                      chunk_size: int = 1 << 22) -> CSRGraph:
+    """
+    Builds a CSRGraph from a packed binary edge file. The file is memory mapped and walked in chunks, so it can be
+    far larger than RAM; only the finished adjacency has to fit.
+
+    :param path: The file to read, written by `write_binary_edges`
+    :param directed: When False every edge is stored in both directions
+    :param vertex_count: The number of vertices, one more than the largest id in the file when None
+    :param chunk_size: How many edges are decoded at once
+    :return: The built CSRGraph
+    """
+    with open(path, 'rb') as file:
+        magic, version, flags = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('{} is not an edge file this version can read'.format(path))
+        fields = 3 if flags & WEIGHTED else 2
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)[HEADER_SIZE:]
+            edge_count = len(view) // (8 * fields)
+
+            def chunks() -> Iterator[Chunk]:
+                for start in range(0, edge_count, chunk_size):
+                    end = min(start + chunk_size, edge_count)
+                    block = view[start * 8 * fields:end * 8 * fields]
+                    if np is not None:
+                        integers = np.frombuffer(block, dtype='<i8').reshape(-1, fields)
+                        weights = np.frombuffer(block, dtype='<f8').reshape(-1, fields)[:, 2] if fields == 3 else None
+                        yield integers[:, 0], integers[:, 1], weights
+                    else:
+                        integers = block.cast('q')
+                        weights = block.cast('d')[2::3] if fields == 3 else None
+                        yield integers[0::fields], integers[1::fields], weights
+
+            try:
+                return build_from_chunks(chunks, directed, vertex_count)
+            except ValueError as error:  # its traceback pins views into the map, so it is raised again once closed
+                message = str(error)
+            finally:
+                view.release()
+    raise ValueError(message)
+
+
+def build_from_chunks(chunks: Callable[[], Iterator[Chunk]], directed: bool = True,
+                      vertex_count: Optional[int] = None) -> CSRGraph:
+    """
+    Two pass bulk CSR construction over a re-iterable stream of edge chunks. The first pass counts every vertex's
+    degree, the second scatters each edge into its slot, so no per-edge Python object outlives its chunk.
+
+    :param chunks: Called once per pass, returns an iterator of (sources, targets, weights or None) chunks
+    :param directed: When False every edge is stored in both directions
+    :param vertex_count: The number of vertices, one more than the largest id seen when None
+    :return: The built CSRGraph
+    :raises ValueError: If a vertex id is negative, or not below `vertex_count` when given
+    """
+    degree = array('q', [0]) * (vertex_count or 0)
+    for sources, targets, _ in chunks():
+        if len(sources) == 0:
+            continue
+        smallest = min(_smallest(sources), _smallest(targets))
+        if smallest < 0:  # would index from the end of the degree array
+            raise ValueError('Vertex {} is negative'.format(smallest))
+        largest = max(_largest(sources), _largest(targets)) + 1
+        if largest > len(degree):
+            if vertex_count is not None:
+                raise ValueError('Vertex {} is out of range for {} vertices'.format(largest - 1, vertex_count))
+            degree.extend(array('q', [0]) * (largest - len(degree)))
+        for column in (sources,) if directed else (sources, targets):
+            if np is not None:
+                as_numpy(degree)[:] += np.bincount(np.asarray(column, dtype=np.int64), minlength=len(degree))
+            else:
+                for vertex in column:
+                    degree[vertex] += 1
+    vertex_count = len(degree)
+
+    edge_total = sum(degree)
+    offsets = array(index_typecode(edge_total + 1), [0]) * (vertex_count + 1)
+    if np is not None:
+        as_numpy(offsets)[1:] = np.cumsum(as_numpy(degree))
+    else:
+        for vertex in range(vertex_count):
+            offsets[vertex + 1] = offsets[vertex] + degree[vertex]
+    cursor = array('q', offsets[:-1])
+    out_targets = filled_array(index_typecode(vertex_count), 0, edge_total)
+    out_weights = filled_array('d', 1.0, edge_total)
+    for sources, targets, weights in chunks():
+        _scatter(cursor, out_targets, out_weights, sources, targets, weights)
+        if not directed:
+            _scatter(cursor, out_targets, out_weights, targets, sources, weights)
+    return CSRGraph(offsets, out_targets, out_weights)
+
+
+def _largest(column) -> int:
+    return int(np.max(column)) if np is not None else max(column)
+
+
+def _smallest(column) -> int:
+    return int(np.min(column)) if np is not None else min(column)
+
+
+def _scatter(cursor: array, out_targets: array, out_weights: array, sources, targets, weights) -> None:
+    if np is not None and len(sources):
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind='stable')
+        ordered = sources[order]
+        vertices, first, counts = np.unique(ordered, return_index=True, return_counts=True)
+        cursors = as_numpy(cursor)
+        slots = cursors[ordered] + np.arange(len(ordered)) - np.repeat(first, counts)
+        as_numpy(out_targets)[slots] = np.asarray(targets)[order]
+        if weights is not None:
+            as_numpy(out_weights)[slots] = np.asarray(weights, dtype=np.float64)[order]
+        cursors[vertices] += counts
+        return
+    for i in range(len(sources)):
+        source = sources[i]
+        slot = cursor[source]
+        out_targets[slot] = targets[i]
+        if weights is not None:
+            out_weights[slot] = weights[i]
+        cursor[source] = slot + 1
+
+
+def _parse(lines, delimiter: Optional[str], weighted: bool) -> Chunk:
+    if np is not None:  # the ids are parsed as integers, float64 would round those above 2 ** 53
+        columns = [('source', np.int64), ('target', np.int64)] + ([('weight', np.float64)] if weighted else [])
+        table = np.loadtxt(lines, delimiter=delimiter, ndmin=1, dtype=columns, usecols=range(len(columns)))
+        return table['source'], table['target'], table['weight'] if weighted else None
+    sources, targets = array('q'), array('q')
+    weights = array('d') if weighted else None
+    for line in lines:
+        fields = line.split(delimiter)
+        sources.append(int(fields[0]))
+        targets.append(int(fields[1]))
+        if weighted:
+            weights.append(float(fields[2]))
+    return sources, targets, weights
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from array import array
+from itertools import chain
+from typing import List, Optional, Sequence, Tuple
+
+from graph_algos.csr import NO_VERTEX, CSRGraph, filled_array, index_typecode, typecode_of
+
+SpanningTree = Tuple[List[Tuple[int, int, float]], float]  # the (u, v, weight) tree edges and the total weight
+
+
+class IndexedHeap:
+    """
+    Binary min heap over the vertices 0..capacity - 1 that knows where every vertex sits, so a key can be lowered
+    in O(log n) instead of pushing a duplicate entry
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Allocates the heap, position and key arrays up front
+
+        :param capacity: The number of distinct vertices the heap can hold
+        """
+        self.heap = array(index_typecode(capacity))  # heap slot -> vertex
+        self.position = filled_array(index_typecode(capacity), NO_VERTEX, capacity)  # vertex -> heap slot
+        self.keys = filled_array('d', float('inf'), capacity)
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, vertex: int) -> bool:
+        return self.position[vertex] != NO_VERTEX
+
+    def push_or_decrease(self, vertex: int, key: float) -> bool:
+        """
+        Inserts the vertex, or lowers its key if it is already queued
+
+        :param vertex: The vertex to queue
+        :param key: Its new key
+        :return: Whether the heap changed (False if the vertex was queued with a key that is not larger)
+        """
+        slot = self.position[vertex]
+        if slot == NO_VERTEX:
+            self.heap.append(vertex)
+            slot = len(self.heap) - 1
+            self.position[vertex] = slot
+        elif key >= self.keys[vertex]:
+            return False
+        self.keys[vertex] = key
+        self._sift_up(slot)
+        return True
+
+    def pop(self) -> Tuple[int, float]:
+        """
+        Removes the vertex with the smallest key
+
+        :return: The vertex and its key
+        """
+        heap, position = self.heap, self.position
+        top = heap[0]
+        last = heap.pop()
+        position[top] = NO_VERTEX
+        if heap:
+            heap[0] = last
+            position[last] = 0
+            self._sift_down(0)
+        return top, self.keys[top]
+
+    def _sift_up(self, slot: int) -> None:
+        heap, position, keys = self.heap, self.position, self.keys
+        vertex = heap[slot]
+        key = keys[vertex]
+        while slot > 0:
+            parent_slot = (slot - 1) >> 1
+            parent = heap[parent_slot]
+            if keys[parent] <= key:
+                break
+            heap[slot] = parent
+            position[parent] = slot
+            slot = parent_slot
+        heap[slot] = vertex
+        position[vertex] = slot
+
+    def _sift_down(self, slot: int) -> None:
+        heap, position, keys = self.heap, self.position, self.keys
+        size = len(heap)
+        vertex = heap[slot]
+        key = keys[vertex]
+        while True:
+            child_slot = 2 * slot + 1
+            if child_slot >= size:
+                break
+            if child_slot + 1 < size and keys[heap[child_slot + 1]] < keys[heap[child_slot]]:
+                child_slot += 1
+            child = heap[child_slot]
+            if keys[child] >= key:
+                break
+            heap[slot] = child
+            position[child] = slot
+            slot = child_slot
+        heap[slot] = vertex
+        position[vertex] = slot
+
+
+class DisjointSet:
+    """
+    Union-find over the integers 0..size - 1 with path compression and union by rank, so every operation runs in
+    amortized O(α(n))
+    """
+
+    def __init__(self, size: int):
+        self.parent = array(index_typecode(size), range(size))
+        self.rank = bytearray(size)  # ranks never exceed log2(size) < 64
+        self.sets = size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:  # compress the path we just walked
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, first: int, second: int) -> bool:
+        """
+        Merges the sets holding the two items
+
+        :param first: An item of the first set
+        :param second: An item of the second set
+        :return: False if both items already were in the same set
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.rank[first] < self.rank[second]:
+            first, second = second, first
+        self.parent[second] = first
+        if self.rank[first] == self.rank[second]:
+            self.rank[first] += 1
+        self.sets -= 1
+        return True
+
+    def connected(self, first: int, second: int) -> bool:
+        return self.find(first) == self.find(second)
+
+    def add(self) -> int:
+        """
+        Grows the universe by one item, in a set of its own
+
+        :return: The new item
+        """
+        item = len(self.parent)
+        if index_typecode(item + 1) != typecode_of(self.parent):
+            self.parent = array(index_typecode(item + 1), self.parent)
+        self.parent.append(item)
+        self.rank.append(0)
+        self.sets += 1
+        return item
+
+
+def prim(graph: CSRGraph, root: Optional[int] = 0) -> SpanningTree:
+    """
+    Prim's algorithm with an indexed decrease-key heap, O(E log V). The heap never holds more than one entry per
+    vertex, which keeps it small on dense graphs. If the graph is disconnected the remaining components are grown
+    from their lowest vertex, giving a minimum spanning forest.
+
+    :param graph: An undirected CSRGraph (every edge stored in both directions)
+    :param root: The vertex the tree is grown from first
+    :return: The (parent, child, weight) tree edges and the total weight
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    vertex_count = graph.vertex_count
+    in_tree = bytearray(vertex_count)
+    link = filled_array(index_typecode(vertex_count), NO_VERTEX, vertex_count)  # cheapest known tree neighbor
+    heap = IndexedHeap(vertex_count)
+    tree: List[Tuple[int, int, float]] = []
+    total = 0.0
+    starts = [root] if root is not None and vertex_count else []
+    for start in chain(starts, range(vertex_count)):
+        if in_tree[start]:
+            continue
+        heap.push_or_decrease(start, 0.0)
+        while len(heap):
+            vertex, key = heap.pop()
+            in_tree[vertex] = 1
+            if link[vertex] != NO_VERTEX:
+                tree.append((link[vertex], vertex, key))
+                total += key
+            for slot in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[slot]
+                if not in_tree[neighbor] and heap.push_or_decrease(neighbor, weights[slot]):
+                    link[neighbor] = vertex
+    return tree, total
+
+
+def kruskal(vertex_count: int, sources: Sequence[int], targets: Sequence[int],
+            weights: Sequence[float]) -> SpanningTree:
+    """
+    Kruskal's algorithm over a plain edge list, O(E log E) for the sort plus near constant time per union-find
+    operation. Stops as soon as the forest spans every vertex.
+
+    :param vertex_count: The number of vertices
+    :param sources: One endpoint of every edge
+    :param targets: The other endpoint of every edge
+    :param weights: The weight of every edge
+    :return: The (u, v, weight) tree edges and the total weight
+    """
+    sets = DisjointSet(vertex_count)
+    tree: List[Tuple[int, int, float]] = []
+    total = 0.0
+    for edge in sorted(range(len(sources)), key=weights.__getitem__):
+        if sets.union(sources[edge], targets[edge]):
+            tree.append((sources[edge], targets[edge], weights[edge]))
+            total += weights[edge]
+            if sets.sets == 1:
+                break
+    return tree, total
+
+
+def kruskal_csr(graph: CSRGraph) -> SpanningTree:
+    """
+    Kruskal's algorithm over an undirected CSRGraph, every edge is read once from its lower endpoint
+
+    :param graph: An undirected CSRGraph (every edge stored in both directions)
+    :return: The (u, v, weight) tree edges and the total weight
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    sources = array(typecode_of(targets))
+    heads = array(typecode_of(targets))
+    edge_weights = array('d')
+    for vertex in range(graph.vertex_count):
+        for slot in range(offsets[vertex], offsets[vertex + 1]):
+            if vertex < targets[slot]:
+                sources.append(vertex)
+                heads.append(targets[slot])
+                edge_weights.append(weights[slot])
+    return kruskal(graph.vertex_count, sources, heads, edge_weights)
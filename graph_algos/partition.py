@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import multiprocessing
+from array import array
+from collections import deque
+from itertools import chain
+from multiprocessing.connection import Connection
+from typing import List, Optional, Tuple
+
+from graph_algos.csr import NO_VERTEX, CSRGraph, as_numpy, filled_array, index_typecode, np
+from graph_algos.traversal import LevelTraversal, _gather
+
+_POLL_INTERVAL = 0.1  # seconds the coordinator waits on a worker between checks that it is still running
+
+
+class Shard:
+    """
+    The part of a graph one worker owns: its vertices and their out-edges, and nothing else. Every edge head is
+    stored as `local index * parts + part`, the index of the head within the shard that owns it, so a worker can
+    address any vertex without a global lookup table.
+    """
+
+    def __init__(self, part: int, parts: int, members: array, offsets: array, heads: array):
+        """
+        :param part: The number of this shard
+        :param parts: The number of shards
+        :param members: The global vertex of every local vertex, ascending
+        :param offsets: len(members) + 1 prefix sums of the local out degrees
+        :param heads: The encoded head of every out-edge, grouped by local tail
+        """
+        self.part = part
+        self.parts = parts
+        self.members = members
+        self.offsets = offsets
+        self.heads = heads
+
+
+class Partition:
+    """
+    An assignment of every vertex of a graph to one of `parts` shards
+    """
+
+    def __init__(self, graph: CSRGraph, parts: int, owner: array):
+        """
+        :param graph: The partitioned CSRGraph
+        :param parts: The number of parts
+        :param owner: The part of every vertex
+        """
+        self.graph = graph
+        self.parts = parts
+        self.owner = owner
+        self.sizes = [0] * parts
+        for part in owner:
+            self.sizes[part] += 1
+        self._shards: List[Shard] | None = None
+
+    @property
+    def edge_cut(self) -> int:
+        """
+        The number of stored edges whose ends sit in different parts, every one of them is a message during a search
+        """
+        graph, owner = self.graph, self.owner
+        if np is not None:
+            owners = as_numpy(owner)
+            tails = np.repeat(owners, np.diff(as_numpy(graph.offsets)))
+            return int(np.count_nonzero(tails != owners[as_numpy(graph.targets)]))
+        return sum(1 for vertex in range(graph.vertex_count) for neighbor in graph.neighbors(vertex)
+                   if owner[neighbor] != owner[vertex])
+
+    def members(self, part: int) -> List[int]:
+        return [vertex for vertex in range(self.graph.vertex_count) if self.owner[vertex] == part]
+
+    def local_index(self) -> array:
+        """
+        The position of every vertex within its own part, parts list their vertices in ascending order
+        """
+        seen = [0] * self.parts
+        local = filled_array(index_typecode(self.graph.vertex_count), 0, self.graph.vertex_count)
+        for vertex, part in enumerate(self.owner):
+            local[vertex] = seen[part]
+            seen[part] += 1
+        return local
+
+    def shards(self) -> List[Shard]:
+        """
+        Splits the adjacency into one Shard per part, computed once and cached
+        """
+        if self._shards is None:
+            graph, parts = self.graph, self.parts
+            local = self.local_index()
+            code = index_typecode(graph.vertex_count * parts)
+            self._shards = []
+            for part in range(parts):
+                members = array(index_typecode(graph.vertex_count), self.members(part))
+                offsets = array('q', [0])
+                heads = array(code)
+                for vertex in members:
+                    heads.extend(local[head] * parts + self.owner[head] for head in graph.neighbors(vertex))
+                    offsets.append(len(heads))
+                self._shards.append(Shard(part, parts, members, offsets, heads))
+        return self._shards
+
+
+def partition_graph(graph: CSRGraph, parts: int, imbalance: float = 0.05, passes: int = 4) -> Partition:
+    """
+    Splits the vertices into `parts` balanced parts while keeping few edges between them. Vertices are streamed in
+    breadth first order and each one joins the part holding most of its already placed neighbors, discounted by how
+    full that part is (linear deterministic greedy, Stanton and Kliot). A few label propagation passes then move
+    vertices to the part most of their neighbors ended up in, as long as that part has room.
+
+    :param graph: The CSRGraph to split, edges count in both directions
+    :param parts: The number of parts
+    :param imbalance: How far a part may grow past `vertex_count / parts`, 0.05 is 5%
+    :param passes: The most refinement passes, they stop early once nothing moves
+    :return: The part of every vertex
+    """
+    if parts < 1:
+        raise ValueError('A graph needs at least one part')
+    vertex_count = graph.vertex_count
+    capacity = max(-(-vertex_count // parts), int(vertex_count / parts * (1 + imbalance)))
+    reverse = graph.transpose()
+    owner = filled_array(index_typecode(parts), -1, vertex_count)
+    sizes = [0] * parts
+
+    def neighbor_counts(vertex: int) -> List[int]:
+        counts = [0] * parts
+        for neighbor in chain(graph.neighbors(vertex), reverse.neighbors(vertex)):
+            if owner[neighbor] >= 0 and neighbor != vertex:
+                counts[owner[neighbor]] += 1
+        return counts
+
+    for vertex in _stream_order(graph, reverse):
+        counts = neighbor_counts(vertex)
+        part = max((part for part in range(parts) if sizes[part] < capacity),
+                   key=lambda part: (counts[part] * (1 - sizes[part] / capacity), -sizes[part]))
+        owner[vertex] = part
+        sizes[part] += 1
+
+    for _ in range(passes):
+        moved = 0
+        for vertex in range(vertex_count):
+            counts, current = neighbor_counts(vertex), owner[vertex]
+            part = max(range(parts), key=lambda part: (counts[part], part == current))
+            if counts[part] > counts[current] and sizes[part] < capacity:
+                owner[vertex] = part
+                sizes[current] -= 1
+                sizes[part] += 1
+                moved += 1
+        if not moved:
+            break
+    return Partition(graph, parts, owner)
+
+
+def _stream_order(graph: CSRGraph, reverse: CSRGraph) -> List[int]:
+    """
+    Every vertex once, breadth first over the undirected view, so most vertices arrive after some of their neighbors
+    """
+    seen = bytearray(graph.vertex_count)
+    order = []
+    for root in range(graph.vertex_count):
+        if seen[root]:
+            continue
+        seen[root] = 1
+        queue = deque([root])
+        while queue:
+            vertex = queue.popleft()
+            order.append(vertex)
+            for neighbor in chain(graph.neighbors(vertex), reverse.neighbors(vertex)):
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    queue.append(neighbor)
+    return order
+
+
+def partitioned_bfs(graph: CSRGraph, source: int, target: Optional[int] = None,
+                    parts: int | Partition = 2) -> LevelTraversal:
+    """
+    Level synchronous breadth first search over a graph split into shards, one worker process per shard. Every
+    worker only holds its own vertices and their out-edges. Each level it expands its part of the frontier, keeps
+    the heads it owns, and sends the others to their owners' queues. A coordinator sums the new frontiers after
+    every level and stops the workers once they are all empty, or once the target was discovered.
+
+    :param graph: The CSRGraph to search
+    :param source: The vertex the search starts from
+    :param target: Stops at the end of the level the target is discovered on, when given
+    :param parts: The number of shards to split the graph into, or an existing Partition of it
+    :return: The depth and parent of every vertex, like `traversal.frontier_bfs`
+    """
+    partition = parts if isinstance(parts, Partition) else partition_graph(graph, parts)
+    shards = partition.shards()
+    local = partition.local_index()
+    inboxes = [multiprocessing.Queue() for _ in shards]
+    controls, workers = [], []
+    for shard in shards:
+        here, there = multiprocessing.Pipe()
+        start = local[source] if partition.owner[source] == shard.part else -1
+        goal = local[target] if target is not None and partition.owner[target] == shard.part else -1
+        worker = multiprocessing.Process(target=_run_shard, args=(shard, start, goal, inboxes, there), daemon=True)
+        worker.start()
+        there.close()  # the worker holds its own copy, a worker that dies then reads as end of file here
+        controls.append(here)
+        workers.append(worker)
+
+    frontier_sizes, found, results = [1], target if target == source else None, None
+    try:
+        while found is None:
+            for control, worker in zip(controls, workers):
+                _send(control, worker, True)
+            reports = [_receive(control, worker, workers) for control, worker in zip(controls, workers)]
+            discovered = sum(size for size, _ in reports)
+            if discovered:
+                frontier_sizes.append(discovered)
+            if any(reached for _, reached in reports):
+                found = target
+            if not discovered:
+                break
+        for control, worker in zip(controls, workers):
+            _send(control, worker, False)
+        results = [_receive(control, worker, workers) for control, worker in zip(controls, workers)]
+    finally:
+        for control in controls:
+            control.close()
+        for worker in workers:
+            # done once it sent its results, after a failure it may be stuck waiting on the shard that died
+            worker.join(timeout=1 if results is not None else 0)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        for inbox in inboxes:
+            inbox.close()
+
+    vertex_count = graph.vertex_count
+    if np is not None:
+        depth = np.full(vertex_count, -1, dtype=np.int64)
+        parent = np.full(vertex_count, NO_VERTEX, dtype=np.int64)
+        for shard, (shard_depth, shard_parent) in zip(shards, results):
+            members = as_numpy(shard.members)
+            depth[members] = shard_depth
+            parent[members] = shard_parent
+    else:
+        depth = filled_array(index_typecode(vertex_count), -1, vertex_count)
+        parent = filled_array(index_typecode(vertex_count), NO_VERTEX, vertex_count)
+        for shard, (shard_depth, shard_parent) in zip(shards, results):
+            for vertex, vertex_depth, vertex_parent in zip(shard.members, shard_depth, shard_parent):
+                depth[vertex], parent[vertex] = vertex_depth, vertex_parent
+    return LevelTraversal(graph, source, depth, parent, frontier_sizes, found)
+
+
+def _send(control: Connection, worker: multiprocessing.Process, message) -> None:
+    try:
+        control.send(message)
+    except BrokenPipeError:
+        raise _worker_failed(worker) from None
+
+
+def _receive(control: Connection, worker: multiprocessing.Process, workers: List[multiprocessing.Process]):
+    """
+    The next message from a worker, checking between waits that no worker failed. The others block on the queue
+    of a shard that died, so any of them failing means the message may never come.
+
+    :raises RuntimeError: If the worker exited before sending it, or another worker exited with an error
+    """
+    while not control.poll(_POLL_INTERVAL):
+        if worker.exitcode is not None:
+            break
+        failed = next((other for other in workers if other.exitcode), None)  # crashed or killed
+        if failed is not None:
+            raise _worker_failed(failed)
+    try:
+        return control.recv()
+    except EOFError:
+        raise _worker_failed(worker) from None
+
+
+def _worker_failed(worker: multiprocessing.Process) -> RuntimeError:
+    worker.join(timeout=1)
+    return RuntimeError('Shard worker {} exited with code {}'.format(worker.name, worker.exitcode))
+
+
+def _run_shard(shard: Shard, start: int, goal: int, inboxes: List[multiprocessing.Queue], control: Connection) -> None:
+    """
+    The worker side of `partitioned_bfs`. Every level is one round of: wait for the go ahead, expand, send one
+    message to every other shard (empty ones too, so the receivers know when a level is complete), take in one
+    message from every other shard, report the size of the new frontier.
+
+    :param start: The local index of the source, -1 if another shard owns it
+    :param goal: The local index of the target, -1 if there is none or another shard owns it
+    """
+    expand, absorb = (_expand_numpy, _absorb_numpy) if np is not None else (_expand_python, _absorb_python)
+    size = len(shard.members)
+    depth = filled_array(index_typecode(size), -1, size)
+    parent = filled_array(index_typecode(size), NO_VERTEX, size)
+    frontier = [start] if start >= 0 else []
+    if start >= 0:
+        depth[start] = 0
+    level = 0
+    while control.recv():
+        level += 1
+        frontier, outgoing = expand(shard, frontier, depth, parent, level)
+        for part, message in enumerate(outgoing):
+            if part != shard.part:
+                inboxes[part].put(message)
+        messages = [inboxes[shard.part].get() for _ in range(shard.parts - 1)]
+        frontier.extend(absorb(messages, depth, parent, level))
+        control.send((len(frontier), goal >= 0 and depth[goal] >= 0))
+    control.send((depth, parent))
+
+
+def _expand_python(shard: Shard, frontier: List[int], depth: array, parent: array,
+                   level: int) -> Tuple[List[int], List[Tuple[array, array]]]:
+    """
+    :return: The newly discovered local vertices, and the (local heads, global parents) to send to every shard,
+    one entry per head
+    """
+    offsets, heads, members, parts = shard.offsets, shard.heads, shard.members, shard.parts
+    outgoing = [{} for _ in range(parts)]
+    discovered = []
+    for vertex in frontier:
+        for encoded in heads[offsets[vertex]:offsets[vertex + 1]]:
+            head, part = divmod(encoded, parts)
+            if part != shard.part:
+                outgoing[part].setdefault(head, members[vertex])
+            elif depth[head] < 0:
+                depth[head] = level
+                parent[head] = members[vertex]
+                discovered.append(head)
+    return discovered, [(array('q', message.keys()), array('q', message.values())) for message in outgoing]
+
+
+def _absorb_python(messages: List[Tuple[array, array]], depth: array, parent: array, level: int) -> List[int]:
+    """
+    Marks the heads other shards discovered that this shard has not seen yet
+
+    :return: Those heads, local indices
+    """
+    received = []
+    for heads, parents in messages:
+        for head, head_parent in zip(heads, parents):
+            if depth[head] < 0:
+                depth[head] = level
+                parent[head] = head_parent
+                received.append(head)
+    return received
+
+
+def _expand_numpy(shard: Shard, frontier: List[int], depth: array, parent: array, level: int):
+    offsets, heads, members = as_numpy(shard.offsets), as_numpy(shard.heads), as_numpy(shard.members)
+    tails, encoded = _gather(offsets, heads, np.asarray(frontier, dtype=np.int64))
+    head_parts, encoded = encoded % shard.parts, encoded // shard.parts
+    outgoing = []
+    for part in range(shard.parts):
+        on_part = head_parts == part
+        targets, first = np.unique(encoded[on_part], return_index=True)  # one message entry per head
+        sources = members[tails[on_part][first]]
+        if part == shard.part:
+            fresh = as_numpy(depth)[targets] < 0
+            targets = targets[fresh]
+            as_numpy(depth)[targets] = level
+            as_numpy(parent)[targets] = sources[fresh]
+            discovered = targets.tolist()
+            outgoing.append(None)
+        else:
+            outgoing.append((targets, sources))
+    return discovered, outgoing
+
+
+def _absorb_numpy(messages, depth: array, parent: array, level: int) -> List[int]:
+    if not messages:
+        return []
+    heads = np.concatenate([message[0] for message in messages])
+    parents = np.concatenate([message[1] for message in messages])
+    heads, first = np.unique(heads, return_index=True)
+    fresh = as_numpy(depth)[heads] < 0
+    heads = heads[fresh]
+    as_numpy(depth)[heads] = level
+    as_numpy(parent)[heads] = parents[first][fresh]
+    return heads.tolist()
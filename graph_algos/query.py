@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from graph_algos.dfs import Graph, Node
+
+
+class QueryExecutor:
+    """
+    Runs queries against one read-only `Graph` on a thread pool. Every query keeps its traversal state in its own
+    arrays, so no locking or label reset is needed between them. The graph must not be modified while queries
+    are in flight.
+    """
+
+    def __init__(self, graph: Graph, max_workers: Optional[int] = None):
+        """
+        Compiles both adjacency views up front so worker threads only ever read them
+
+        :param graph: The graph every query runs against
+        :param max_workers: The size of the thread pool, defaults to the ThreadPoolExecutor default
+        """
+        self.graph = graph
+        graph.to_csr(weighted=True)
+        graph.to_csr(weighted=False)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='graph-query')
+
+    def submit(self, query: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Schedules any callable, usually a bound `Graph` method
+
+        :param query: The callable to run on the pool
+        :return: The future of its result
+        """
+        return self.pool.submit(query, *args, **kwargs)
+
+    def bfs(self, root: Node, node: Node | None) -> Future:
+        return self.submit(self.graph.bfs, root, node)
+
+    def dfs(self, root: Node, target: Node | None) -> Future:
+        return self.submit(self.graph.dfs, root, target)
+
+    def dijkstras(self, initialNode: Node, target: Node | None = None) -> Future:
+        return self.submit(self.graph.dijkstras, initialNode, target)
+
+    def map(self, query: Callable[..., Any], queries: Iterable[Tuple]) -> Iterator[Any]:
+        """
+        Runs the callable once per argument tuple, in parallel
+
+        :param query: The callable to run, e.g. `graph.dijkstras`
+        :param queries: One tuple of positional arguments per query
+        :return: The results, in the order of `queries`
+        """
+        futures = [self.pool.submit(query, *arguments) for arguments in queries]
+        return (future.result() for future in futures)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.pool.shutdown(wait=wait)
+
+    def __enter__(self) -> QueryExecutor:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
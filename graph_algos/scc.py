@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from array import array
+
+from graph_algos.components import Components
+from graph_algos.csr import NO_VERTEX, CSRGraph, as_numpy, filled_array, index_typecode, np, typecode_of
+from graph_algos.traversal import _walk
+
+
+def strongly_connected_components(graph: CSRGraph) -> Components:
+    """
+    Tarjan's algorithm, O(|V| + |E|), without recursion: the call stack is a pair of flat arrays (vertex, next edge
+    slot), so graphs with millions of vertices on one long path work just as well as shallow ones.
+
+    Components are numbered in topological order of the condensation, every edge between two components goes from
+    the lower id to the higher one.
+
+    :param graph: A directed CSRGraph
+    :return: The component id of every vertex and the size of every component
+    """
+    offsets, targets, vertex_count = graph.offsets, graph.targets, graph.vertex_count
+    typecode = index_typecode(vertex_count)
+    index = filled_array('q', NO_VERTEX, vertex_count)  # discovery time
+    low = array('q', [0]) * vertex_count  # the earliest discovery time reachable through the subtree
+    on_stack = bytearray(vertex_count)
+    finished = filled_array(typecode, NO_VERTEX, vertex_count)  # component in the order Tarjan closes them, sinks first
+    stack = array(typecode)
+    vertex_stack, cursor_stack = array(typecode), array(typecode_of(offsets))
+    time = found = 0
+    for root in range(vertex_count):
+        if index[root] != NO_VERTEX:
+            continue
+        index[root] = low[root] = time
+        time += 1
+        stack.append(root)
+        on_stack[root] = 1
+        vertex_stack.append(root)
+        cursor_stack.append(offsets[root])
+        while vertex_stack:
+            vertex = vertex_stack[-1]
+            slot, end = cursor_stack[-1], offsets[vertex + 1]
+            while slot < end:
+                neighbor = targets[slot]
+                slot += 1
+                if index[neighbor] == NO_VERTEX:  # descend, resuming at `slot` once the neighbor is done
+                    cursor_stack[-1] = slot
+                    index[neighbor] = low[neighbor] = time
+                    time += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = 1
+                    vertex_stack.append(neighbor)
+                    cursor_stack.append(offsets[neighbor])
+                    break
+                if on_stack[neighbor] and index[neighbor] < low[vertex]:
+                    low[vertex] = index[neighbor]
+            else:  # every edge is explored, the vertex is done
+                vertex_stack.pop()
+                cursor_stack.pop()
+                if low[vertex] == index[vertex]:  # the root of a component, everything above it on the stack is in it
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        finished[member] = found
+                        if member == vertex:
+                            break
+                    found += 1
+                if vertex_stack and low[vertex] < low[vertex_stack[-1]]:
+                    low[vertex_stack[-1]] = low[vertex]
+
+    ids = array(typecode, [0]) * vertex_count
+    sizes = array('q', [0]) * found
+    for vertex in range(vertex_count):
+        component = found - 1 - finished[vertex]  # reversed, so sources of the condensation come first
+        ids[vertex] = component
+        sizes[component] += 1
+    return Components(graph, ids, sizes)
+
+
+def condensation(graph: CSRGraph, components: Components) -> CSRGraph:
+    """
+    The DAG with one vertex per strongly connected component and one edge wherever any edge crosses between two
+    components, weighted with the lightest of them. Vertex i of the result is component i.
+
+    :param graph: The directed CSRGraph the components were computed on
+    :param components: Its `strongly_connected_components`
+    :return: The condensation
+    """
+    ids, count = components.ids, components.count
+    if np is not None:
+        component_of = as_numpy(ids).astype(np.int64)
+        sources = component_of[np.repeat(np.arange(graph.vertex_count), np.diff(as_numpy(graph.offsets)))]
+        targets = component_of[as_numpy(graph.targets)]
+        weights = as_numpy(graph.weights)
+        crossing = sources != targets
+        sources, targets, weights = sources[crossing], targets[crossing], weights[crossing]
+        order = np.lexsort((weights, targets, sources))  # the lightest parallel edge first, then keep first of each
+        keys = sources[order] * count + targets[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        order = order[first]
+        return CSRGraph.from_edges(count, sources[order], targets[order], weights[order])
+
+    sources, targets, weights = array(index_typecode(count)), array(index_typecode(count)), array('d')
+    for vertex in range(graph.vertex_count):
+        for slot in range(graph.offsets[vertex], graph.offsets[vertex + 1]):
+            if ids[vertex] != ids[graph.targets[slot]]:
+                sources.append(ids[vertex])
+                targets.append(ids[graph.targets[slot]])
+                weights.append(graph.weights[slot])
+    crossing = CSRGraph.from_edges(count, sources, targets, weights)
+
+    # collapse parallel edges row by row, `slot_of` remembers where each target went in the current row
+    offsets = array('q', [0])
+    out_targets, out_weights = array(index_typecode(count)), array('d')
+    row_of, slot_of = filled_array(index_typecode(count), NO_VERTEX, count), array('q', [0]) * count
+    for component in range(count):
+        for slot in range(crossing.offsets[component], crossing.offsets[component + 1]):
+            target, weight = crossing.targets[slot], crossing.weights[slot]
+            if row_of[target] != component:
+                row_of[target] = component
+                slot_of[target] = len(out_targets)
+                out_targets.append(target)
+                out_weights.append(weight)
+            elif weight < out_weights[slot_of[target]]:
+                out_weights[slot_of[target]] = weight
+        offsets.append(len(out_targets))
+    return CSRGraph(offsets, out_targets, out_weights)
+
+
+def topological_sort(graph: CSRGraph) -> array:
+    """
+    Orders a DAG so every edge points forward, as the reverse postorder of iterative depth first walks started from
+    every vertex in turn, O(|V| + |E|)
+
+    :param graph: A directed acyclic CSRGraph
+    :return: Every vertex, in topological order
+    :raises ValueError: If the graph has a cycle, the condensation of its strongly connected components never does
+    """
+    visited = bytearray(graph.vertex_count)
+    parent = filled_array(index_typecode(graph.vertex_count), NO_VERTEX, graph.vertex_count)
+    postorder = array(index_typecode(graph.vertex_count))
+    for root in range(graph.vertex_count):
+        if not visited[root]:
+            postorder.extend(_walk(graph, root, visited, parent, postorder=True))
+    postorder.reverse()
+
+    position = array('q', [0]) * graph.vertex_count
+    for i, vertex in enumerate(postorder):
+        position[vertex] = i
+    if np is not None:
+        tails = np.repeat(as_numpy(position), np.diff(as_numpy(graph.offsets)))
+        backward = bool(np.any(tails >= as_numpy(position)[as_numpy(graph.targets)]))
+    else:
+        backward = any(position[vertex] >= position[graph.targets[slot]] for vertex in range(graph.vertex_count)
+                       for slot in range(graph.offsets[vertex], graph.offsets[vertex + 1]))
+    if backward:  # only a cycle can send an edge back in a reverse postorder
+        raise ValueError('The graph has a cycle, it has no topological order')
+    return postorder
@@ -0,0 +1,510 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from graph_algos.batch import Layout, SharedCSR, attach
+from graph_algos.csr import CSRGraph, np
+from graph_algos.shortest_paths import dijkstra
+from graph_algos.snapshot import GraphSnapshot
+from graph_algos.traversal import frontier_bfs
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Graph
+
+Address = Union[str, Tuple[str, int]]  # a Unix socket path, or a (host, port) pair
+Question = Tuple[str, int]  # (op, target) or ('neighborhood', depth)
+
+QUERIES = {  # op -> the search that answers it
+    'shortest_path': 'dijkstra',
+    'distance': 'dijkstra',
+    'reachable': 'bfs',
+    'neighborhood': 'bfs',
+}
+DEADLINE_EXCEEDED = 'deadline exceeded'
+
+
+class ServerStats:
+    """
+    Counters of a GraphServer
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.searches = 0  # searches actually run, requests minus the coalesced ones minus the expired ones
+        self.coalesced = 0  # requests that joined a search another request had already queued
+        self.batches = 0
+        self.expired = 0  # requests answered with `deadline exceeded`
+
+    def __repr__(self) -> str:
+        return 'ServerStats(requests={}, searches={}, coalesced={}, batches={}, expired={})'.format(
+            self.requests, self.searches, self.coalesced, self.batches, self.expired)
+
+
+class _Search:
+    """
+    One search waiting for dispatch, and every question it will answer
+    """
+    __slots__ = ('kind', 'source', 'questions', 'futures')
+
+    def __init__(self, kind: str, source: int):
+        self.kind = kind
+        self.source = source
+        self.questions: List[Question] = []
+        self.futures: List[asyncio.Future] = []
+
+    def prune(self) -> bool:
+        """
+        Drops the questions nobody waits for anymore
+
+        :return: Whether any are left
+        """
+        live = [i for i, future in enumerate(self.futures) if not future.done()]
+        self.questions = [self.questions[i] for i in live]
+        self.futures = [self.futures[i] for i in live]
+        return bool(live)
+
+
+class GraphServer:
+    """
+    Answers graph queries for local clients from one copy of the graph, loaded once, so consumers stop importing
+    `graph_algos.dfs` and rebuilding the graph in every process. The protocol is one JSON object per line each way:
+
+        {"id": 7, "op": "shortest_path", "source": 0, "target": 42, "deadline": 0.5}
+        {"id": 7, "ok": true, "result": {"distance": 12.5, "path": [0, 3, 42]}}
+
+    `shortest_path` and `distance` (source, target) run over the weighted adjacency, `reachable` (source, target)
+    and `neighborhood` (source, depth) over the directed connections. Unreachable targets give a null distance and
+    an empty path. Responses carry the request id and come back in completion order, so a client may pipeline.
+
+    Requests that need the same search from the same source while it waits for dispatch share that one search.
+    Waiting searches are dispatched in micro batches, a batch collecting for `batch_window` seconds after its first
+    search, and every batch is split across the worker processes, which read the graph from shared memory. Once
+    `max_pending` requests are in flight the server stops reading from its sockets until some finish, which pushes
+    back on the clients. A request still unanswered after its deadline gets `deadline exceeded` instead, and a
+    search all of whose requests expired is never run.
+    """
+
+    def __init__(self, weighted: CSRGraph, connections: Optional[CSRGraph] = None, workers: Optional[int] = None,
+                 batch_window: float = 0.002, max_batch: int = 64, max_pending: int = 1024,
+                 deadline: Optional[float] = None):
+        """
+        :param weighted: The weighted adjacency, e.g. `Graph.to_csr()` or `GraphSnapshot.weighted`
+        :param connections: The directed unweighted adjacency, `weighted` when None
+        :param workers: The number of worker processes, defaults to the CPU count. 0 searches on a thread of this
+        process instead, which avoids the shared memory copy for small graphs
+        :param batch_window: How long a batch collects searches, in seconds
+        :param max_batch: The most searches per batch
+        :param max_pending: The most requests in flight before the server stops reading
+        :param deadline: The deadline of requests that do not give one, in seconds, None waits forever
+        """
+        self.weighted = weighted
+        self.connections = connections if connections is not None else weighted
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.deadline = deadline
+        self.stats = ServerStats()
+        self._waiting: Dict[Tuple[str, int], _Search] = {}  # searches queued but not dispatched yet
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pool: Optional[Executor] = None
+        self._shared: List[SharedCSR] = []
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._batches = set()
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}  # the handler of every open connection
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @staticmethod
+    def from_graph(graph: Graph, **options) -> GraphServer:
+        return GraphServer(graph.to_csr(weighted=True), graph.to_csr(weighted=False), **options)
+
+    @staticmethod
+    def from_snapshot(snapshot: GraphSnapshot, **options) -> GraphServer:
+        return GraphServer(snapshot.weighted, snapshot.connections, **options)
+
+    async def start(self, address: Optional[Address] = None) -> GraphServer:
+        """
+        Starts the workers and the dispatcher, and listens on the address when one is given. `query` works without
+        one, for callers in the same process.
+
+        :param address: A Unix socket path or a (host, port) pair, port 0 picks a free port
+        :return: The server
+        """
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        if self.workers:
+            self._shared = [SharedCSR(self.weighted)]
+            if self.connections is not self.weighted:
+                self._shared.append(SharedCSR(self.connections))
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_worker,
+                                             initargs=(self._shared[0].layout, self._shared[-1].layout))
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='graph-server')
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+        if isinstance(address, str):
+            self._server = await asyncio.start_unix_server(self._handle, path=address)
+        elif address is not None:
+            self._server = await asyncio.start_server(self._handle, *address)
+        return self
+
+    @property
+    def address(self) -> Any:
+        """
+        The address the server listens on, with the actual port when it was started on port 0
+        """
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stops listening, fails whatever is still waiting, and releases the workers and the shared memory
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in self._connections.values():
+            writer.close()  # the handlers read EOF and finish
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for search in self._waiting.values():
+            for future in search.futures:
+                if not future.done():
+                    future.set_exception(ConnectionError('server closed'))
+        self._waiting.clear()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for shared in self._shared:
+            shared.release()
+        self._shared = []
+
+    async def __aenter__(self) -> GraphServer:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def query(self, op: str, source: int, target: Optional[int] = None, depth: int = 1,
+                    deadline: Optional[float] = None) -> Any:
+        """
+        Answers one query, sharing the search with every other waiting query from the same source
+
+        :param op: 'shortest_path', 'distance', 'reachable' or 'neighborhood'
+        :param source: The vertex the search starts from
+        :param target: The vertex asked about, for every op but 'neighborhood'
+        :param depth: The most hops, for 'neighborhood'
+        :param deadline: Seconds to wait at most, the server's default when None
+        :return: The result, as it is sent over the wire
+        """
+        kind = QUERIES.get(op)
+        if kind is None:
+            raise ValueError('Unknown op {!r}, expected one of {}'.format(op, ', '.join(QUERIES)))
+        graph = self.weighted if kind == 'dijkstra' else self.connections
+        _check_vertex(graph, source, 'source')
+        if op == 'neighborhood':
+            question = (op, int(depth))
+        else:
+            _check_vertex(graph, target, 'target')
+            question = (op, target)
+
+        self.stats.requests += 1
+        search = self._waiting.get((kind, source))
+        if search is None:
+            search = self._waiting[kind, source] = _Search(kind, source)
+            self._queue.put_nowait(search)
+        else:
+            self.stats.coalesced += 1
+        future = asyncio.get_running_loop().create_future()
+        search.questions.append(question)
+        search.futures.append(future)
+        try:
+            return await asyncio.wait_for(future, self.deadline if deadline is None else deadline)
+        except asyncio.TimeoutError:
+            self.stats.expired += 1
+            raise
+
+    async def _dispatch(self) -> None:
+        """
+        Collects waiting searches into batches and hands every batch to the pool, without waiting for it to finish
+        """
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.batch_window)  # let the burst arrive, and later requests join these searches
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for search in batch:
+                del self._waiting[search.kind, search.source]  # from here on, new requests start a new search
+            batch = [search for search in batch if search.prune()]
+            if batch:
+                self.stats.batches += 1
+                self.stats.searches += len(batch)
+                task = asyncio.ensure_future(self._run(batch))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: List[_Search]) -> None:
+        loop = asyncio.get_running_loop()
+        if self.workers:
+            run = _answer_in_worker
+            chunks = [batch[part::self.workers] for part in range(min(self.workers, len(batch)))]
+        else:
+            run = partial(_answer_searches, self.weighted, self.connections)
+            chunks = [batch]
+        outcomes = await asyncio.gather(*(loop.run_in_executor(
+            self._pool, run, [(search.kind, search.source, search.questions) for search in chunk]) for chunk in chunks),
+            return_exceptions=True)
+        for chunk, outcome in zip(chunks, outcomes):
+            for i, search in enumerate(chunk):
+                for j, future in enumerate(search.futures):
+                    if future.done():  # expired while the search ran
+                        continue
+                    if isinstance(outcome, BaseException):
+                        future.set_exception(outcome)
+                    else:
+                        future.set_result(outcome[i][j])
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves one connection. Every request line is answered by its own task so a connection can pipeline, and the
+        next line is only read once the server is below `max_pending`.
+        """
+        lock = asyncio.Lock()
+        pending = set()
+        handler = asyncio.current_task()
+        self._connections[handler] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await self._slots.acquire()
+                task = asyncio.ensure_future(self._respond(line, writer, lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for task in pending:
+                task.cancel()
+            del self._connections[handler]
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        try:
+            response = await self._answer(line)
+        finally:
+            self._slots.release()
+        async with lock:
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+    async def _answer(self, line: bytes) -> dict:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            result = await self.query(request.get('op'), request.get('source'), request.get('target'),
+                                      request.get('depth', 1), request.get('deadline'))
+            return {'id': request_id, 'ok': True, 'result': result}
+        except asyncio.TimeoutError:
+            return {'id': request_id, 'ok': False, 'error': DEADLINE_EXCEEDED}
+        except (ValueError, TypeError, AttributeError, ConnectionError) as error:
+            return {'id': request_id, 'ok': False, 'error': str(error)}
+
+
+class GraphClient:
+    """
+    A client for GraphServer that pipelines any number of concurrent requests over one connection
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @staticmethod
+    async def connect(address: Address) -> GraphClient:
+        """
+        :param address: The server's Unix socket path or (host, port) pair
+        :return: The connected client, `close` it when done
+        """
+        if isinstance(address, str):
+            return GraphClient(*await asyncio.open_unix_connection(address))
+        return GraphClient(*await asyncio.open_connection(*address))
+
+    async def request(self, op: str, **arguments) -> Any:
+        """
+        Sends one request and waits for its response
+
+        :param op: The query, see GraphServer
+        :param arguments: source, target, depth and deadline as the op needs them
+        :return: The result
+        :raises TimeoutError: When the server answered `deadline exceeded`
+        :raises ValueError: When the server rejected the request
+        """
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        self._writer.write(json.dumps(dict(arguments, id=self._next_id, op=op)).encode() + b'\n')
+        await self._writer.drain()
+        return await future
+
+    async def shortest_path(self, source: int, target: int, deadline: Optional[float] = None) -> dict:
+        return await self.request('shortest_path', source=source, target=target, deadline=deadline)
+
+    async def distance(self, source: int, target: int, deadline: Optional[float] = None) -> Optional[float]:
+        return await self.request('distance', source=source, target=target, deadline=deadline)
+
+    async def reachable(self, source: int, target: int, deadline: Optional[float] = None) -> bool:
+        return await self.request('reachable', source=source, target=target, deadline=deadline)
+
+    async def neighborhood(self, source: int, depth: int = 1, deadline: Optional[float] = None) -> List[int]:
+        return await self.request('neighborhood', source=source, depth=depth, deadline=deadline)
+
+    async def _receive(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._waiting.pop(response['id'], None)
+                if future is None or future.done():
+                    continue
+                if response['ok']:
+                    future.set_result(response['result'])
+                elif response['error'] == DEADLINE_EXCEEDED:
+                    future.set_exception(asyncio.TimeoutError(DEADLINE_EXCEEDED))
+                else:
+                    future.set_exception(ValueError(response['error']))
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection closed'))
+            self._waiting.clear()
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+        await asyncio.gather(self._receiver, return_exceptions=True)
+
+    async def __aenter__(self) -> GraphClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+def _check_vertex(graph: CSRGraph, vertex: Any, name: str) -> None:
+    if type(vertex) is not int or not 0 <= vertex < graph.vertex_count:
+        raise ValueError('{} must be a vertex index below {}, got {!r}'.format(name, graph.vertex_count, vertex))
+
+
+def _answer_searches(weighted: CSRGraph, connections: CSRGraph,
+                     searches: List[Tuple[str, int, List[Question]]]) -> List[List[Any]]:
+    """
+    Runs every search once and answers all of its questions from the result
+
+    :return: The answers of every search, in the order of its questions
+    """
+    answers = []
+    for kind, source, questions in searches:
+        if kind == 'dijkstra':
+            tree = dijkstra(weighted, [source])
+            distance = tree.distance
+            answers.append([
+                (None if distance[target] == float('inf') else distance[target]) if op == 'distance' else
+                {'distance': None if distance[target] == float('inf') else distance[target],
+                 'path': tree.vertex_path_to(target)}
+                for op, target in questions])
+        else:
+            depth = frontier_bfs(connections, source).depth
+            answers.append([
+                bool(depth[argument] >= 0) if op == 'reachable' else _within(depth, argument)
+                for op, argument in questions])
+    return answers
+
+
+def _within(depth, hops: int) -> List[int]:
+    """
+    The vertices at most `hops` levels away, the source itself excluded
+    """
+    if np is not None:
+        levels = np.asarray(depth)
+        return np.flatnonzero((levels > 0) & (levels <= hops)).tolist()
+    return [vertex for vertex, level in enumerate(depth) if 0 < level <= hops]
+
+
+_worker_blocks: List[SharedMemory] = []
+_worker_weighted: Optional[CSRGraph] = None
+_worker_connections: Optional[CSRGraph] = None
+
+
+def _attach_worker(weighted: Layout, connections: Layout) -> None:
+    global _worker_blocks, _worker_weighted, _worker_connections
+    _worker_blocks, _worker_weighted = attach(weighted)
+    if connections == weighted:
+        _worker_connections = _worker_weighted
+    else:
+        blocks, _worker_connections = attach(connections)
+        _worker_blocks.extend(blocks)
+
+
+def _answer_in_worker(searches: List[Tuple[str, int, List[Question]]]) -> List[List[Any]]:
+    return _answer_searches(_worker_weighted, _worker_connections, searches)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Serves graph queries from a snapshot written by '
+                                                 '`Graph.save_snapshot`, see GraphServer for the protocol')
+    parser.add_argument('snapshot', help='The snapshot file to serve')
+    parser.add_argument('--unix', help='Listen on this Unix socket path instead of TCP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes, 0 searches in-process')
+    parser.add_argument('--batch-window', type=float, default=0.002, help='Seconds a batch collects searches')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-pending', type=int, default=1024, help='Requests in flight before reading pauses')
+    parser.add_argument('--deadline', type=float, default=None, help='Default per-request deadline in seconds')
+    arguments = parser.parse_args(argv)
+
+    async def serve() -> None:
+        with GraphSnapshot.open(arguments.snapshot) as snapshot:
+            server = GraphServer.from_snapshot(snapshot, workers=arguments.workers,
+                                               batch_window=arguments.batch_window, max_batch=arguments.max_batch,
+                                               max_pending=arguments.max_pending, deadline=arguments.deadline)
+            async with server:
+                await server.start(arguments.unix or (arguments.host, arguments.port))
+                print('serving {} vertices on {}'.format(snapshot.vertex_count, server.address), flush=True)
+                await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
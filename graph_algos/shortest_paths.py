@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Tuple
+
+from graph_algos.csr import NO_VERTEX, CSRGraph, filled_array, index_typecode
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Node
+    from graph_algos.stats import QueryStats
+
+
+class PriorityQueueKind(Enum):
+    BINARY_HEAP = 0  # heapq with lazy deletion, works for any non-negative weights
+    BUCKET = 1  # Dial's circular bucket queue, needs non-negative integer weights
+
+
+class ShortestPaths:
+    """
+    The result of a single shortest path query, distance and predecessor arrays indexed by vertex
+    """
+
+    def __init__(self, graph: CSRGraph, distance: array, predecessor: array, sources: List[int],
+                 target: Optional[int] = None):
+        """
+        Wraps the arrays produced by one of the engines below
+
+        :param graph: The CSRGraph the query ran on, used to map nodes to indices and back
+        :param distance: The distance of every vertex, `inf` if it was never reached
+        :param predecessor: The previous vertex on the shortest path of every vertex, NO_VERTEX for sources and
+        unreached vertices
+        :param sources: The vertices the search started from
+        :param target: The vertex the search stopped at, when it stopped early. Only vertices settled before the
+        target carry final distances in that case, the rest are upper bounds
+        """
+        self.graph = graph
+        self.distance = distance
+        self.predecessor = predecessor
+        self.sources = sources
+        self.target = target
+        self.stats: Optional[QueryStats] = None  # set by traced Graph queries
+
+    def distance_to(self, node: Node | int) -> float:
+        return self.distance[self.graph.vertex_of(node)]
+
+    def reached(self, node: Node | int) -> bool:
+        return self.distance_to(node) != float('inf')
+
+    def vertex_path_to(self, node: Node | int) -> List[int]:
+        """
+        Walks the predecessor array back from a vertex
+
+        :param node: The node (or vertex index) to build the path to
+        :return: The vertex indices from a source to the node, empty if the node was never reached
+        """
+        vertex = self.graph.vertex_of(node)
+        if self.distance[vertex] == float('inf'):
+            return []
+        path = [vertex]
+        while self.predecessor[vertex] != NO_VERTEX:
+            vertex = self.predecessor[vertex]
+            path.append(vertex)
+        path.reverse()
+        return path
+
+    def path_to(self, node: Node | int) -> List[Node | int]:
+        return [self.graph.node_of(vertex) for vertex in self.vertex_path_to(node)]
+
+
+def _prepare(graph: CSRGraph, sources: Iterable[int]):
+    distance = filled_array('d', float('inf'), graph.vertex_count)
+    predecessor = filled_array(index_typecode(graph.vertex_count), NO_VERTEX, graph.vertex_count)
+    sources = list(sources)
+    for source in sources:
+        distance[source] = 0.0
+    return distance, predecessor, sources
+
+
+def dijkstra(graph: CSRGraph, sources: Iterable[int], target: Optional[int] = None,
+             stats: Optional[QueryStats] = None) -> ShortestPaths:
+    """
+    Dijkstra's algorithm with a binary heap and lazy deletion, O((V + E) log V). Instead of a decrease-key, an
+    improved vertex is pushed again and the stale entry is skipped when it surfaces.
+
+    :param graph: The CSRGraph to search, weights must be non-negative
+    :param sources: The vertices the search starts from, all at distance 0
+    :param target: Stops as soon as this vertex is settled, when given
+    :param stats: Counts heap operations into this when given, the loop itself is the same either way
+    :return: The distance and predecessor arrays
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distance, predecessor, sources = _prepare(graph, sources)
+    heap = [(0.0, source) for source in sources]
+    heapq.heapify(heap)
+    heappop, heappush = heapq.heappop, heapq.heappush
+    if stats is not None:  # counting wrappers in place of the local bindings, nothing changes when disabled
+        heappop, heappush = stats.counted(heappop, 'heap_pops'), stats.counted(heappush, 'heap_pushes')
+    while heap:
+        dist, vertex = heappop(heap)
+        if dist > distance[vertex]:  # stale entry, the vertex was already settled with a smaller distance
+            continue
+        if vertex == target:
+            break
+        for slot in range(offsets[vertex], offsets[vertex + 1]):
+            candidate = dist + weights[slot]
+            neighbor = targets[slot]
+            if candidate < distance[neighbor]:
+                distance[neighbor] = candidate
+                predecessor[neighbor] = vertex
+                heappush(heap, (candidate, neighbor))
+    if stats is not None:
+        stats.edges_relaxed += stats.heap_pushes
+        stats.heap_pushes += len(sources)
+        stats.vertices_popped += stats.heap_pops
+    return ShortestPaths(graph, distance, predecessor, sources, target)
+
+
+def dial(graph: CSRGraph, sources: Iterable[int], target: Optional[int] = None,
+         stats: Optional[QueryStats] = None) -> ShortestPaths:
+    """
+    Dijkstra's algorithm with Dial's circular bucket queue, O(V + E + D) for a largest distance D. Only valid
+    for non-negative integer weights, bucket `d % (C + 1)` holds the vertices at tentative distance d where C is
+    the largest edge weight.
+
+    :param graph: The CSRGraph to search
+    :param sources: The vertices the search starts from, all at distance 0
+    :param target: Stops as soon as this vertex is settled, when given
+    :param stats: Receives the bucket appends and pops when given
+    :return: The distance and predecessor arrays
+    """
+    bound = graph.max_integer_weight()
+    if bound is None:
+        raise ValueError('The bucket queue needs non-negative integer edge weights')
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distance, predecessor, sources = _prepare(graph, sources)
+    bucket_count = int(bound) + 1
+    buckets: List[List[int]] = [[] for _ in range(bucket_count)]
+    buckets[0].extend(sources)
+    pending = pushed = len(sources)
+    current = 0
+    while pending:
+        bucket = buckets[current % bucket_count]
+        while bucket:
+            vertex = bucket.pop()
+            pending -= 1
+            if distance[vertex] != current:  # stale entry
+                continue
+            if vertex == target:
+                _count_queue(stats, pushed, pending, len(sources))
+                return ShortestPaths(graph, distance, predecessor, sources, target)
+            for slot in range(offsets[vertex], offsets[vertex + 1]):
+                candidate = current + weights[slot]
+                neighbor = targets[slot]
+                if candidate < distance[neighbor]:
+                    distance[neighbor] = candidate
+                    predecessor[neighbor] = vertex
+                    buckets[int(candidate) % bucket_count].append(neighbor)
+                    pending += 1
+                    pushed += 1
+        current += 1
+    _count_queue(stats, pushed, pending, len(sources))
+    return ShortestPaths(graph, distance, predecessor, sources, target)
+
+
+def _count_queue(stats: Optional[QueryStats], pushed: int, pending: int, source_count: int) -> None:
+    # every entry still pending was pushed but never popped, every push beyond the sources was a relaxation
+    if stats is not None:
+        stats.heap_pushes += pushed
+        stats.heap_pops += pushed - pending
+        stats.vertices_popped += pushed - pending
+        stats.edges_relaxed += pushed - source_count
+
+
+def shortest_paths(graph: CSRGraph, sources: Iterable[int], target: Optional[int] = None,
+                   queue: PriorityQueueKind = PriorityQueueKind.BINARY_HEAP,
+                   stats: Optional[QueryStats] = None) -> ShortestPaths:
+    if queue == PriorityQueueKind.BUCKET:
+        return dial(graph, sources, target, stats)
+    return dijkstra(graph, sources, target, stats)
+
+
+def bidirectional_dijkstra(graph: CSRGraph, source: int, target: int) -> Tuple[float, List[int]]:
+    """
+    Point to point Dijkstra searching forward from the source and backward (over the reversed edges) from the
+    target, always advancing the side whose queue has the smaller key. Every relaxed edge that touches a vertex
+    labelled by the other side is a candidate route `mu`; the search stops once the two queue tops together
+    reach `mu`, because no path through an unsettled vertex can be shorter from then on.
+
+    :param graph: The CSRGraph to search, weights must be non-negative
+    :param source: The vertex the route starts at
+    :param target: The vertex the route ends at
+    :return: The length of the shortest route and its vertices, (inf, []) if the target is unreachable
+    """
+    if source == target:
+        return 0.0, [source]
+    reverse = graph.transpose()
+    vertex_count = graph.vertex_count
+    adjacency = [(graph.offsets, graph.targets, graph.weights), (reverse.offsets, reverse.targets, reverse.weights)]
+    distance = [filled_array('d', float('inf'), vertex_count) for _ in range(2)]  # forward, backward
+    predecessor = [filled_array(index_typecode(vertex_count), NO_VERTEX, vertex_count) for _ in range(2)]
+    settled = [bytearray(vertex_count), bytearray(vertex_count)]
+    distance[0][source] = distance[1][target] = 0.0
+    heaps = [[(0.0, source)], [(0.0, target)]]
+    best, meet = float('inf'), NO_VERTEX
+    heappop, heappush = heapq.heappop, heapq.heappush
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        dist, vertex = heappop(heaps[side])
+        own_distance, other_distance = distance[side], distance[1 - side]
+        if dist > own_distance[vertex] or settled[side][vertex]:  # stale entry
+            continue
+        settled[side][vertex] = 1
+        offsets, targets, weights = adjacency[side]
+        own_predecessor, heap = predecessor[side], heaps[side]
+        for slot in range(offsets[vertex], offsets[vertex + 1]):
+            neighbor = targets[slot]
+            candidate = dist + weights[slot]
+            if candidate < own_distance[neighbor]:
+                own_distance[neighbor] = candidate
+                own_predecessor[neighbor] = vertex
+                heappush(heap, (candidate, neighbor))
+            if own_distance[neighbor] + other_distance[neighbor] < best:
+                best, meet = own_distance[neighbor] + other_distance[neighbor], neighbor
+    if meet == NO_VERTEX:
+        return float('inf'), []
+    forward, backward = [meet], []
+    vertex = meet
+    while predecessor[0][vertex] != NO_VERTEX:
+        vertex = predecessor[0][vertex]
+        forward.append(vertex)
+    vertex = meet
+    while predecessor[1][vertex] != NO_VERTEX:
+        vertex = predecessor[1][vertex]
+        backward.append(vertex)
+    return best, forward[::-1] + backward
+
+
+def astar(graph: CSRGraph, source: int, target: int, heuristic: Callable[[int], float]) -> Tuple[float, List[int]]:
+    """
+    A* search, Dijkstra ordered by distance plus an estimate of the remaining distance. With an admissible and
+    consistent heuristic (never overestimating, and dropping by at most the weight of every edge) the first time
+    the target is popped its distance is final, and only vertices that look promising are ever settled.
+
+    :param graph: The CSRGraph to search, weights must be non-negative
+    :param source: The vertex the route starts at
+    :param target: The vertex the route ends at
+    :param heuristic: Lower bound on the distance from a vertex to the target
+    :return: The length of the shortest route and its vertices, (inf, []) if the target is unreachable
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distance, predecessor, _ = _prepare(graph, [source])
+    estimate = heuristic(source)
+    heap = [(estimate, 0.0, source)]
+    heappop, heappush = heapq.heappop, heapq.heappush
+    while heap:
+        _, dist, vertex = heappop(heap)
+        if dist > distance[vertex]:  # stale entry
+            continue
+        if vertex == target:
+            path = [vertex]
+            while predecessor[vertex] != NO_VERTEX:
+                vertex = predecessor[vertex]
+                path.append(vertex)
+            return dist, path[::-1]
+        for slot in range(offsets[vertex], offsets[vertex + 1]):
+            candidate = dist + weights[slot]
+            neighbor = targets[slot]
+            if candidate < distance[neighbor]:
+                estimate = heuristic(neighbor)
+                if estimate == float('inf'):  # the heuristic proves the target unreachable from here
+                    continue
+                distance[neighbor] = candidate
+                predecessor[neighbor] = vertex
+                heappush(heap, (candidate + estimate, candidate, neighbor))
+    return float('inf'), []
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import mmap
+import struct
+from array import array
+from itertools import chain
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Tuple
+
+from graph_algos.csr import CSRGraph, byte_order, typecode_of
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Graph, Node
+
+MAGIC = b'GASN'
+FORMAT_VERSION = 2  # 2 added text labels, version 1 files are read the same way
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct('<4sIIIq')  # magic, format version, byte order (1 little, 2 big), section count, vertex count
+SECTION = struct.Struct('<4s4sqq')  # name, typecode (padded), byte offset, element count
+ALIGNMENT = 8
+ABSENT = -1  # stored in the label section for `None` entries of `Graph.vertices`
+TEXT_LABEL = -2  # stored in the label section for string labels, the text itself is in the `tlab` section
+
+
+class GraphSnapshot:
+    """
+    A graph reopened from a snapshot file. Nothing is parsed or copied: every section is a typed memoryview straight
+    into a read-only memory map, so opening takes milliseconds and processes mapping the same file share its
+    physical pages through the page cache.
+
+    `weighted` is the adjacency of `Node.edges`, `connections` the adjacency of `Node.connect`. Both number the
+    inserted vertices like `Graph.vertices`, and so like `Graph.to_csr()`. Nodes that are reachable but were never
+    inserted come after them in one numbering shared by both views, which can differ from the order `to_csr()`
+    appends them in.
+    """
+
+    def __init__(self, file: BinaryIO, mapped: mmap.mmap, sections: Dict[bytes, memoryview], vertex_count: int):
+        self._file = file
+        self._mapped = mapped
+        self._sections = sections
+        self.vertex_count = vertex_count
+        self.weighted = CSRGraph(sections[b'woff'], sections[b'wtgt'], sections[b'wwgt'])
+        self.connections = CSRGraph(sections[b'coff'], sections[b'ctgt'], sections[b'cwgt'])
+
+    @staticmethod
+    def open(path: str) -> GraphSnapshot:
+        """
+        Maps a snapshot written by `write_snapshot`
+
+        :param path: The file to open
+        :return: The snapshot, `close` it (or use it as a context manager) to unmap the file
+        """
+        file = open(path, 'rb')
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            file.close()
+            raise ValueError('{} is not a graph snapshot'.format(path)) from None
+        try:
+            sections, vertex_count = _map_sections(mapped, path)
+        except ValueError:
+            mapped.close()
+            file.close()
+            raise
+        return GraphSnapshot(file, mapped, sections, vertex_count)
+
+    def value(self, vertex: int):
+        """
+        The `Node.value` of a vertex, an int or float for numeric values and a string otherwise
+        """
+        if b'vstr' in self._sections:
+            return self._string(b'vstr', b'vsof', vertex)
+        return self._sections[b'valu'][vertex]
+
+    def letter_label(self, vertex: int) -> str:
+        return self._string(b'lstr', b'lsof', vertex)
+
+    def label(self, vertex: int) -> int | str:
+        """
+        The `NodeLabel` value of a vertex, the label itself for a string label, ABSENT for `None` entries of
+        `Graph.vertices`
+        """
+        label = self._sections[b'labl'][vertex]
+        return self._string(b'tlab', b'tlof', vertex) if label == TEXT_LABEL else label
+
+    def to_graph(self) -> Graph:
+        """
+        Rebuilds `Node` objects and a `Graph` from the snapshot, for code that needs the object model. This is the
+        slow path, the engines can run on `weighted` / `connections` directly.
+
+        :return: A new graph, with `vertices` in snapshot index order
+        """
+        from graph_algos.dfs import Edge, Graph, Node, NodeLabel
+
+        nodes: List[Node | None] = []
+        for vertex in range(self.vertex_count):
+            if self.label(vertex) == ABSENT:
+                nodes.append(None)
+            else:
+                label = self.label(vertex)
+                node = Node(self.value(vertex)).set_letter_label(self.letter_label(vertex))
+                nodes.append(node.set_label(label if isinstance(label, str) else NodeLabel(label)))
+        for vertex, node in enumerate(nodes):
+            if node is None:
+                continue
+            for neighbor in self.connections.neighbors(vertex):
+                node.connections.append(nodes[neighbor])
+            for neighbor, weight in self.weighted.weighted_neighbors(vertex):
+                node.edges.append(Edge(nodes[neighbor], weight))
+        graph = Graph()
+        graph.insert_vertexes(nodes)
+        return graph
+
+    def _string(self, blob: bytes, offsets: bytes, vertex: int) -> str:
+        starts = self._sections[offsets]
+        return self._sections[blob][starts[vertex]:starts[vertex + 1]].tobytes().decode('utf-8')
+
+    def close(self) -> None:
+        """
+        Unmaps the file, every CSRGraph taken from this snapshot becomes unusable
+        """
+        for section in self._sections.values():
+            section.release()
+        self._sections = {}
+        self._mapped.close()
+        self._file.close()
+
+    def __enter__(self) -> GraphSnapshot:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_snapshot(graph: Graph, path: str) -> None:
+    """
+    Writes the whole graph to a versioned binary file: vertex values, labels, letter labels, and both adjacency
+    views as CSR buffers. Every section starts on an 8 byte boundary so it can be mapped as a typed array.
+
+    :param graph: The graph to write
+    :param path: The file to write
+    :raises ValueError: If a node's label is neither a `NodeLabel` nor a string
+    """
+    from graph_algos.dfs import NodeLabel
+
+    nodes = _closure(graph.vertices)
+    labels, texts = array('b'), []
+    for node in nodes:
+        if node is None or isinstance(node.label, NodeLabel):
+            labels.append(ABSENT if node is None else node.label.value)
+            texts.append('')
+        elif isinstance(node.label, str):
+            labels.append(TEXT_LABEL)
+            texts.append(node.label)
+        else:
+            raise ValueError('The label {!r} of node {} cannot be stored in a snapshot'.format(node.label, node.value))
+    weighted = CSRGraph.from_vertices(nodes, weighted=True)
+    connections = CSRGraph.from_vertices(nodes, weighted=False)
+    sections: List[Tuple[bytes, array]] = [
+        (b'woff', weighted.offsets), (b'wtgt', weighted.targets), (b'wwgt', weighted.weights),
+        (b'coff', connections.offsets), (b'ctgt', connections.targets), (b'cwgt', connections.weights),
+        (b'labl', labels),
+    ]
+    if TEXT_LABEL in labels:
+        sections.extend(_strings(b'tlab', b'tlof', texts))
+    values = [0 if node is None else node.value for node in nodes]
+    if all(isinstance(value, int) and -2 ** 63 <= value < 2 ** 63 for value in values):
+        sections.append((b'valu', array('q', values)))
+    elif all(isinstance(value, (int, float)) for value in values):
+        sections.append((b'valu', array('d', values)))
+    else:
+        sections.extend(_strings(b'vstr', b'vsof', [str(value) for value in values]))
+    sections.extend(_strings(b'lstr', b'lsof', ['' if node is None else node.letter_label for node in nodes]))
+
+    offset = _align(HEADER.size + len(sections) * SECTION.size)
+    table = []
+    for name, buffer in sections:
+        table.append(SECTION.pack(name, typecode_of(buffer).encode(), offset, len(buffer)))
+        offset = _align(offset + len(buffer) * buffer.itemsize)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, byte_order(), len(sections), len(nodes)))
+        file.write(b''.join(table))
+        for name, buffer in sections:
+            file.write(b'\0' * (_align(file.tell()) - file.tell()))
+            buffer.tofile(file)
+
+
+def _map_sections(mapped: mmap.mmap, path: str) -> Tuple[Dict[bytes, memoryview], int]:
+    """
+    Checks the header and section table of a mapped snapshot, then views every section as a typed array
+
+    :return: The sections by name and the vertex count
+    """
+    if len(mapped) < HEADER.size:
+        raise ValueError('{} is not a graph snapshot'.format(path))
+    magic, version, order, section_count, vertex_count = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or version not in READABLE_VERSIONS:
+        raise ValueError('{} is not a graph snapshot this version can read'.format(path))
+    if order != byte_order():
+        raise ValueError('{} was written on a machine with a different byte order'.format(path))
+    if HEADER.size + section_count * SECTION.size > len(mapped):
+        raise ValueError('{} is truncated'.format(path))
+    table = []
+    for i in range(section_count):
+        name, typecode, offset, length = SECTION.unpack_from(mapped, HEADER.size + i * SECTION.size)
+        typecode = typecode.rstrip(b'\0').decode()
+        end = offset + length * array(typecode).itemsize
+        if offset < 0 or length < 0 or end > len(mapped):
+            raise ValueError('{} is truncated'.format(path))
+        table.append((name, typecode, offset, end))
+    view = memoryview(mapped)  # only taken once everything checked out, a view left behind keeps the map open
+    sections = {name: view[offset:end].cast(typecode) for name, typecode, offset, end in table}
+    view.release()
+    return sections, vertex_count
+
+
+def _closure(vertices: List[Node | None]) -> List[Node | None]:
+    """
+    The vertices followed by every node reachable through `edges` or `connections` that was never inserted, so
+    both adjacency views share one numbering
+    """
+    nodes = list(vertices)
+    seen = {node for node in nodes if node is not None}
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        if node is not None:
+            for neighbor in chain((edge.node for edge in node.edges), node.connections):  # a Vertex may hold ()
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    nodes.append(neighbor)
+        i += 1
+    return nodes
+
+
+def _strings(blob: bytes, offsets: bytes, strings: List[str]) -> List[Tuple[bytes, array]]:
+    encoded = [string.encode('utf-8') for string in strings]
+    starts = array('q', [0])
+    for string in encoded:
+        starts.append(starts[-1] + len(string))
+    return [(blob, array('B', b''.join(encoded))), (offsets, starts)]
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, TypeVar
+
+Result = TypeVar('Result')
+
+
+class QueryStats:
+    """
+    What one query did, for sizing capacity and debugging pathological queries. Only collected when asked for
+    (`trace=True` on the Graph methods) or while a hook is registered, otherwise the engines run exactly as before.
+    """
+
+    def __init__(self, algorithm: str):
+        """
+        :param algorithm: The name of the query, e.g. 'dijkstras'
+        """
+        self.algorithm = algorithm
+        self.vertices_popped = 0  # vertices taken off the queue / stack / frontier, stale heap entries included
+        self.edges_relaxed = 0  # edges that lowered the distance of their head, shortest path engines only
+        self.edges_scanned = 0  # adjacency slots looked at, traversals only
+        self.heap_pushes = 0  # priority queue pushes, bucket appends for the bucket queue
+        self.heap_pops = 0
+        self.frontier_sizes: List[int] = []  # level synchronous bfs only
+        self.phases: Dict[str, float] = {}  # seconds per phase, e.g. 'compile' and 'search'
+        self.cached = False  # answered from `Graph.path_cache` without searching
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[QueryStats]:
+        """
+        Adds the wall time of the block to `phases[name]`
+        """
+        began = perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + perf_counter() - began
+
+    def counted(self, function: Callable, counter: str) -> Callable:
+        """
+        Wraps a function so every call adds one to the named counter, for swapping into an engine's local bindings
+        """
+        def wrapper(*args):
+            setattr(self, counter, getattr(self, counter) + 1)
+            return function(*args)
+        return wrapper
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        return 'QueryStats({})'.format(', '.join('{}={!r}'.format(key, value) for key, value in vars(self).items()))
+
+
+HOOKS: List[Callable[[QueryStats], None]] = []  # called with the stats of every query while registered
+
+
+def add_hook(hook: Callable[[QueryStats], None]) -> None:
+    """
+    Registers a callback that receives the stats of every instrumented Graph query, e.g. to export them as metrics.
+    Queries collect stats for as long as any hook is registered.
+    """
+    HOOKS.append(hook)
+
+
+def remove_hook(hook: Callable[[QueryStats], None]) -> None:
+    HOOKS.remove(hook)
+
+
+def begin(algorithm: str, trace: bool) -> QueryStats | None:
+    """
+    :return: A fresh stats object if this query is traced or hooked, None (collect nothing) otherwise
+    """
+    return QueryStats(algorithm) if trace or HOOKS else None
+
+
+_UNTIMED = nullcontext()
+
+
+def phase(stats: QueryStats | None, name: str) -> AbstractContextManager:
+    return _UNTIMED if stats is None else stats.phase(name)
+
+
+def finish(stats: QueryStats | None, result: Result) -> Result:
+    """
+    Attaches the stats to the query result and hands them to every hook
+    """
+    if stats is not None:
+        result.stats = stats
+        publish(stats)
+    return result
+
+
+def publish(stats: QueryStats) -> None:
+    for hook in list(HOOKS):
+        hook(stats)
@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+from array import array
+from enum import Enum
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+from graph_algos.csr import NO_VERTEX, CSRGraph, as_numpy, filled_array, index_typecode, np, typecode_of
+
+if TYPE_CHECKING:
+    from graph_algos.dfs import Node
+    from graph_algos.stats import QueryStats
+
+
+class BFSMode(Enum):
+    QUEUE = 0  # one vertex at a time off a FIFO queue
+    LEVEL_SYNCHRONOUS = 1  # whole frontiers at once, vectorized with NumPy when it is installed
+    DIRECTION_OPTIMIZING = 2  # level synchronous, switching to bottom-up steps while the frontier is large
+
+
+class DFSOrder(Enum):
+    PREORDER = 0
+    POSTORDER = 1
+    REVERSE_PREORDER = 2
+    REVERSE_POSTORDER = 3
+
+
+class Traversal:
+    """
+    The state of a single bfs / dfs query. Everything a search writes lives here instead of on the shared `Node`
+    objects, so the same graph can serve any number of queries, concurrently, without a reset pass.
+    """
+
+    def __init__(self, graph: CSRGraph, source: int, visited: bytearray, parent: array, found: Optional[int]):
+        """
+        :param graph: The CSRGraph the query ran on
+        :param source: The vertex the search started from
+        :param visited: One byte per vertex, non-zero once the vertex was discovered
+        :param parent: The vertex each vertex was discovered from, NO_VERTEX for the source and undiscovered vertices
+        :param found: The target vertex if the search reached it, None otherwise
+        """
+        self.graph = graph
+        self.source = source
+        self.visited = visited
+        self.parent = parent
+        self.found = found
+        self.stats: Optional[QueryStats] = None  # set by traced Graph queries
+
+    @property
+    def found_node(self) -> Node | int | None:
+        return None if self.found is None else self.graph.node_of(self.found)
+
+    def reached(self, node: Node | int) -> bool:
+        return bool(self.visited[self.graph.vertex_of(node)])
+
+    def path_to(self, node: Node | int) -> List[Node | int]:
+        """
+        Walks the parent array back from a discovered vertex
+
+        :param node: The node (or vertex index) to build the path to
+        :return: The nodes from the source to the node, empty if the node was never discovered
+        """
+        vertex = self.graph.vertex_of(node)
+        if not self.visited[vertex]:
+            return []
+        path = [vertex]
+        while self.parent[vertex] != NO_VERTEX:
+            vertex = self.parent[vertex]
+            path.append(vertex)
+        return [self.graph.node_of(vertex) for vertex in reversed(path)]
+
+
+def _state(graph: CSRGraph, source: int):
+    visited = bytearray(graph.vertex_count)
+    parent = filled_array(index_typecode(graph.vertex_count), NO_VERTEX, graph.vertex_count)
+    visited[source] = 1
+    return visited, parent
+
+
+def bfs(graph: CSRGraph, source: int, target: Optional[int] = None,
+        stats: Optional[QueryStats] = None) -> Traversal:
+    """
+    Breadth first search, O(|V| + |E|). A plain list with a read cursor stands in for the queue, nothing here
+    needs the locking of `queue.Queue`.
+
+    :param graph: The CSRGraph to search
+    :param source: The vertex the search starts from
+    :param target: Stops as soon as this vertex is dequeued, when given
+    :param stats: Receives the dequeue and edge scan counts when given, read off the queue once the search is over
+    :return: The per-query visit map and parent array
+    """
+    offsets, targets = graph.offsets, graph.targets
+    visited, parent = _state(graph, source)
+    node_queue = [source]
+    head = 0
+    found = None
+    while head < len(node_queue):
+        vertex = node_queue[head]
+        head += 1
+        if vertex == target:
+            found = vertex
+            break
+        for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                parent[neighbor] = vertex
+                node_queue.append(neighbor)
+    if stats is not None:
+        stats.vertices_popped += head
+        scanned = node_queue[:head - 1] if found is not None else node_queue  # the target's edges were never read
+        stats.edges_scanned += sum(offsets[vertex + 1] - offsets[vertex] for vertex in scanned)
+    return Traversal(graph, source, visited, parent, found)
+
+
+def _walk(graph: CSRGraph, source: int, visited: bytearray, parent: array, postorder: bool,
+          scanned: Optional[List[int]] = None) -> Iterator[int]:
+    """
+    Non-recursive depth first walk with the exact visiting order of the recursive version. Every stack frame is a
+    vertex plus the slot of the next edge to look at, both kept in flat arrays so push and pop are O(1) and the
+    depth is only bounded by memory.
+
+    :param postorder: Yield every vertex once its subtree is finished instead of when it is discovered
+    :param scanned: Receives the number of adjacency slots looked at when the walk ends or is abandoned, when given
+    :return: The vertices in preorder or postorder
+    """
+    offsets, targets = graph.offsets, graph.targets
+    vertex_stack = array(index_typecode(graph.vertex_count), [source])
+    cursor_stack = array(typecode_of(offsets), [offsets[source]])
+    visited[source] = 1
+    try:
+        if not postorder:
+            yield source
+        while vertex_stack:
+            vertex = vertex_stack[-1]
+            slot, end = cursor_stack[-1], offsets[vertex + 1]
+            while slot < end and visited[targets[slot]]:
+                slot += 1
+            if slot < end:  # descend into the next undiscovered neighbor
+                cursor_stack[-1] = slot + 1
+                neighbor = targets[slot]
+                visited[neighbor] = 1
+                parent[neighbor] = vertex
+                vertex_stack.append(neighbor)
+                cursor_stack.append(offsets[neighbor])
+                if not postorder:
+                    yield neighbor
+            else:  # every edge of the vertex is explored, it is finished
+                vertex_stack.pop()
+                cursor_stack.pop()
+                if postorder:
+                    yield vertex
+    finally:  # the cursors are current whenever the walk is suspended, and finished vertices read every slot
+        if scanned is not None:
+            on_stack = set(vertex_stack)
+            scanned.append(sum(offsets[vertex + 1] - offsets[vertex] for vertex in range(graph.vertex_count)
+                               if visited[vertex] and vertex not in on_stack) +
+                           sum(cursor - offsets[vertex] for vertex, cursor in zip(vertex_stack, cursor_stack)))
+
+
+def dfs_order(graph: CSRGraph, source: int, order: DFSOrder = DFSOrder.PREORDER) -> Iterator[int]:
+    """
+    Lazily streams the vertices reachable from the source in the requested depth first order. PREORDER and
+    POSTORDER are produced as the walk goes, the reverse orders can only start once the walk is over, so the
+    order is buffered in a compact integer array first.
+
+    :param graph: The CSRGraph to walk
+    :param source: The vertex the walk starts from
+    :param order: The order the vertices are yielded in
+    :return: A generator of vertex indices
+    """
+    visited, parent = _state(graph, source)
+    postorder = order in (DFSOrder.POSTORDER, DFSOrder.REVERSE_POSTORDER)
+    walk = _walk(graph, source, visited, parent, postorder)
+    if order in (DFSOrder.PREORDER, DFSOrder.POSTORDER):
+        yield from walk
+    else:
+        yield from reversed(array(index_typecode(graph.vertex_count), walk))
+
+
+def dfs(graph: CSRGraph, source: int, target: Optional[int] = None,
+        order: DFSOrder = DFSOrder.PREORDER, stats: Optional[QueryStats] = None) -> Traversal:
+    """
+    Iterative depth first search, O(|V| + |E|)
+
+    :param graph: The CSRGraph to search
+    :param source: The vertex the search starts from
+    :param target: Stops as soon as this vertex is discovered (preorders) or finished (postorders), when given
+    :param order: Decides whether the target counts as found when it is discovered or when it is finished
+    :param stats: Receives the push and edge scan counts when given, read off the visit map once the search is over
+    :return: The per-query visit map and parent array
+    """
+    visited, parent = _state(graph, source)
+    postorder = order in (DFSOrder.POSTORDER, DFSOrder.REVERSE_POSTORDER)
+    found = None
+    scanned = [] if stats is not None else None
+    walk = _walk(graph, source, visited, parent, postorder, scanned)
+    for vertex in walk:
+        if vertex == target:
+            found = vertex
+            break
+    walk.close()
+    if stats is not None:
+        stats.vertices_popped += visited.count(1)  # every discovered vertex was pushed once
+        stats.edges_scanned += scanned[0]
+    return Traversal(graph, source, visited, parent, found)
+
+
+def _trace(parent: array, vertex: int) -> List[int]:
+    path = [vertex]
+    while parent[vertex] != NO_VERTEX:
+        vertex = parent[vertex]
+        path.append(vertex)
+    return path
+
+
+def bidirectional_bfs(graph: CSRGraph, source: int, target: int) -> List[int]:
+    """
+    Fewest-edges path between two vertices, searching forward from the source and backward (over the reversed
+    edges) from the target at the same time. Every step expands one whole level of whichever side has the smaller
+    frontier, so on sparse graphs both searches only cover about the square root of what a one sided search would.
+
+    :param graph: The CSRGraph to search
+    :param source: The vertex the path starts at
+    :param target: The vertex the path ends at
+    :return: The vertices of a shortest path from source to target, empty if there is none
+    """
+    if source == target:
+        return [source]
+    reverse = graph.transpose()
+    vertex_count = graph.vertex_count
+    depth = [filled_array(index_typecode(vertex_count), -1, vertex_count) for _ in range(2)]  # forward, backward
+    parent = [filled_array(index_typecode(vertex_count), NO_VERTEX, vertex_count) for _ in range(2)]
+    depth[0][source] = depth[1][target] = 0
+    frontiers = [[source], [target]]
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        offsets, targets = (graph.offsets, graph.targets) if side == 0 else (reverse.offsets, reverse.targets)
+        own_depth, own_parent, other_depth = depth[side], parent[side], depth[1 - side]
+        next_frontier = []
+        meet, meet_depth = NO_VERTEX, vertex_count
+        for vertex in frontiers[side]:
+            level = own_depth[vertex] + 1
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if own_depth[neighbor] < 0:
+                    own_depth[neighbor] = level
+                    own_parent[neighbor] = vertex
+                    next_frontier.append(neighbor)
+                    # finish the whole level, the meeting vertices can sit at different depths on the other side
+                    if 0 <= other_depth[neighbor] < meet_depth:
+                        meet, meet_depth = neighbor, other_depth[neighbor]
+        if meet != NO_VERTEX:
+            return _trace(parent[0], meet)[::-1] + _trace(parent[1], meet)[1:]
+        frontiers[side] = next_frontier
+    return []
+
+
+class LevelTraversal:
+    """
+    The result of a level synchronous bfs: the depth and parent of every vertex plus the size of every frontier
+    """
+
+    def __init__(self, graph: CSRGraph, source: int, depth, parent, frontier_sizes: List[int], found: Optional[int],
+                 edges_scanned: int = 0):
+        """
+        :param graph: The CSRGraph the query ran on
+        :param source: The vertex the search started from
+        :param depth: The level every vertex was discovered on, -1 for undiscovered vertices
+        :param parent: The vertex each vertex was discovered from, NO_VERTEX for the source and undiscovered vertices
+        :param frontier_sizes: The number of vertices on each level, starting with the source's level
+        :param found: The target vertex if the search reached it, None otherwise
+        :param edges_scanned: The adjacency slots looked at, out-edges top-down and in-edges bottom-up
+        """
+        self.graph = graph
+        self.source = source
+        self.depth = depth
+        self.parent = parent
+        self.frontier_sizes = frontier_sizes
+        self.found = found
+        self.edges_scanned = edges_scanned
+        self.stats: Optional[QueryStats] = None  # set by traced Graph queries
+
+    @property
+    def found_node(self) -> Node | int | None:
+        return None if self.found is None else self.graph.node_of(self.found)
+
+    def depth_of(self, node: Node | int) -> int:
+        return int(self.depth[self.graph.vertex_of(node)])
+
+    def reached(self, node: Node | int) -> bool:
+        return self.depth_of(node) >= 0
+
+    def path_to(self, node: Node | int) -> List[Node | int]:
+        vertex = self.graph.vertex_of(node)
+        if self.depth[vertex] < 0:
+            return []
+        path = [vertex]
+        while self.parent[vertex] != NO_VERTEX:
+            vertex = int(self.parent[vertex])
+            path.append(vertex)
+        return [self.graph.node_of(vertex) for vertex in reversed(path)]
+
+
+ALPHA = 14  # go bottom-up once the frontier's edges outnumber the unexplored edges / ALPHA (Beamer et al.)
+BETA = 24  # go back top-down once the frontier shrinks below |V| / BETA
+
+
+def frontier_bfs(graph: CSRGraph, source: int, target: Optional[int] = None,
+                 direction_optimizing: bool = False, stats: Optional[QueryStats] = None) -> LevelTraversal:
+    """
+    Level synchronous breadth first search, every step expands the whole frontier at once. With direction
+    optimizing on, large frontiers are expanded bottom-up instead: every undiscovered vertex looks through its
+    in-edges for a parent on the frontier, which touches far fewer edges on low diameter graphs.
+
+    :param graph: The CSRGraph to search
+    :param source: The vertex the search starts from
+    :param target: Stops at the end of the level the target is discovered on, when given
+    :param direction_optimizing: Switch between top-down and bottom-up steps
+    :param stats: Receives the frontier sizes when given
+    :return: The depth and parent of every vertex
+    """
+    if np is not None:
+        result = _frontier_bfs_numpy(graph, source, target, direction_optimizing)
+    else:
+        result = _frontier_bfs_python(graph, source, target, direction_optimizing)
+    if stats is not None:
+        stats.frontier_sizes.extend(result.frontier_sizes)
+        stats.vertices_popped += sum(result.frontier_sizes)
+        stats.edges_scanned += result.edges_scanned
+    return result
+
+
+def _frontier_bfs_python(graph: CSRGraph, source: int, target: Optional[int],
+                         direction_optimizing: bool) -> LevelTraversal:
+    offsets, targets = graph.offsets, graph.targets
+    vertex_count = graph.vertex_count
+    depth = filled_array(index_typecode(vertex_count), -1, vertex_count)
+    parent = filled_array(index_typecode(vertex_count), NO_VERTEX, vertex_count)
+    depth[source] = 0
+    frontier = [source]
+    frontier_sizes = [1]
+    unexplored_edges = graph.edge_count - graph.degree(source)
+    reverse = graph.transpose() if direction_optimizing else None
+    bottom_up = False
+    level = scanned = 0
+    while frontier and (target is None or depth[target] < 0):
+        level += 1
+        if direction_optimizing:
+            frontier_edges = sum(offsets[vertex + 1] - offsets[vertex] for vertex in frontier)
+            if not bottom_up and frontier_edges > unexplored_edges / ALPHA:
+                bottom_up = True
+            elif bottom_up and len(frontier) < vertex_count / BETA:
+                bottom_up = False
+        next_frontier = []
+        if bottom_up:
+            r_offsets, r_targets = reverse.offsets, reverse.targets
+            for vertex in range(vertex_count):
+                if depth[vertex] < 0:
+                    for position, candidate in enumerate(r_targets[r_offsets[vertex]:r_offsets[vertex + 1]], 1):
+                        if depth[candidate] == level - 1:  # the candidate sits on the current frontier
+                            depth[vertex] = level
+                            parent[vertex] = candidate
+                            next_frontier.append(vertex)
+                            scanned += position
+                            break
+                    else:
+                        scanned += r_offsets[vertex + 1] - r_offsets[vertex]
+        else:
+            for vertex in frontier:
+                scanned += offsets[vertex + 1] - offsets[vertex]
+                for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                    if depth[neighbor] < 0:
+                        depth[neighbor] = level
+                        parent[neighbor] = vertex
+                        next_frontier.append(neighbor)
+        if direction_optimizing:
+            unexplored_edges -= sum(offsets[vertex + 1] - offsets[vertex] for vertex in next_frontier)
+        frontier = next_frontier
+        if frontier:
+            frontier_sizes.append(len(frontier))
+    found = target if target is not None and depth[target] >= 0 else None
+    return LevelTraversal(graph, source, depth, parent, frontier_sizes, found, scanned)
+
+
+def _gather(offsets, targets, frontier):
+    """
+    Concatenates the adjacency rows of every frontier vertex without a Python loop
+
+    :return: The owning frontier vertex and the neighbor of every gathered edge
+    """
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=targets.dtype)
+        return empty, empty
+    row_starts = np.cumsum(counts) - counts  # where each row begins in the gathered output
+    positions = np.arange(total, dtype=offsets.dtype) + np.repeat(starts - row_starts, counts)
+    return np.repeat(frontier, counts), targets[positions]
+
+
+def _frontier_bfs_numpy(graph: CSRGraph, source: int, target: Optional[int],
+                        direction_optimizing: bool) -> LevelTraversal:
+    offsets, targets = as_numpy(graph.offsets).astype(np.int64), as_numpy(graph.targets)
+    degrees = np.diff(offsets)
+    vertex_count = graph.vertex_count
+    depth = np.full(vertex_count, -1, dtype=np.int64)
+    parent = np.full(vertex_count, NO_VERTEX, dtype=np.int64)
+    depth[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    frontier_sizes = [1]
+    unexplored_edges = int(degrees.sum()) - int(degrees[source])
+    if direction_optimizing:
+        reverse = graph.transpose()
+        r_offsets, r_targets = as_numpy(reverse.offsets).astype(np.int64), as_numpy(reverse.targets)
+    bottom_up = False
+    level = scanned = 0
+    while frontier.size and (target is None or depth[target] < 0):
+        level += 1
+        if direction_optimizing:
+            frontier_edges = int(degrees[frontier].sum())
+            if not bottom_up and frontier_edges > unexplored_edges / ALPHA:
+                bottom_up = True
+            elif bottom_up and frontier.size < vertex_count / BETA:
+                bottom_up = False
+        if bottom_up:
+            children, candidates = _gather(r_offsets, r_targets, np.flatnonzero(depth < 0))
+            scanned += children.size
+            on_frontier = depth[candidates] == level - 1
+            children, candidates = children[on_frontier], candidates[on_frontier]
+        else:
+            candidates, children = _gather(offsets, targets, frontier)
+            scanned += children.size
+            undiscovered = depth[children] < 0
+            children, candidates = children[undiscovered], candidates[undiscovered]
+        children, first = np.unique(children, return_index=True)  # the first parent found wins
+        depth[children] = level
+        parent[children] = candidates[first]
+        unexplored_edges -= int(degrees[children].sum())
+        frontier = children.astype(np.int64)
+        if frontier.size:
+            frontier_sizes.append(int(frontier.size))
+    found = target if target is not None and depth[target] >= 0 else None
+    return LevelTraversal(graph, source, depth, parent, frontier_sizes, found, scanned)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import random
+import struct
+from array import array
+from typing import Callable, List, Tuple
+
+import pytest
+
+from graph_algos.dfs import Graph, Node
+
+Edges = List[Tuple[int, int, float]]
+
+
+class RandomGraph:
+    """
+    A small random graph, built both as a `Graph` of `Node` objects and as the plain lists the reference
+    implementations in the tests work on
+    """
+
+    def __init__(self, vertex_count: int, edges: Edges, arcs: List[Tuple[int, int]]):
+        """
+        :param vertex_count: The number of vertices
+        :param edges: Undirected weighted (u, v, weight) edges, added with `add_edge`
+        :param arcs: Directed (tail, head) connections, added with `connect`
+        """
+        self.vertex_count = vertex_count
+        self.edges = edges
+        self.arcs = arcs
+        self.nodes = [Node(vertex) for vertex in range(vertex_count)]
+        for u, v, weight in edges:
+            self.nodes[u].add_edge(self.nodes[v], weight)
+        for tail, head in arcs:
+            self.nodes[tail].connect(self.nodes[head])
+        self.graph = Graph()
+        self.graph.insert_vertexes(self.nodes)
+
+
+@pytest.fixture
+def random_graph() -> Callable[..., RandomGraph]:
+    """
+    Builds seeded random graphs. Weights are small integers, so distances summed in any order compare exactly.
+    """
+
+    def build(seed: int, vertex_count: int = 12, edge_count: int = 24, arc_count: int = 24,
+              max_weight: int = 9) -> RandomGraph:
+        rng = random.Random(seed)
+        edges = [(rng.randrange(vertex_count), rng.randrange(vertex_count), float(rng.randint(1, max_weight)))
+                 for _ in range(edge_count)]
+        arcs = [(rng.randrange(vertex_count), rng.randrange(vertex_count)) for _ in range(arc_count)]
+        return RandomGraph(vertex_count, edges, arcs)
+    return build
+
+
+@pytest.fixture
+def foreign_byte_order() -> Callable[[str, struct.Struct], None]:
+    """
+    Rewrites a saved index as a machine of the other byte order would have written it. The header is always
+    little-endian with the byte order as its third field, and every value after it is 8 bytes wide.
+    """
+
+    def rewrite(path: str, header: struct.Struct) -> None:
+        with open(path, 'rb') as file:
+            data = file.read()
+        fields = list(header.unpack_from(data, 0))
+        fields[2] = 3 - fields[2]
+        body = array('q', data[header.size:])
+        body.byteswap()
+        with open(path, 'wb') as file:
+            file.write(header.pack(*fields) + body.tobytes())
+    return rewrite
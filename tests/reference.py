@@ -0,0 +1,179 @@
+"""
+Brute force references the engines are checked against, slow but obviously correct on small graphs
+"""
+
+from __future__ import annotations
+
+from itertools import combinations
+from typing import Iterable, List, Tuple
+
+Edges = List[Tuple[int, int, float]]
+
+
+def floyd_warshall(vertex_count: int, edges: Edges) -> List[List[float]]:
+    """
+    All pairs shortest distances over undirected edges
+    """
+    distance = [[0.0 if u == v else float('inf') for v in range(vertex_count)] for u in range(vertex_count)]
+    for u, v, weight in edges:
+        if u != v:
+            distance[u][v] = distance[v][u] = min(distance[u][v], weight)
+    for middle in range(vertex_count):
+        for u in range(vertex_count):
+            for v in range(vertex_count):
+                if distance[u][middle] + distance[middle][v] < distance[u][v]:
+                    distance[u][v] = distance[u][middle] + distance[middle][v]
+    return distance
+
+
+def reachability(vertex_count: int, arcs: List[Tuple[int, int]]) -> List[List[bool]]:
+    """
+    Whether every vertex reaches every other one over the directed arcs, every vertex reaches itself
+    """
+    reaches = [[u == v for v in range(vertex_count)] for u in range(vertex_count)]
+    for tail, head in arcs:
+        reaches[tail][head] = True
+    for middle in range(vertex_count):
+        for u in range(vertex_count):
+            if reaches[u][middle]:
+                for v in range(vertex_count):
+                    reaches[u][v] = reaches[u][v] or reaches[middle][v]
+    return reaches
+
+
+def hops(vertex_count: int, arcs: List[Tuple[int, int]], source: int) -> List[int]:
+    """
+    The fewest arcs from the source to every vertex, -1 if unreachable, by relaxing every arc until nothing changes
+    """
+    depth = [-1] * vertex_count
+    depth[source] = 0
+    changed = True
+    while changed:
+        changed = False
+        for tail, head in arcs:
+            if depth[tail] >= 0 and (depth[head] < 0 or depth[tail] + 1 < depth[head]):
+                depth[head] = depth[tail] + 1
+                changed = True
+    return depth
+
+
+def component_count(vertex_count: int, edges: Iterable[Tuple[int, int, float]]) -> int:
+    """
+    The number of connected components, or -1 if the edges contain a cycle
+    """
+    parent = list(range(vertex_count))
+
+    def find(vertex: int) -> int:
+        while parent[vertex] != vertex:
+            vertex = parent[vertex]
+        return vertex
+
+    count = vertex_count
+    for u, v, _ in edges:
+        root_u, root_v = find(u), find(v)
+        if root_u == root_v:
+            return -1
+        parent[root_u] = root_v
+        count -= 1
+    return count
+
+
+def spanning_forest_weight(vertex_count: int, edges: Edges) -> float:
+    """
+    The weight of a minimum spanning forest, by trying every acyclic subset of edges of the forest's size
+    """
+    edges = [edge for edge in edges if edge[0] != edge[1]]
+    reaches = reachability(vertex_count, [(u, v) for u, v, _ in edges] + [(v, u) for u, v, _ in edges])
+    forest_size = vertex_count - len({tuple(row) for row in reaches})  # one edge less than vertices per component
+    return min((sum(weight for _, _, weight in chosen) for chosen in combinations(edges, forest_size)
+                if component_count(vertex_count, chosen) >= 0), default=0.0)
+
+
+def simple_path_lengths(vertex_count: int, edges: Edges, source: int, target: int) -> List[float]:
+    """
+    The length of every loopless path from source to target, shortest first. Paths are vertex sequences, so
+    parallel edges count once, with the lightest weight
+    """
+    lightest = {}
+    for u, v, weight in edges:
+        if u != v:
+            for tail, head in ((u, v), (v, u)):
+                lightest[tail, head] = min(lightest.get((tail, head), weight), weight)
+    adjacency = [[] for _ in range(vertex_count)]
+    for (tail, head), weight in lightest.items():
+        adjacency[tail].append((head, weight))
+    lengths = []
+
+    def walk(vertex: int, visited: frozenset, length: float) -> None:
+        if vertex == target:
+            lengths.append(length)
+            return
+        for head, weight in adjacency[vertex]:
+            if head not in visited:
+                walk(head, visited | {head}, length + weight)
+    walk(source, frozenset([source]), 0.0)
+    return sorted(lengths)
+
+
+def pagerank(vertex_count: int, arcs: Iterable[Tuple[int, int, float]], damping: float = 0.85,
+             personalization: List[float] | None = None) -> List[float]:
+    """
+    PageRank by power iteration straight from the arc list until the vector stops changing. Every vertex splits its
+    rank over its out-arcs in proportion to their weights, and rank held by vertices without out-arcs teleports.
+    """
+    arcs = list(arcs)
+    teleport = personalization or [1.0] * vertex_count
+    teleport = [value / sum(teleport) for value in teleport]
+    out_weight = [0.0] * vertex_count
+    for tail, _, weight in arcs:
+        out_weight[tail] += weight
+    rank = list(teleport)
+    for _ in range(10000):
+        spread = [0.0] * vertex_count
+        for tail, head, weight in arcs:
+            spread[head] += rank[tail] * weight / out_weight[tail]
+        dangling = sum(rank[vertex] for vertex in range(vertex_count) if out_weight[vertex] == 0)
+        updated = [damping * (spread[v] + dangling * teleport[v]) + (1 - damping) * teleport[v]
+                   for v in range(vertex_count)]
+        if max(abs(new - old) for new, old in zip(updated, rank)) < 1e-15:
+            return updated
+        rank = updated
+    return rank
+
+
+def closeness(distance: List[List[float]], unreached: float) -> List[float]:
+    """
+    Wasserman and Faust closeness of every vertex from the full distance matrix, distance[u][v] being from u to v
+    """
+    n = len(distance)
+    scores = []
+    for vertex in range(n):
+        reached = [distance[other][vertex] for other in range(n)
+                   if other != vertex and distance[other][vertex] != unreached]
+        total = sum(reached)
+        scores.append(len(reached) / total * len(reached) / (n - 1) if total > 0 else 0.0)
+    return scores
+
+
+def depth_first(vertex_count: int, arcs: List[Tuple[int, int]], source: int) -> Tuple[List[int], List[int], List[int]]:
+    """
+    The textbook recursive depth first search, following every vertex's arcs in the order they were added
+
+    :return: The preorder, the postorder, and the parent of every vertex (-1 for the source and unreached vertices)
+    """
+    adjacency = [[] for _ in range(vertex_count)]
+    for tail, head in arcs:
+        adjacency[tail].append(head)
+    preorder, postorder, parent = [], [], [-1] * vertex_count
+    visited = [False] * vertex_count
+
+    def visit(vertex: int) -> None:
+        visited[vertex] = True
+        preorder.append(vertex)
+        for head in adjacency[vertex]:
+            if not visited[head]:
+                parent[head] = vertex
+                visit(head)
+        postorder.append(vertex)
+    visit(source)
+    return preorder, postorder, parent
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import time
+from array import array
+
+import pytest
+
+from graph_algos.batch import batch_shortest_paths, distance_table
+from graph_algos.shortest_paths import dijkstra
+
+SEEDS = range(3)
+
+
+def finite_total(source: int, distance: array) -> float:
+    return sum(value for value in distance if value != float('inf'))
+
+
+def slow_total(source: int, distance: array) -> float:
+    time.sleep(0.05)
+    return finite_total(source, distance)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_dijkstras_matches_one_dijkstra_per_source(random_graph, seed, workers):
+    built = random_graph(seed, vertex_count=30, edge_count=60)
+    graph = built.graph.to_csr()
+    expected = {node.value: list(dijkstra(graph, [node.value]).distance) for node in built.nodes}
+    rows = dict(built.graph.batch_dijkstras(workers=workers))
+    assert {node.value: list(row) for node, row in rows.items()} == expected
+    targets = built.nodes[::4]
+    rows = dict(built.graph.batch_dijkstras(built.nodes[:5], targets, workers=workers))
+    assert sorted(node.value for node in rows) == list(range(5))
+    for node, row in rows.items():
+        assert list(row) == [expected[node.value][target.value] for target in targets]
+    totals = dict(batch_shortest_paths(graph, aggregate=finite_total, workers=workers, chunk_size=4))
+    assert totals == {source: finite_total(source, array('d', row)) for source, row in expected.items()}
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_distance_table_keeps_the_order_of_sources(random_graph, workers):
+    built = random_graph(0, vertex_count=30, edge_count=60)
+    graph = built.graph.to_csr()
+    sources, targets = [7, 3, 19, 0], [2, 29, 7]
+    table = distance_table(graph, sources, targets, workers=workers)
+    assert [list(row) for row in table] == [[dijkstra(graph, [source]).distance[target] for target in targets]
+                                            for source in sources]
+    square = distance_table(graph, sources, workers=workers)
+    assert [list(row) for row in square] == [[dijkstra(graph, [source]).distance[target] for target in sources]
+                                             for source in sources]
+
+
+@pytest.mark.parametrize('through_graph', [False, True])
+def test_closing_early_cancels_the_pending_sources(random_graph, through_graph):
+    built = random_graph(0, vertex_count=200, edge_count=400)
+    if through_graph:
+        rows = built.graph.batch_dijkstras(aggregate=slow_total, workers=1)
+    else:
+        rows = batch_shortest_paths(built.graph.to_csr(), aggregate=slow_total, workers=1, chunk_size=1)
+    began = time.perf_counter()
+    next(rows)
+    rows.close()
+    assert time.perf_counter() - began < 5  # 10 seconds to run whole, the chunks already handed out still finish
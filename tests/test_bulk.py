@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Tuple
+
+import pytest
+
+from graph_algos.bulk import EdgeMerge, merge_edges
+from graph_algos.csr import CSRGraph
+from graph_algos.dfs import Graph, Node, Vertex
+
+SEEDS = range(10)
+
+
+def expected_weights(batches: List[List[Tuple[int, int, float]]], merge: EdgeMerge,
+                     directed: bool = False) -> Dict[Tuple[int, int], float]:
+    """
+    The weight every edge ends up with, applying the batches one edge at a time
+    """
+    weights = {}
+    for batch in batches:
+        for u, v, weight in batch:
+            key = (u, v) if directed else (min(u, v), max(u, v))
+            if key not in weights or merge == EdgeMerge.LAST:
+                weights[key] = weight
+            elif merge == EdgeMerge.MIN:
+                weights[key] = min(weights[key], weight)
+            else:
+                weights[key] += weight
+    return weights
+
+
+def graph_weights(nodes: List[Node | Vertex]) -> Dict[Tuple[int, int], List[float]]:
+    """
+    The weights of every edge, keyed like `expected_weights`, once per `Edge` in the adjacency lists
+    """
+    index = {id(node): i for i, node in enumerate(nodes)}
+    weights = {}
+    for u, node in enumerate(nodes):
+        for edge in node.edges:
+            v = index[id(edge.node)]
+            if u <= v:
+                weights.setdefault((u, v), []).append(edge.distance)
+    return weights
+
+
+def random_batch(rng: random.Random, vertex_count: int, size: int) -> List[Tuple[int, int, float]]:
+    return [(rng.randrange(vertex_count), rng.randrange(vertex_count), float(rng.randint(1, 9))) for _ in range(size)]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('merge', list(EdgeMerge))
+@pytest.mark.parametrize('kind', [Node, Vertex])
+def test_add_edges_merges_parallel_edges(seed, merge, kind):
+    rng = random.Random(seed)
+    nodes = [kind(value) for value in range(10)]
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    batches = [random_batch(rng, 10, 30), random_batch(rng, 10, 30)]
+    graph.add_edges(batches[0], merge)
+    graph.add_edges([(nodes[u], nodes[v], weight) for u, v, weight in batches[1]], merge)  # nodes work too
+    expected = expected_weights(batches, merge)
+    actual = graph_weights(nodes)
+    assert set(actual) == set(expected)
+    for (u, v), weight in expected.items():
+        assert actual[u, v] == [weight] * (2 if u == v else 1)  # a loop is listed twice, like `add_edge` does
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_add_edges_primes_the_same_csr_view(seed):
+    rng = random.Random(seed)
+    nodes = [Vertex(value) for value in range(20)]
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    graph.add_edges(random_batch(rng, 20, 60))
+    primed = graph.to_csr()
+    compiled = CSRGraph.from_vertices(graph.vertices)
+    assert list(primed.offsets) == list(compiled.offsets)
+    assert list(primed.targets) == list(compiled.targets)
+    assert list(primed.weights) == list(compiled.weights)
+
+
+def test_add_edges_tells_listeners_once_per_change():
+    nodes = [Node(value) for value in range(4)]
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    nodes[0].add_edge(nodes[1], 5)
+    seen = []
+    graph.edge_listeners.append(lambda tail, head, distance: seen.append((tail.value, head.value, distance)))
+    version = graph.version
+    graph.add_edges([(0, 1, 7), (1, 0, 3), (2, 3, 4), (3, 2, 6)])
+    assert sorted(seen) == [(0, 1, 3), (2, 3, 4)]
+    assert graph.version == version + 1
+    graph.add_edges([(0, 1, 9)])  # heavier than the existing edge, nothing changes
+    assert len(seen) == 2
+
+
+def test_add_edges_rejects_foreign_nodes():
+    graph = Graph()
+    graph.insert_vertexes([Node(0), Node(1)])
+    with pytest.raises(KeyError):
+        graph.add_edges([(graph.vertices[0], Node(2), 1.0)])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_connect_many_skips_existing_and_repeated_connections(seed):
+    rng = random.Random(seed)
+    nodes = [Node(value) for value in range(8)]
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    nodes[0].connect(nodes[1])
+    pairs = [(rng.randrange(8), rng.randrange(8)) for _ in range(40)] + [(0, 1)]
+    graph.connect_many(pairs)
+    expected = set(pairs)
+    actual = [(tail.value, head.value) for tail in nodes for head in tail.connections]
+    assert sorted(actual) == sorted(expected)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('merge', list(EdgeMerge))
+@pytest.mark.parametrize('directed', [False, True])
+def test_merge_edges_sorts_and_collapses(seed, merge, directed):
+    rng = random.Random(seed)
+    batch = random_batch(rng, 12, 50)
+    sources, targets, weights = zip(*batch)
+    out_sources, out_targets, out_weights = merge_edges(sources, targets, weights, merge, directed)
+    expected = expected_weights([batch], merge, directed)
+    assert list(zip(out_sources, out_targets)) == sorted(expected)
+    assert list(out_weights) == [expected[key] for key in sorted(expected)]
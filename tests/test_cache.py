@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import List
+
+from graph_algos.cache import _size
+from graph_algos.dfs import Graph, Node
+from reference import floyd_warshall
+
+
+def path_graph(count: int = 5) -> List[Node]:
+    """
+    0 - 1 - 2 - ... in a line, every edge weighing 1
+    """
+    nodes = [Node(value) for value in range(count)]
+    for tail, head in zip(nodes, nodes[1:]):
+        tail.add_edge(head, 1)
+    Graph().insert_vertexes(nodes)
+    return nodes
+
+
+def test_cache_hits_and_misses():
+    nodes = path_graph()
+    graph = nodes[0].graph
+    cache = graph.enable_path_cache()
+    first = graph.dijkstras(nodes[0])
+    assert graph.dijkstras(nodes[0], nodes[3]) is first  # any target is answered from the full tree
+    assert cache.route(nodes[0], nodes[4]) == (4, nodes)
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+    assert cache.stats.hit_rate == 2 / 3
+    assert len(cache) == 1
+
+
+def test_cache_evicts_the_least_recently_used_tree():
+    nodes = path_graph()
+    graph = nodes[0].graph
+    cache = graph.enable_path_cache(capacity=2)
+    for source in (0, 1, 0, 2):  # 0 was used after 1, so 1 goes when 2 comes in
+        cache.tree(nodes[source])
+    assert list(cache.trees) == [0, 2]
+    assert cache.stats.evictions == 1
+    misses = cache.stats.misses
+    cache.tree(nodes[1])
+    assert cache.stats.misses == misses + 1
+    assert list(cache.trees) == [2, 1]
+
+
+def test_cache_stays_within_max_bytes():
+    nodes = path_graph()
+    graph = nodes[0].graph
+    size = _size(graph.dijkstras(nodes[0]))
+    cache = graph.enable_path_cache(capacity=10, max_bytes=size * 2 + size // 2)
+    for source in nodes:
+        cache.tree(source)
+    assert list(cache.trees) == [3, 4]
+    assert cache.nbytes == size * 2
+    assert cache.stats.evictions == 3
+
+
+def test_cache_keeps_one_tree_larger_than_max_bytes():
+    nodes = path_graph()
+    cache = nodes[0].graph.enable_path_cache(max_bytes=1)
+    cache.tree(nodes[0])
+    cache.tree(nodes[1])
+    assert list(cache.trees) == [1]
+
+
+def test_cache_drops_its_trees_when_an_edge_changes(random_graph):
+    built = random_graph(0)
+    graph = built.graph
+    cache = graph.enable_path_cache()
+    edges = list(built.edges)
+    source, target = built.nodes[0], built.nodes[5]
+    assert cache.route(source, target)[0] == floyd_warshall(built.vertex_count, edges)[0][5]
+
+    source.add_edge(target, 0.5)  # a shortcut
+    edges.append((0, 5, 0.5))
+    assert cache.route(source, target) == (0.5, [source, target])
+    assert cache.stats.invalidations == 1
+
+    source.set_edge_distance(target, 100)  # the shortcut gets expensive, the old route is back
+    edges = [(u, v, 100 if {u, v} == {0, 5} else weight) for u, v, weight in edges]
+    distance = floyd_warshall(built.vertex_count, edges)
+    assert cache.route(source, target)[0] == distance[0][5]
+    assert cache.stats.invalidations == 2
+    for node in built.nodes:
+        assert graph.dijkstras(source, node).distance_to(node) == distance[0][node.value]
+    assert cache.stats.invalidations == 2
+
+
+def test_cache_drops_its_trees_when_a_vertex_is_inserted():
+    nodes = path_graph()
+    graph = nodes[0].graph
+    cache = graph.enable_path_cache()
+    cache.tree(nodes[0])
+    extra = Node(5)
+    graph.insert_vertex(extra)
+    nodes[4].add_edge(extra, 2)
+    assert cache.route(nodes[0], extra) == (6, nodes + [extra])
+    assert len(cache) == 1
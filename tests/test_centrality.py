@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pytest
+
+from graph_algos.centrality import pagerank
+from graph_algos.dfs import Graph, Node
+from reference import closeness, floyd_warshall, hops
+from reference import pagerank as reference_pagerank
+
+SEEDS = range(6)
+PRECISE = dict(tolerance=1e-13, max_iterations=1000)
+
+
+def assert_close(actual, expected) -> None:
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert got == pytest.approx(want, abs=1e-9)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_pagerank_matches_power_iteration(random_graph, seed):
+    built = random_graph(seed, arc_count=18)  # sparse enough to leave vertices without out-arcs
+    ranking = built.graph.pagerank(**PRECISE)
+    assert ranking.converged
+    assert sum(ranking.scores) == pytest.approx(1.0)
+    assert_close(ranking.scores, reference_pagerank(built.vertex_count, [(u, v, 1.0) for u, v in built.arcs]))
+    best = max(range(built.vertex_count), key=ranking.scores.__getitem__)
+    assert ranking.top(1) == [(built.nodes[best], ranking.scores[best])]
+    assert ranking.score_of(built.nodes[best]) == ranking.scores[best]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_pagerank_by_weight_matches_power_iteration(random_graph, seed):
+    built = random_graph(seed)
+    arcs = [(u, v, weight) for u, v, weight in built.edges] + [(v, u, weight) for u, v, weight in built.edges]
+    ranking = built.graph.pagerank(weighted=True, by_weight=True, **PRECISE)
+    assert sum(ranking.scores) == pytest.approx(1.0)
+    assert_close(ranking.scores, reference_pagerank(built.vertex_count, arcs))
+
+
+def test_pagerank_hands_dangling_rank_back_through_teleports():
+    nodes = [Node(value) for value in range(4)]
+    nodes[0].connect(nodes[1])
+    nodes[1].connect(nodes[2])
+    nodes[3].connect(nodes[2])  # 2 has no out-arcs, everything drains into it
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    ranking = graph.pagerank(**PRECISE)
+    assert sum(ranking.scores) == pytest.approx(1.0)
+    assert_close(ranking.scores, reference_pagerank(4, [(0, 1, 1.0), (1, 2, 1.0), (3, 2, 1.0)]))
+    assert ranking.top(1)[0][0] is nodes[2]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_personalized_pagerank_teleports_to_the_seeds(random_graph, seed):
+    built = random_graph(seed, arc_count=18)
+    arcs = [(u, v, 1.0) for u, v in built.arcs]
+    ranking = built.graph.personalized_pagerank(built.nodes[:2], **PRECISE)
+    personalization = [1.0, 1.0] + [0.0] * (built.vertex_count - 2)
+    assert sum(ranking.scores) == pytest.approx(1.0)
+    assert_close(ranking.scores, reference_pagerank(built.vertex_count, arcs, personalization=personalization))
+    weights = [float(vertex % 3) for vertex in range(built.vertex_count)]
+    ranking = pagerank(built.graph.to_csr(weighted=False), personalization=weights, **PRECISE)
+    assert_close(ranking.scores, reference_pagerank(built.vertex_count, arcs, personalization=weights))
+
+
+def test_pagerank_rejects_bad_vectors(random_graph):
+    graph = random_graph(0).graph.to_csr(weighted=False)
+    with pytest.raises(ValueError):
+        pagerank(graph, personalization=[1.0])
+    with pytest.raises(ValueError):
+        pagerank(graph, personalization=[0.0] * graph.vertex_count)
+
+
+def test_pagerank_warm_start_converges_sooner(random_graph):
+    built = random_graph(0)
+    cold = built.graph.pagerank(**PRECISE)
+    warm = built.graph.pagerank(start=cold, **PRECISE)
+    assert warm.iterations < cold.iterations
+    assert_close(warm.scores, cold.scores)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_degree_centrality_counts_arcs(random_graph, seed):
+    built = random_graph(seed)
+    scale = built.vertex_count - 1
+    outgoing = built.graph.degree_centrality()
+    incoming = built.graph.degree_centrality(incoming=True)
+    assert_close(outgoing, [sum(tail == v for tail, _ in built.arcs) / scale for v in range(built.vertex_count)])
+    assert_close(incoming, [sum(head == v for _, head in built.arcs) / scale for v in range(built.vertex_count)])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_closeness_centrality_by_hops_and_by_weight(random_graph, seed):
+    built = random_graph(seed, edge_count=12)
+    depth = [hops(built.vertex_count, built.arcs, source) for source in range(built.vertex_count)]
+    assert_close(built.graph.closeness_centrality(), closeness(depth, -1))
+    distance = floyd_warshall(built.vertex_count, built.edges)
+    assert_close(built.graph.closeness_centrality(weighted=True, by_weight=True), closeness(distance, float('inf')))
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from graph_algos.dfs import Graph, Node
+from reference import reachability
+
+SEEDS = range(8)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_connected_components_match_reachability(random_graph, seed):
+    built = random_graph(seed, edge_count=8)
+    undirected = [(u, v) for u, v, _ in built.edges] + [(v, u) for u, v, _ in built.edges]
+    reaches = reachability(built.vertex_count, undirected)
+    components = built.graph.connected_components()
+    assert components.count == len({tuple(row) for row in reaches})
+    for u in built.nodes:
+        for v in built.nodes:
+            assert components.connected(u, v) == reaches[u.value][v.value]
+    assert sum(components.sizes) == built.vertex_count
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_tracked_components_follow_added_edges(seed):
+    rng = random.Random(seed)
+    nodes = [Node(value) for value in range(15)]
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    tracked = graph.track_components()
+    for _ in range(12):
+        u, v = rng.randrange(15), rng.randrange(15)
+        nodes[u].add_edge(nodes[v], 1)
+        batch = graph.connected_components()
+        assert tracked.count == batch.count
+        for first in nodes:
+            assert tracked.connected(first, nodes[0]) == batch.connected(first, nodes[0])
+    tracked.detach()
+
+
+def test_tracked_components_ignore_reweighting_a_missing_edge():
+    nodes = [Node(value) for value in range(4)]
+    nodes[0].add_edge(nodes[1], 1)
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    tracked = graph.track_components()
+    graph.edge_changed(nodes[2], nodes[3], 5)
+    assert not tracked.connected(nodes[2], nodes[3])
+    assert tracked.count == 3
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_strongly_connected_components_match_mutual_reachability(random_graph, seed):
+    built = random_graph(seed, arc_count=18)
+    reaches = reachability(built.vertex_count, built.arcs)
+    components = built.graph.strongly_connected_components()
+    for u in built.nodes:
+        for v in built.nodes:
+            mutual = reaches[u.value][v.value] and reaches[v.value][u.value]
+            assert components.connected(u, v) == mutual
+    for tail, head in built.arcs:  # numbered in topological order of the condensation
+        assert components.component_of(built.nodes[tail]) <= components.component_of(built.nodes[head])
+    condensed = built.graph.condensation()[1]
+    assert condensed.vertex_count == components.count
+    for component in range(condensed.vertex_count):
+        assert all(head != component for head in condensed.neighbors(component))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_topological_sort_orders_every_arc_forward(seed):
+    rng = random.Random(seed)
+    nodes = [Node(value) for value in range(12)]
+    rank = list(range(12))
+    rng.shuffle(rank)
+    for _ in range(30):  # arcs always go up in rank, so the graph is a DAG
+        u, v = rng.sample(range(12), 2)
+        if rank[u] > rank[v]:
+            u, v = v, u
+        nodes[u].connect(nodes[v])
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    position = {node.value: i for i, node in enumerate(graph.topological_sort())}
+    assert sorted(position) == list(range(12))
+    for node in nodes:
+        for head in node.connections:
+            assert position[node.value] < position[head.value]
+    nodes[5].connect(nodes[5])
+    with pytest.raises(ValueError):
+        graph.topological_sort()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from graph_algos.contraction import HEADER, ContractionHierarchy
+
+
+def saved_hierarchy(random_graph, tmp_path):
+    built = random_graph(0)
+    hierarchy = built.graph.contraction_hierarchy()
+    path = str(tmp_path / 'graph.hierarchy')
+    hierarchy.save(path)
+    return built, hierarchy, path
+
+
+def assert_same_hierarchy(loaded: ContractionHierarchy, hierarchy: ContractionHierarchy) -> None:
+    for name in ('rank', 'up_middle', 'down_middle'):
+        assert list(getattr(loaded, name)) == list(getattr(hierarchy, name))
+    for side in ('up', 'down'):
+        for buffer in ('offsets', 'targets', 'weights'):
+            assert list(getattr(getattr(loaded, side), buffer)) == list(getattr(getattr(hierarchy, side), buffer))
+
+
+def test_contraction_hierarchy_round_trip(random_graph, tmp_path):
+    built, hierarchy, path = saved_hierarchy(random_graph, tmp_path)
+    loaded = ContractionHierarchy.load(path, built.graph.to_csr().nodes)
+    assert_same_hierarchy(loaded, hierarchy)
+    for source in built.nodes:
+        for target in built.nodes:
+            assert loaded.route(source, target) == hierarchy.route(source, target)
+
+
+def test_contraction_hierarchy_written_in_the_other_byte_order(random_graph, tmp_path, foreign_byte_order):
+    built, hierarchy, path = saved_hierarchy(random_graph, tmp_path)
+    foreign_byte_order(path, HEADER)
+    assert_same_hierarchy(ContractionHierarchy.load(path), hierarchy)
+
+
+def test_contraction_hierarchy_rejects_other_files(random_graph, tmp_path):
+    built, hierarchy, path = saved_hierarchy(random_graph, tmp_path)
+    with open(path, 'rb') as file:
+        whole = file.read()
+    fields = list(HEADER.unpack_from(whole, 0))
+    fields[1] = 1  # version 1 had no byte order in its header
+    for broken in (whole[:HEADER.size - 1], whole[:-1], HEADER.pack(*fields) + whole[HEADER.size:]):
+        with open(path, 'wb') as file:
+            file.write(broken)
+        with pytest.raises(ValueError):
+            ContractionHierarchy.load(path)
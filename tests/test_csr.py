@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from graph_algos.dfs import Graph, Node
+
+
+def test_to_csr_follows_edges_of_nodes_never_inserted():
+    a, b, c, d = Node(0), Node(1), Node(2), Node(3)
+    graph = Graph()
+    graph.insert_vertexes([a])
+    a.add_edge(b, 1)
+    a.connect(b)
+    assert graph.to_csr().vertex_count == 2
+    assert graph.to_csr(weighted=False).vertex_count == 2
+    b.add_edge(c, 1)  # b is only reachable, it was compiled in after `vertices`
+    b.connect(d)
+    assert graph.to_csr().vertex_count == 3
+    assert list(graph.to_csr().neighbors(1)) == [0, 2]
+    assert graph.to_csr(weighted=False).vertex_count == 3
+    assert graph.dijkstras(a).distance_to(c) == 2
+    assert graph.bfs(a, d) is d
+
+
+def test_to_csr_is_reused_until_the_graph_changes():
+    nodes = [Node(value) for value in range(3)]
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    nodes[0].add_edge(nodes[1], 4)
+    compiled = graph.to_csr()
+    assert graph.to_csr() is compiled
+    nodes[1].add_edge(nodes[2], 1)
+    assert graph.to_csr() is not compiled
+    assert list(graph.to_csr().weights) == [4.0, 4.0, 1.0, 1.0]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from graph_algos.landmarks import HEADER, LandmarkIndex
+
+
+def saved_index(random_graph, tmp_path):
+    built = random_graph(0)
+    index = built.graph.landmark_index(3)
+    path = str(tmp_path / 'graph.landmarks')
+    index.save(path)
+    return built, index, path
+
+
+def assert_same_index(loaded: LandmarkIndex, index: LandmarkIndex) -> None:
+    assert loaded.landmarks == index.landmarks
+    assert [list(row) for row in loaded.from_landmark] == [list(row) for row in index.from_landmark]
+    assert [list(row) for row in loaded.to_landmark] == [list(row) for row in index.to_landmark]
+
+
+def test_landmark_index_round_trip(random_graph, tmp_path):
+    built, index, path = saved_index(random_graph, tmp_path)
+    graph = built.graph.to_csr()
+    loaded = LandmarkIndex.load(path, graph)
+    assert_same_index(loaded, index)
+    for target in range(graph.vertex_count):
+        assert loaded.query(0, target) == index.query(0, target)
+
+
+def test_landmark_index_written_in_the_other_byte_order(random_graph, tmp_path, foreign_byte_order):
+    built, index, path = saved_index(random_graph, tmp_path)
+    foreign_byte_order(path, HEADER)
+    assert_same_index(LandmarkIndex.load(path, built.graph.to_csr()), index)
+
+
+def test_landmark_index_rejects_other_files(random_graph, tmp_path):
+    built, index, path = saved_index(random_graph, tmp_path)
+    with open(path, 'rb') as file:
+        whole = file.read()
+    fields = list(HEADER.unpack_from(whole, 0))
+    fields[1] = 1  # version 1 had no byte order in its header
+    for broken in (whole[:HEADER.size - 1], whole[:-1], HEADER.pack(*fields) + whole[HEADER.size:]):
+        with open(path, 'wb') as file:
+            file.write(broken)
+        with pytest.raises(ValueError):
+            LandmarkIndex.load(path, built.graph.to_csr())
+    built.nodes[0].add_edge(built.nodes[1], 1)  # a different graph now
+    with open(path, 'wb') as file:
+        file.write(whole)
+    with pytest.raises(ValueError):
+        LandmarkIndex.load(path, built.graph.to_csr())
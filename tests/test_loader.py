@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import random
+from typing import List, Tuple
+
+import pytest
+
+from graph_algos.loader import _parse, load_binary_edges, load_edge_list, write_binary_edges
+
+
+@pytest.mark.parametrize('delimiter', [None, ','])
+def test_load_edge_list_skips_comments_and_blank_lines(tmp_path, delimiter):
+    separator = delimiter or ' '
+    path = tmp_path / 'edges.txt'
+    path.write_text('# header\n0{0}1{0}2.5\n\n   # indented comment\n\t# tabbed comment\n1{0}2{0}4\n'.format(separator))
+    graph = load_edge_list(str(path), delimiter=delimiter)
+    assert graph.vertex_count == 3
+    assert list(graph.offsets) == [0, 1, 2, 2]
+    assert list(graph.targets) == [1, 2]
+    assert list(graph.weights) == [2.5, 4.0]
+
+
+def random_edges(seed: int, vertex_count: int = 9, count: int = 40) -> List[Tuple[int, int, float]]:
+    rng = random.Random(seed)
+    return [(rng.randrange(vertex_count), rng.randrange(vertex_count), rng.randint(1, 9) / 2) for _ in range(count)]
+
+
+def adjacency(graph) -> List[List[Tuple[int, float]]]:
+    return [sorted(graph.weighted_neighbors(vertex)) for vertex in range(graph.vertex_count)]
+
+
+def expected_adjacency(edges, vertex_count: int, directed: bool, weighted: bool) -> List[List[Tuple[int, float]]]:
+    rows = [[] for _ in range(vertex_count)]
+    for source, target, weight in edges:
+        weight = weight if weighted else 1.0
+        rows[source].append((target, weight))
+        if not directed:
+            rows[target].append((source, weight))
+    return [sorted(row) for row in rows]
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('directed', [True, False])
+@pytest.mark.parametrize('weighted', [True, False])
+def test_load_edge_list_builds_every_edge(tmp_path, seed, directed, weighted):
+    edges = random_edges(seed)
+    path = tmp_path / 'edges.tsv'
+    path.write_text(''.join('{}\t{}\t{}\n'.format(*edge) for edge in edges))
+    graph = load_edge_list(str(path), weighted=weighted, directed=directed, vertex_count=12, chunk_size=7)
+    assert graph.vertex_count == 12
+    assert adjacency(graph) == expected_adjacency(edges, 12, directed, weighted)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('directed', [True, False])
+@pytest.mark.parametrize('weighted', [True, False])
+def test_binary_edges_round_trip(tmp_path, seed, directed, weighted):
+    edges = random_edges(seed)
+    sources, targets, weights = (list(column) for column in zip(*edges))
+    path = str(tmp_path / 'edges.bin')
+    write_binary_edges(path, sources, targets, weights if weighted else None)
+    graph = load_binary_edges(path, directed=directed, chunk_size=7)
+    assert graph.vertex_count == max(sources + targets) + 1
+    assert adjacency(graph) == expected_adjacency(edges, graph.vertex_count, directed, weighted)
+
+
+def test_load_binary_edges_rejects_other_files(tmp_path):
+    path = tmp_path / 'edges.bin'
+    path.write_bytes(b'GAEX' + b'\0' * 12)
+    with pytest.raises(ValueError):
+        load_binary_edges(str(path))
+
+
+def test_loaders_reject_negative_and_out_of_range_ids(tmp_path):
+    text = tmp_path / 'edges.txt'
+    text.write_text('0 1 1\n2 -1 1\n')
+    with pytest.raises(ValueError):
+        load_edge_list(str(text))
+    binary = str(tmp_path / 'edges.bin')
+    write_binary_edges(binary, [0, -3], [1, 2])
+    with pytest.raises(ValueError):
+        load_binary_edges(binary)
+    text.write_text('0 1 1\n2 5 1\n')
+    with pytest.raises(ValueError):
+        load_edge_list(str(text), vertex_count=4)
+    write_binary_edges(binary, [0, 5], [1, 2])
+    with pytest.raises(ValueError):
+        load_binary_edges(binary, vertex_count=4)
+
+
+def test_ids_are_parsed_as_exact_integers():
+    large = 2 ** 53 + 1  # the first integer a float64 cannot hold
+    sources, targets, weights = _parse(['{} 3 0.5\n'.format(large), '7 {} 2\n'.format(large + 2)], None, True)
+    assert [int(vertex) for vertex in sources] == [large, 7]
+    assert [int(vertex) for vertex in targets] == [3, large + 2]
+    assert [float(weight) for weight in weights] == [0.5, 2.0]
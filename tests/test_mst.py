@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+
+from graph_algos.dfs import Graph
+from reference import component_count, spanning_forest_weight
+
+SEEDS = range(12)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_prims_and_kruskals_find_a_minimum_spanning_forest(random_graph, seed):
+    built = random_graph(seed, vertex_count=6, edge_count=9)
+    expected = spanning_forest_weight(built.vertex_count, built.edges)
+    for tree, total in (built.graph.prims(), built.graph.kruskals()):
+        assert total == expected
+        assert sum(weight for _, _, weight in tree) == expected
+        forest = [(u.value, v.value, weight) for u, v, weight in tree]
+        assert component_count(built.vertex_count, forest) >= 0  # no cycle
+        for u, v, weight in forest:
+            assert (u, v, weight) in built.edges or (v, u, weight) in built.edges
+
+
+def test_prims_on_an_empty_graph():
+    assert Graph().prims() is None
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from graph_algos.query import QueryExecutor
+from graph_algos.shortest_paths import ShortestPaths
+from reference import floyd_warshall, reachability
+
+SEEDS = range(4)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_traversals_run_on_the_pool(random_graph, seed):
+    built = random_graph(seed)
+    reaches = reachability(built.vertex_count, built.arcs)
+    with QueryExecutor(built.graph, max_workers=4) as executor:
+        for source in built.nodes:
+            futures = [(target, executor.bfs(source, target), executor.dfs(source, target)) for target in built.nodes]
+            for target, bfs, dfs in futures:
+                expected = target if reaches[source.value][target.value] else None
+                assert bfs.result() is expected
+                assert dfs.result() is expected
+            assert executor.bfs(source, None).result() is None
+            assert executor.dfs(source, None).result() is None
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_dijkstras_returns_the_shortest_path_tree(random_graph, seed):
+    built = random_graph(seed)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    with QueryExecutor(built.graph, max_workers=4) as executor:
+        trees = [(source, executor.dijkstras(source)) for source in built.nodes]
+        routes = [(source, target, executor.dijkstras(source, target)) for source in built.nodes
+                  for target in built.nodes]
+        for source, tree in trees:
+            tree = tree.result()
+            assert isinstance(tree, ShortestPaths)
+            assert [tree.distance_to(target) for target in built.nodes] == expected[source.value]
+        for source, target, route in routes:
+            route = route.result()
+            assert isinstance(route, ShortestPaths)
+            assert route.distance_to(target) == expected[source.value][target.value]
+            if route.reached(target):
+                nodes = route.path_to(target)
+                assert nodes[0] is source and nodes[-1] is target
+
+
+def test_map_keeps_the_order_of_the_queries(random_graph):
+    built = random_graph(0)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    queries = [(source, target) for source in built.nodes for target in reversed(built.nodes)]
+    with QueryExecutor(built.graph, max_workers=4) as executor:
+        results = list(executor.map(built.graph.dijkstras, queries))
+    assert len(results) == len(queries)
+    for (source, target), result in zip(queries, results):
+        assert result.distance_to(target) == expected[source.value][target.value]
+
+
+def test_submit_runs_any_callable_with_its_arguments(random_graph):
+    built = random_graph(1)
+    with QueryExecutor(built.graph, max_workers=2) as executor:
+        assert executor.submit(divmod, 7, 2).result() == (3, 1)
+        assert executor.submit(built.graph.bfs, built.nodes[0], node=built.nodes[0]).result() is built.nodes[0]
+        name = executor.submit(lambda: threading.current_thread().name).result()
+    assert name.startswith('graph-query')
+
+
+def test_leaving_the_context_shuts_the_pool_down(random_graph):
+    built = random_graph(2)
+    with QueryExecutor(built.graph, max_workers=1) as executor:
+        future = executor.bfs(built.nodes[0], None)
+    assert future.done()
+    with pytest.raises(RuntimeError):
+        executor.bfs(built.nodes[0], None)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from graph_algos.server import GraphClient, GraphServer
+from reference import floyd_warshall, hops
+
+
+def reference_answer(built, op: str, source: int, argument: int):
+    if op in ('distance', 'shortest_path'):
+        distance = floyd_warshall(built.vertex_count, built.edges)[source][argument]
+        return None if distance == float('inf') else distance
+    depth = hops(built.vertex_count, built.arcs, source)
+    if op == 'reachable':
+        return depth[argument] >= 0
+    return [vertex for vertex, level in enumerate(depth) if 0 < level <= argument]
+
+
+def check_answer(built, op: str, source: int, argument: int, answer) -> None:
+    expected = reference_answer(built, op, source, argument)
+    if op != 'shortest_path':
+        assert answer == expected
+        return
+    assert answer['distance'] == expected
+    path = answer['path']
+    if expected is None:
+        assert path == []
+        return
+    assert path[0] == source and path[-1] == argument
+    length = 0.0
+    for tail, head in zip(path, path[1:]):
+        length += min(weight for u, v, weight in built.edges if {u, v} == {tail, head})
+    assert length == expected
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_queries_from_one_source_share_one_search(random_graph, workers):
+    built = random_graph(0)
+    questions = [('distance', target) for target in range(built.vertex_count)] + \
+        [('shortest_path', target) for target in range(built.vertex_count)]
+
+    async def run():
+        async with GraphServer.from_graph(built.graph, workers=workers, batch_window=0.05) as server:
+            await server.start()
+            answers = await asyncio.gather(*(server.query(op, 3, target) for op, target in questions))
+            reachable = await asyncio.gather(*(server.query('reachable', 3, target)
+                                               for target in range(built.vertex_count)))
+            return server.stats, answers, reachable
+
+    stats, answers, reachable = asyncio.run(run())
+    for (op, target), answer in zip(questions, answers):
+        check_answer(built, op, 3, target, answer)
+    for target, answer in enumerate(reachable):
+        check_answer(built, 'reachable', 3, target, answer)
+    assert stats.requests == len(questions) + built.vertex_count
+    assert stats.searches == 2  # one dijkstra and one bfs
+    assert stats.coalesced == stats.requests - 2
+    assert stats.expired == 0
+
+
+def test_separate_sources_are_batched_together(random_graph):
+    built = random_graph(1)
+
+    async def run():
+        async with GraphServer.from_graph(built.graph, workers=0, batch_window=0.05) as server:
+            await server.start()
+            answers = await asyncio.gather(*(server.query('neighborhood', source, depth=2)
+                                             for source in range(built.vertex_count)))
+            return server.stats, answers
+
+    stats, answers = asyncio.run(run())
+    for source, answer in enumerate(answers):
+        check_answer(built, 'neighborhood', source, 2, answer)
+    assert stats.searches == built.vertex_count
+    assert stats.batches == 1
+
+
+def test_expired_requests_are_answered_and_their_search_never_runs(random_graph):
+    built = random_graph(2)
+
+    async def run():
+        async with GraphServer.from_graph(built.graph, workers=0, batch_window=0.3) as server:
+            await server.start()
+            with pytest.raises(asyncio.TimeoutError):
+                await server.query('distance', 0, 1, deadline=0.05)
+            await asyncio.sleep(0.4)  # the batch window closes with nobody left waiting
+            late = await asyncio.gather(server.query('distance', 1, 2, deadline=0.05),
+                                        server.query('distance', 1, 3), return_exceptions=True)
+            return server.stats, late
+
+    stats, late = asyncio.run(run())
+    assert stats.expired == 2
+    assert stats.searches == 1  # only the search someone still waited for
+    assert isinstance(late[0], asyncio.TimeoutError)
+    check_answer(built, 'distance', 1, 3, late[1])
+
+
+def test_server_default_deadline(random_graph):
+    built = random_graph(3)
+
+    async def run():
+        async with GraphServer.from_graph(built.graph, workers=0, batch_window=0.2, deadline=0.02) as server:
+            await server.start()
+            with pytest.raises(asyncio.TimeoutError):
+                await server.query('reachable', 0, 1)
+            return await server.query('reachable', 0, 1, deadline=1.0)
+
+    check_answer(built, 'reachable', 0, 1, asyncio.run(run()))
+
+
+def test_client_pipelines_over_a_socket(random_graph):
+    built = random_graph(4)
+
+    async def run():
+        async with GraphServer.from_graph(built.graph, workers=0, batch_window=0.2) as server:
+            await server.start(('127.0.0.1', 0))
+            async with await GraphClient.connect(server.address[:2]) as client:
+                answers = await asyncio.gather(client.shortest_path(0, 5), client.distance(0, 6),
+                                               client.reachable(2, 7), client.neighborhood(2, 1),
+                                               client.distance(0, 7, deadline=0.01), return_exceptions=True)
+                with pytest.raises(ValueError):
+                    await client.distance(0, built.vertex_count)
+                with pytest.raises(ValueError):
+                    await client.request('teleport', source=0)
+            return server.stats, answers
+
+    stats, answers = asyncio.run(run())
+    check_answer(built, 'shortest_path', 0, 5, answers[0])
+    check_answer(built, 'distance', 0, 6, answers[1])
+    check_answer(built, 'reachable', 2, 7, answers[2])
+    check_answer(built, 'neighborhood', 2, 1, answers[3])
+    assert isinstance(answers[4], asyncio.TimeoutError)
+    assert stats.coalesced == 3  # the distances from 0 joined the shortest path search, and 2's searches merged
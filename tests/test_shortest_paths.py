@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import List
+
+import pytest
+
+from graph_algos.delta_stepping import delta_stepping
+from graph_algos.dfs import Node
+from graph_algos.shortest_paths import PriorityQueueKind
+from reference import floyd_warshall, simple_path_lengths
+
+SEEDS = range(8)
+
+
+def route_length(nodes: List[Node]) -> float:
+    """
+    The length of a route, failing if two consecutive nodes share no edge
+    """
+    length = 0.0
+    for tail, head in zip(nodes, nodes[1:]):
+        weights = [edge.distance for edge in tail.edges if edge.node is head]
+        assert weights, 'the route uses a missing edge {} -> {}'.format(tail.value, head.value)
+        length += min(weights)
+    return length
+
+
+def check_route(distance: float, nodes: List[Node], source: Node, target: Node, expected: float) -> None:
+    assert distance == expected
+    if expected == float('inf'):
+        assert nodes == []
+    else:
+        assert nodes[0] is source and nodes[-1] is target
+        assert route_length(nodes) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('queue', list(PriorityQueueKind))
+def test_dijkstras_matches_floyd_warshall(random_graph, seed, queue):
+    built = random_graph(seed)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    for source in built.nodes:
+        tree = built.graph.dijkstras(source, queue=queue)
+        for target in built.nodes:
+            check_route(tree.distance_to(target), tree.path_to(target) if tree.reached(target) else [], source,
+                        target, expected[source.value][target.value])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_multi_source_dijkstras_takes_the_nearest_source(random_graph, seed):
+    built = random_graph(seed)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    sources = built.nodes[:3]
+    tree = built.graph.dijkstras(sources)
+    for target in built.nodes:
+        assert tree.distance_to(target) == min(expected[source.value][target.value] for source in sources)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_bidirectional_dijkstras_matches_floyd_warshall(random_graph, seed):
+    built = random_graph(seed)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    for source in built.nodes:
+        for target in built.nodes:
+            check_route(*built.graph.bidirectional_dijkstras(source, target), source, target,
+                        expected[source.value][target.value])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_astar_with_and_without_landmarks_matches_floyd_warshall(random_graph, seed):
+    built = random_graph(seed)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    landmarks = built.graph.landmark_index(3)
+    for source in built.nodes:
+        for target in built.nodes:
+            distance = expected[source.value][target.value]
+            check_route(*built.graph.astar(source, target), source, target, distance)
+            check_route(*built.graph.astar(source, target, landmarks), source, target, distance)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_contraction_hierarchy_matches_floyd_warshall(random_graph, seed):
+    built = random_graph(seed)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    hierarchy = built.graph.contraction_hierarchy()
+    for source in built.nodes:
+        for target in built.nodes:
+            check_route(*hierarchy.route(source, target), source, target, expected[source.value][target.value])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_dynamic_dijkstras_follows_edge_changes(random_graph, seed):
+    built = random_graph(seed)
+    tree = built.graph.dynamic_dijkstras(built.nodes[0])
+    edges = list(built.edges)
+    for step, (u, v, weight) in enumerate(built.edges[::3]):
+        if step % 2:  # a new edge
+            v = (v + 1) % built.vertex_count
+            built.nodes[u].add_edge(built.nodes[v], weight)
+            edges.append((u, v, weight))
+        else:  # reweight every edge between u and v, up or down
+            weight = weight * 3 if step % 4 else max(weight - 2, 1.0)
+            built.nodes[u].set_edge_distance(built.nodes[v], weight)
+            edges = [(a, b, weight if {a, b} == {u, v} else w) for a, b, w in edges]
+        expected = floyd_warshall(built.vertex_count, edges)
+        for target in built.nodes:
+            assert tree.distance_to(target) == expected[0][target.value]
+    tree.detach()
+
+
+def test_set_edge_distance_without_an_edge_raises():
+    nodes = [Node(value) for value in range(3)]
+    nodes[0].add_edge(nodes[1], 1)
+    with pytest.raises(ValueError):
+        nodes[2].set_edge_distance(nodes[0], 5)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('workers', [1, 2])
+def test_delta_stepping_matches_floyd_warshall(random_graph, seed, workers):
+    built = random_graph(seed, vertex_count=40, edge_count=120)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    graph = built.graph.to_csr()
+    tree = delta_stepping(graph, [0], delta=3.0, workers=workers, parallel_threshold=1)  # every phase in the pool
+    for target in built.nodes:
+        assert tree.distance_to(target) == expected[0][target.value]
+        if tree.reached(target):
+            assert route_length(tree.path_to(target)) == expected[0][target.value]
+    assert built.graph.delta_stepping(built.nodes[0], workers=1).distance_to(built.nodes[-1]) == expected[0][-1]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_delta_stepping_starts_workers_only_for_large_frontiers(random_graph, seed, monkeypatch):
+    built = random_graph(seed, vertex_count=40, edge_count=120)
+    expected = floyd_warshall(built.vertex_count, built.edges)
+    graph = built.graph.to_csr()
+    tree = delta_stepping(graph, [0], delta=3.0, workers=2, parallel_threshold=6)  # the pool starts mid search
+    assert [tree.distance_to(target) for target in built.nodes] == expected[0]
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError('a pool was started for frontiers below the threshold')
+
+    monkeypatch.setattr('graph_algos.delta_stepping.ProcessPoolExecutor', no_pool)
+    monkeypatch.setattr('graph_algos.delta_stepping.SharedMemory', no_pool)
+    tree = delta_stepping(graph, [0], delta=3.0, workers=4, parallel_threshold=graph.vertex_count + 1)
+    assert [tree.distance_to(target) for target in built.nodes] == expected[0]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_k_shortest_paths_enumerates_loopless_paths_in_order(random_graph, seed):
+    built = random_graph(seed, vertex_count=7, edge_count=12)
+    source, target = built.nodes[0], built.nodes[-1]
+    expected = simple_path_lengths(built.vertex_count, built.edges, 0, built.vertex_count - 1)
+    routes = list(islice(built.graph.k_shortest_paths(source, target), 50))
+    assert [length for length, _ in routes] == expected[:50]
+    assert len({tuple(map(id, nodes)) for _, nodes in routes}) == len(routes)
+    for length, nodes in routes:
+        assert len(set(map(id, nodes))) == len(nodes)
+        check_route(length, nodes, source, target, length)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import pytest
+
+from graph_algos.dfs import Graph, Node, NodeLabel, Vertex
+from graph_algos.snapshot import HEADER
+
+SEEDS = range(4)
+
+
+def assert_same_csr(first, second) -> None:
+    assert list(first.offsets) == list(second.offsets)
+    assert list(first.targets) == list(second.targets)
+    assert list(first.weights) == list(second.weights)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_snapshot_round_trip(random_graph, seed, tmp_path):
+    built = random_graph(seed)
+    for node in built.nodes:
+        node.set_letter_label('vertex {}'.format(node.value))
+    built.nodes[3].set_label(NodeLabel.FULLY_DISCOVERED)
+    built.graph.insert_vertex(None)  # a hole in `vertices` stays a hole
+    path = str(tmp_path / 'graph.snapshot')
+    built.graph.save_snapshot(path)
+
+    with Graph.open_snapshot(path) as snapshot:
+        assert snapshot.vertex_count == len(built.graph.vertices)
+        assert_same_csr(snapshot.weighted, built.graph.to_csr(weighted=True))
+        assert_same_csr(snapshot.connections, built.graph.to_csr(weighted=False))
+        rebuilt = snapshot.to_graph()
+
+    assert rebuilt.vertices[-1] is None
+    for original, copy in zip(built.nodes, rebuilt.vertices):
+        assert copy.value == original.value
+        assert copy.letter_label == original.letter_label
+        assert copy.label == original.label
+        assert [(edge.node.value, edge.distance) for edge in copy.edges] == \
+            [(edge.node.value, edge.distance) for edge in original.edges]
+        assert [head.value for head in copy.connections] == [head.value for head in original.connections]
+    assert_same_csr(rebuilt.to_csr(weighted=True), built.graph.to_csr(weighted=True))
+    assert rebuilt.dijkstras(rebuilt.vertices[0]).distance_to(rebuilt.vertices[5]) == \
+        built.graph.dijkstras(built.nodes[0]).distance_to(built.nodes[5])
+
+
+def test_snapshot_keeps_string_values_and_vertices_never_inserted(tmp_path):
+    nodes = [Node('a'), Node('b')]
+    stray = Node('c')  # only reachable through an edge
+    nodes[0].add_edge(nodes[1], 2.5)
+    nodes[1].connect(stray)
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    path = str(tmp_path / 'graph.snapshot')
+    graph.save_snapshot(path)
+    with Graph.open_snapshot(path) as snapshot:
+        assert [snapshot.value(vertex) for vertex in range(snapshot.vertex_count)] == ['a', 'b', 'c']
+        assert list(snapshot.connections.neighbors(1)) == [2]
+
+
+def test_open_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.snapshot'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        Graph.open_snapshot(str(path))
+    path.write_bytes(b'')
+    with pytest.raises(ValueError):
+        Graph.open_snapshot(str(path))
+
+
+def test_snapshot_of_vertices(tmp_path):
+    vertices = [Vertex(value) for value in range(4)]
+    graph = Graph()
+    graph.insert_vertexes(vertices)
+    vertices[0].add_edge(vertices[1], 1.0)
+    vertices[1].add_edge(vertices[2], 2.0)
+    vertices[3].connect(vertices[0])
+    path = str(tmp_path / 'graph.snapshot')
+    graph.save_snapshot(path)
+    with Graph.open_snapshot(path) as snapshot:
+        assert_same_csr(snapshot.weighted, graph.to_csr(weighted=True))
+        assert_same_csr(snapshot.connections, graph.to_csr(weighted=False))
+
+
+def test_snapshot_keeps_string_labels(tmp_path):
+    nodes = [Node(value).set_label(label) for value, label in enumerate(['a', NodeLabel.DISCOVERED, 'b c'])]
+    nodes[0].add_edge(nodes[1], 1)
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    path = str(tmp_path / 'graph.snapshot')
+    graph.save_snapshot(path)
+    with Graph.open_snapshot(path) as snapshot:
+        assert [snapshot.label(vertex) for vertex in range(3)] == ['a', NodeLabel.DISCOVERED.value, 'b c']
+        assert [node.label for node in snapshot.to_graph().vertices] == ['a', NodeLabel.DISCOVERED, 'b c']
+
+
+def test_snapshot_rejects_labels_it_cannot_store(tmp_path):
+    graph = Graph()
+    graph.insert_vertex(Node(0).set_label(3.5))
+    with pytest.raises(ValueError):
+        graph.save_snapshot(str(tmp_path / 'graph.snapshot'))
+
+
+def test_open_snapshot_rejects_truncated_files(random_graph, tmp_path):
+    path = tmp_path / 'graph.snapshot'
+    random_graph(0).graph.save_snapshot(str(path))
+    whole = path.read_bytes()
+    for size in (HEADER.size - 1, HEADER.size + 5, len(whole) // 2, len(whole) - 1):
+        path.write_bytes(whole[:size])
+        with pytest.raises(ValueError):
+            Graph.open_snapshot(str(path))
+
+
+def test_open_snapshot_reads_version_1_files(random_graph, tmp_path):
+    path = tmp_path / 'graph.snapshot'
+    built = random_graph(0)
+    built.graph.save_snapshot(str(path))
+    whole = bytearray(path.read_bytes())
+    fields = list(HEADER.unpack_from(whole, 0))
+    fields[1] = 1  # NodeLabel labels only, which version 1 wrote the same way
+    HEADER.pack_into(whole, 0, *fields)
+    path.write_bytes(bytes(whole))
+    with Graph.open_snapshot(str(path)) as snapshot:
+        assert_same_csr(snapshot.weighted, built.graph.to_csr(weighted=True))
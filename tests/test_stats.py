@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from graph_algos.csr import np
+from graph_algos.dfs import Graph, Node
+from graph_algos.stats import QueryStats, add_hook, remove_hook
+from graph_algos.traversal import BFSMode, DFSOrder
+
+
+def diamond() -> List[Node]:
+    """
+    0 -> 1 -> 3 -> 4 and 0 -> 2 -> 3 over `connections`, 5 is isolated. Weighted edges 0-1 (1), 0-2 (4), 1-2 (1).
+    """
+    nodes = [Node(value) for value in range(6)]
+    for tail, head in ((0, 1), (0, 2), (1, 3), (2, 3), (3, 4)):
+        nodes[tail].connect(nodes[head])
+    for u, v, weight in ((0, 1, 1), (0, 2, 4), (1, 2, 1)):
+        nodes[u].add_edge(nodes[v], weight)
+    Graph().insert_vertexes(nodes)
+    return nodes
+
+
+def test_queries_collect_nothing_without_a_hook_or_trace():
+    nodes = diamond()
+    assert nodes[0].graph.bfs_traversal(nodes[0], None).stats is None
+    assert nodes[0].graph.dijkstras(nodes[0]).stats is None
+
+
+def test_hooks_receive_every_query_until_removed():
+    nodes = diamond()
+    graph = nodes[0].graph
+    seen: List[QueryStats] = []
+    add_hook(seen.append)
+    try:
+        graph.bfs(nodes[0], nodes[4])
+        graph.dfs(nodes[0], nodes[4])
+        graph.dijkstras(nodes[0])
+    finally:
+        remove_hook(seen.append)
+    graph.bfs(nodes[0], nodes[4])
+    assert [stats.algorithm for stats in seen] == ['bfs', 'dfs', 'dijkstras']
+    assert set(seen[0].phases) == {'compile', 'search'}
+
+
+@pytest.mark.parametrize('target, popped, scanned', [(None, 5, 5), (3, 4, 4)])
+def test_bfs_counts_dequeues_and_scanned_slots(target, popped, scanned):
+    nodes = diamond()
+    stats = nodes[0].graph.bfs_traversal(nodes[0], None if target is None else nodes[target], trace=True).stats
+    assert stats.vertices_popped == popped
+    assert stats.edges_scanned == scanned  # the target's own edges are never read
+    assert stats.edges_relaxed == 0
+
+
+@pytest.mark.parametrize('order, target, popped, scanned', [
+    (DFSOrder.PREORDER, None, 5, 5),
+    (DFSOrder.PREORDER, 3, 3, 2),  # 0 and 1 read one slot each before 3 is discovered
+    (DFSOrder.POSTORDER, 3, 4, 3),  # 4 and 3 are finished, 0 and 1 read one slot each
+    (DFSOrder.REVERSE_POSTORDER, None, 5, 5),
+])
+def test_dfs_counts_pushes_and_scanned_slots(order, target, popped, scanned):
+    nodes = diamond()
+    stats = nodes[0].graph.dfs_traversal(nodes[0], None if target is None else nodes[target], order, trace=True).stats
+    assert stats.vertices_popped == popped
+    assert stats.edges_scanned == scanned
+
+
+def test_level_synchronous_bfs_counts_frontiers():
+    nodes = diamond()
+    stats = nodes[0].graph.bfs_traversal(nodes[0], None, BFSMode.LEVEL_SYNCHRONOUS, trace=True).stats
+    assert stats.frontier_sizes == [1, 2, 1, 1]
+    assert stats.vertices_popped == 5
+    assert stats.edges_scanned == 5
+
+
+def test_bottom_up_bfs_counts_in_edges_scanned():
+    nodes = [Node(value) for value in range(6)]
+    for tail, head in ((0, 1), (0, 2), (0, 3), (1, 4), (2, 4), (3, 5)):
+        nodes[tail].connect(nodes[head])
+    graph = Graph()
+    graph.insert_vertexes(nodes)
+    stats = graph.bfs_traversal(nodes[0], None, BFSMode.DIRECTION_OPTIMIZING, trace=True).stats  # bottom-up at once
+    assert stats.frontier_sizes == [1, 3, 2]
+    # the first level reads every in-edge of 1 to 5, the second stops at 4's first in-edge without NumPy and reads
+    # whole rows with it
+    assert stats.edges_scanned == (9 if np is not None else 8)
+
+
+def test_dijkstras_counts_heap_traffic_and_relaxations():
+    nodes = diamond()
+    stats = nodes[0].graph.dijkstras(nodes[0], trace=True).stats
+    assert stats.heap_pushes == 4  # the source, 1, 2 at 4 and 2 again at 2
+    assert stats.heap_pops == 4
+    assert stats.vertices_popped == 4  # the stale entry of 2 included
+    assert stats.edges_relaxed == 3
+    assert stats.edges_scanned == 0
+    assert not stats.cached
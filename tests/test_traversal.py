@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from graph_algos.traversal import BFSMode, DFSOrder
+from reference import depth_first, hops, reachability
+
+SEEDS = range(8)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_bfs_and_dfs_return_the_target_or_none(random_graph, seed):
+    built = random_graph(seed)
+    reaches = reachability(built.vertex_count, built.arcs)
+    source = built.nodes[0]
+    for target in built.nodes:
+        expected = target if reaches[0][target.value] else None
+        assert built.graph.bfs(source, target) is expected
+        assert built.graph.dfs(source, target) is expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_bfs_traversal_finds_fewest_hops(random_graph, seed):
+    built = random_graph(seed)
+    for source in built.nodes:
+        expected = hops(built.vertex_count, built.arcs, source.value)
+        queue = built.graph.bfs_traversal(source, None)
+        for target in built.nodes:
+            assert queue.reached(target) == (expected[target.value] >= 0)
+            if queue.reached(target):
+                assert len(queue.path_to(target)) - 1 == expected[target.value]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('mode', [BFSMode.LEVEL_SYNCHRONOUS, BFSMode.DIRECTION_OPTIMIZING])
+def test_frontier_bfs_finds_fewest_hops(random_graph, seed, mode):
+    built = random_graph(seed)
+    reaches = reachability(built.vertex_count, built.arcs)
+    for source in built.nodes:
+        expected = hops(built.vertex_count, built.arcs, source.value)
+        levels = built.graph.bfs_traversal(source, None, mode)
+        assert [levels.depth_of(target) for target in built.nodes] == expected
+    for target in built.nodes:
+        assert built.graph.bfs(built.nodes[0], target, mode) is (target if reaches[0][target.value] else None)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_dfs_orders_match_the_recursive_search(random_graph, seed):
+    built = random_graph(seed)
+    for source in built.nodes:
+        preorder, postorder, parent = depth_first(built.vertex_count, built.arcs, source.value)
+        expected = {DFSOrder.PREORDER: preorder, DFSOrder.POSTORDER: postorder,
+                    DFSOrder.REVERSE_PREORDER: preorder[::-1], DFSOrder.REVERSE_POSTORDER: postorder[::-1]}
+        for order, sequence in expected.items():
+            assert [node.value for node in built.graph.dfs_order(source, order)] == sequence
+        walk = built.graph.dfs_traversal(source, None)
+        for node in built.nodes:
+            assert walk.reached(node) == (node.value in preorder)
+            if node is not source and walk.reached(node):
+                assert walk.path_to(node)[-2].value == parent[node.value]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('order', list(DFSOrder))
+def test_dfs_stops_where_the_recursive_search_meets_the_target(random_graph, seed, order):
+    built = random_graph(seed)
+    source = built.nodes[0]
+    preorder, postorder, _ = depth_first(built.vertex_count, built.arcs, 0)
+    sequence = postorder if order in (DFSOrder.POSTORDER, DFSOrder.REVERSE_POSTORDER) else preorder
+    for target in built.nodes:
+        walk = built.graph.dfs_traversal(source, target, order)
+        if target.value not in sequence:
+            assert walk.found_node is None
+            continue
+        assert walk.found_node is target
+        if order == DFSOrder.PREORDER:  # the walk stopped right there, nothing after the target was discovered
+            later = sequence[sequence.index(target.value) + 1:]
+            assert not any(walk.reached(built.nodes[vertex]) for vertex in later)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_bidirectional_bfs_finds_fewest_hops(random_graph, seed):
+    built = random_graph(seed)
+    expected = hops(built.vertex_count, built.arcs, 0)
+    for target in built.nodes:
+        path = built.graph.bidirectional_bfs(built.nodes[0], target)
+        if expected[target.value] < 0:
+            assert path == []
+            continue
+        assert len(path) - 1 == expected[target.value]
+        assert path[0] is built.nodes[0] and path[-1] is target
+        for tail, head in zip(path, path[1:]):
+            assert any(node is head for node in tail.connections)
+
+
+@pytest.mark.parametrize('seed', SEEDS[:3])
+def test_partitioned_bfs_matches_fewest_hops(random_graph, seed):
+    built = random_graph(seed, vertex_count=60, arc_count=150)
+    expected = hops(built.vertex_count, built.arcs, 0)
+    levels = built.graph.partitioned_bfs(built.nodes[0], None, parts=3)
+    assert [levels.depth_of(node) for node in built.nodes] == expected
+    for node in built.nodes[1:]:
+        if expected[node.value] > 0:
+            parent = built.nodes[int(levels.parent[node.value])]
+            assert expected[parent.value] == expected[node.value] - 1
+            assert any(head is node for head in parent.connections)